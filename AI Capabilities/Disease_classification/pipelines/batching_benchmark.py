@@ -0,0 +1,76 @@
+import sys
+import os
+import time
+import argparse
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+# Ensure the root project directory is in the path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, ".."))
+sys.path.insert(0, project_root)
+
+from src.models.classifier import predict_batch
+from src.models.batching import MicroBatcher
+from src.utils.profiling import latency_summary, throughput
+
+def make_images(count, size=512, seed=0):
+    rng = np.random.default_rng(seed)
+    return [Image.fromarray(rng.integers(0, 255, (size, size, 3), dtype=np.uint8)) for _ in range(count)]
+
+def run_load(predict_fn, images, concurrency):
+    latencies = []
+
+    def timed_call(image):
+        start = time.perf_counter()
+        predict_fn(image)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(timed_call, images))
+    elapsed = time.perf_counter() - start
+
+    return {"images_per_sec": throughput(len(images), elapsed), **latency_summary(latencies)}
+
+def run_batching_benchmark(num_requests, concurrency, max_batch_size, max_wait_ms):
+    images = make_images(num_requests)
+
+    # Warm up both paths so the first forward pass doesn't skew the numbers
+    predict_batch(images[:1])
+    predict_batch(images[:max_batch_size])
+
+    results = {"unbatched": run_load(lambda image: predict_batch([image])[0], images, concurrency)}
+
+    batcher = MicroBatcher(predict_batch, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+    try:
+        results["batched"] = run_load(batcher.predict, images, concurrency)
+    finally:
+        batcher.close()
+
+    for mode, stats in results.items():
+        print(f"{mode:>10}: {stats['images_per_sec']:.1f} img/s | "
+              f"p50 {stats['p50_ms']:.1f} ms | p99 {stats['p99_ms']:.1f} ms")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=256, help="Total number of /predict-sized requests")
+    parser.add_argument("--concurrency", type=int, default=32, help="Number of concurrent callers")
+    parser.add_argument("--max-batch-size", type=int, default=16)
+    parser.add_argument("--max-wait-ms", type=float, default=10.0)
+    parser.add_argument("--output", type=str, default=None, help="Optional JSON file for the results")
+    args = parser.parse_args()
+
+    results = run_batching_benchmark(args.requests, args.concurrency, args.max_batch_size, args.max_wait_ms)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+
+# Compare batch-of-one inference against the micro-batcher
+# python pipelines/batching_benchmark.py --requests 256 --concurrency 32
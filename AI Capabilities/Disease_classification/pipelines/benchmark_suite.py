@@ -0,0 +1,179 @@
+import sys
+import os
+import time
+import argparse
+import json
+import itertools
+import subprocess
+import tempfile
+
+# Ensure the root project directory is in the path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, ".."))
+sys.path.insert(0, project_root)
+
+from src.utils.profiling import latency_summary, throughput, peak_rss_mb, current_rss_mb, run_metadata
+
+STAGES = ("decode", "preprocess", "forward")
+
+def parse_resolution(value):
+    width, height = value.lower().split("x")
+    return int(width), int(height)
+
+def photo_path(photos_dir, resolution, index):
+    return os.path.join(photos_dir, f"{resolution}-{index}.jpg")
+
+def write_photos(photos_dir, resolutions, count):
+    """
+    Encodes the test photos once, in the parent, so building them (float noise
+    arrays of full-resolution photos) never shows up in a measured process.
+    """
+    from pipelines.preprocessing_benchmark import make_phone_photo
+
+    for resolution in resolutions:
+        width, height = parse_resolution(resolution)
+        for i in range(count):
+            with open(photo_path(photos_dir, resolution, i), "wb") as f:
+                f.write(make_phone_photo(width, height, seed=i))
+
+def run_child(batch_size, threads, resolution, iterations, warmup, photos_dir):
+    """
+    Measures one configuration. Runs in its own interpreter so that the thread
+    settings take effect before torch starts and peak RSS is not inherited
+    from a previous configuration.
+    """
+    import torch
+    from src.models import classifier
+    from src.utils.preprocessing import decode_image
+
+    images = []
+    for i in range(batch_size):
+        with open(photo_path(photos_dir, resolution, i), "rb") as f:
+            images.append(f.read())
+    # Interpreter, torch and the encoded inputs; everything above this is the model and the pipeline
+    baseline_rss = current_rss_mb()
+
+    torch.set_num_threads(threads)
+    classifier.load_model(run_warmup=False)
+    model, preprocessor = classifier.registry.active, classifier.feature_extractor
+    backend = model.backend
+
+    stage_timings = {stage: [] for stage in STAGES}
+    batch_latencies = []
+    for i in range(warmup + iterations):
+        start = time.perf_counter()
+        decoded = [decode_image(image_bytes) for image_bytes in images]
+        decoded_at = time.perf_counter()
+        pixel_values = preprocessor.normalize(preprocessor.resize_batch(decoded))
+        preprocessed_at = time.perf_counter()
+        backend.logits(pixel_values)
+        end = time.perf_counter()
+
+        if i < warmup:
+            continue
+        stage_timings["decode"].append(decoded_at - start)
+        stage_timings["preprocess"].append(preprocessed_at - decoded_at)
+        stage_timings["forward"].append(end - preprocessed_at)
+        batch_latencies.append(end - start)
+
+    result = {
+        "batch_size": batch_size,
+        "threads": threads,
+        "resolution": resolution,
+        "backend": backend.name,
+        "model_version": model.version,
+        "images_per_sec": throughput(batch_size * iterations, sum(batch_latencies)),
+        "latency": latency_summary(batch_latencies),
+        "stages": {stage: latency_summary(timings) for stage, timings in stage_timings.items()},
+        "peak_rss_mb": peak_rss_mb(),
+        "baseline_rss_mb": baseline_rss,
+        "rss_delta_mb": max(0.0, peak_rss_mb() - baseline_rss),
+    }
+    print(json.dumps(result))
+
+def run_config(batch_size, threads, resolution, iterations, warmup, photos_dir):
+    env = {**os.environ, "OMP_NUM_THREADS": str(threads), "PREPROCESS_THREADS": str(threads)}
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", str(batch_size), str(threads), resolution,
+         "--iterations", str(iterations), "--warmup", str(warmup), "--photos-dir", photos_dir],
+        cwd=project_root, env=env, capture_output=True, text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Benchmark run failed:\n{completed.stderr[-2000:]}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def config_key(result):
+    return result["batch_size"], result["threads"], result["resolution"]
+
+def compare_to_baseline(results, baseline):
+    """
+    Prints the images/sec and p95 change of every configuration that also
+    appears in the baseline run.
+    """
+    previous = {config_key(result): result for result in baseline["results"]}
+    print(f"\nCompared to {baseline['metadata']['commit']} ({baseline['metadata']['timestamp']}):")
+    for result in results:
+        before = previous.get(config_key(result))
+        if before is None:
+            continue
+        speedup = result["images_per_sec"] / before["images_per_sec"]
+        p95_change = result["latency"]["p95_ms"] / before["latency"]["p95_ms"] - 1
+        print(f"  batch {result['batch_size']:>3} | threads {result['threads']:>2} | {result['resolution']:>9}: "
+              f"{speedup:.2f}x img/s | p95 {p95_change:+.1%}")
+
+def report_config(result):
+    batch_size, threads, resolution = config_key(result)
+    stages = " | ".join(f"{stage} {result['stages'][stage]['p50_ms']:.1f}" for stage in STAGES)
+    print(f"batch {batch_size:>3} | threads {threads:>2} | {resolution:>9}: "
+          f"{result['images_per_sec']:7.1f} img/s | p50 {result['latency']['p50_ms']:7.1f} ms | "
+          f"p95 {result['latency']['p95_ms']:7.1f} ms | p99 {result['latency']['p99_ms']:7.1f} ms | "
+          f"RSS +{result['rss_delta_mb']:.0f} MB (peak {result['peak_rss_mb']:.0f}) | stage p50 ms: {stages}")
+
+def run_benchmark_suite(batch_sizes, thread_counts, resolutions, iterations, warmup):
+    results = []
+    with tempfile.TemporaryDirectory(prefix="sknai-bench-") as photos_dir:
+        # Encoded once here, so building the photos never counts against a measured process
+        write_photos(photos_dir, resolutions, max(batch_sizes))
+        for batch_size, threads, resolution in itertools.product(batch_sizes, thread_counts, resolutions):
+            results.append(run_config(batch_size, threads, resolution, iterations, warmup, photos_dir))
+            report_config(results[-1])
+
+    return {"metadata": run_metadata(project_root), "results": results}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--threads", type=int, nargs="+", default=sorted({1, os.cpu_count() or 1}))
+    parser.add_argument("--resolutions", type=str, nargs="+", default=["640x480", "1920x1080", "4000x3000"],
+                        help="Source photo sizes (WIDTHxHEIGHT); the model input is always 224x224")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--output", type=str, default=None,
+                        help="JSON results file (default: benchmarks/<commit>.json)")
+    parser.add_argument("--baseline", type=str, default=None, help="Earlier results file to compare against")
+    parser.add_argument("--child", nargs=3, default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--photos-dir", type=str, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        batch_size, threads, resolution = args.child
+        run_child(int(batch_size), int(threads), resolution, args.iterations, args.warmup, args.photos_dir)
+        sys.exit(0)
+
+    report = run_benchmark_suite(args.batch_sizes, args.threads, args.resolutions, args.iterations, args.warmup)
+
+    output = args.output or os.path.join(project_root, "benchmarks", f"{report['metadata']['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Results written to {output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare_to_baseline(report["results"], json.load(f))
+
+
+
+# Sweep batch size x threads x source resolution; one fresh process per configuration
+# python pipelines/benchmark_suite.py
+# python pipelines/benchmark_suite.py --batch-sizes 16 --threads 4 --baseline benchmarks/<old commit>.json
@@ -1,5 +1,6 @@
 import sys
 import os
+import argparse
 import uvicorn
 
 # Ensure the root project directory is in the path
@@ -7,16 +8,30 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.abspath(os.path.join(current_dir, ".."))
 sys.path.insert(0, project_root)
 
-from src.main import app  # ✅ Now this will work
-
-def run_deploy_pipeline():
-    print("🚀 Starting FastAPI server at http://127.0.0.1:8080 ...")
-    uvicorn.run(app, host="0.0.0.0", port=8080)
+def run_deploy_pipeline(host="0.0.0.0", port=8080, workers=1, threads=0):
+    print(f"🚀 Starting FastAPI server at http://127.0.0.1:{port} with {workers} worker(s) ...")
+    if workers > 1:
+        from src.serving import run_multiworker
+        run_multiworker(host, port, workers, threads)
+    else:
+        # Imported here: the multi-worker path must configure metrics before the app is imported
+        from src.main import app
+        uvicorn.run(app, host=host, port=port)
 
 if __name__ == "__main__":
-    run_deploy_pipeline()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", type=str, default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_WORKERS", 1)),
+                        help="Worker processes sharing one preloaded copy of the weights")
+    parser.add_argument("--threads", type=int, default=0,
+                        help="Intra-op threads per worker (default: cores // workers)")
+    args = parser.parse_args()
+    run_deploy_pipeline(args.host, args.port, args.workers, args.threads)
 
 
 
 # Run API
 # python pipelines/deploy_pipeline.py
+# Multi-worker (weights loaded once, shared copy-on-write)
+# python pipelines/deploy_pipeline.py --workers 4
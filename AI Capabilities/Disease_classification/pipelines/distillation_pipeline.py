@@ -0,0 +1,107 @@
+import sys
+import os
+import argparse
+import json
+
+import torch
+
+# Ensure the root project directory is in the path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, ".."))
+sys.path.insert(0, project_root)
+
+from src.utils.config import MODEL_PATH, CONFIG_PATH, id2label
+from src.utils.dataset_loader import get_dataset
+from src.utils.preprocessing import ImagePreprocessor
+from src.models.backends import TorchBackend, load_torch_model
+from src.models.distillation import distill_model
+from src.models.trainer import PRECISIONS
+from src.models.evaluation import evaluate_backend, compare_reports, runtime_memory
+
+def compare_teacher_student(student_dir, data_dir, batch_size, latency_samples):
+    split = get_dataset(data_dir)["test"]
+    feature_extractor = ImagePreprocessor.from_config_file(num_threads=4)
+    device = torch.device("cpu")
+
+    artifacts = {
+        "teacher": (MODEL_PATH, CONFIG_PATH),
+        "student": (os.path.join(student_dir, "model.safetensors"), os.path.join(student_dir, "config.json")),
+    }
+    reports = {}
+    for name, (model_path, config_path) in artifacts.items():
+        backend = TorchBackend(load_torch_model(model_path, config_path, device), device, name=name)
+        reports[name] = evaluate_backend(name, backend, split, feature_extractor, id2label, batch_size, latency_samples)
+        # Measured in a fresh process per model, at single-image serving batch size
+        reports[name]["memory"] = runtime_memory(model_path, config_path, batch_size=1)
+        del backend
+    comparison = compare_reports(reports["teacher"], reports["student"])
+    result = {
+        **reports,
+        **comparison,
+        "size_ratio": reports["student"]["size_mb"] / reports["teacher"]["size_mb"],
+        "speedup": reports["student"]["images_per_sec"] / reports["teacher"]["images_per_sec"],
+        "memory_ratio": reports["student"]["memory"]["peak_delta_mb"] / reports["teacher"]["memory"]["peak_delta_mb"],
+    }
+
+    print(f"{'':<10}{'accuracy':>10}{'params (M)':>12}{'size (MB)':>11}{'RSS (MB)':>10}{'img/s':>9}{'p50 1-img (ms)':>16}")
+    for name, report in reports.items():
+        print(f"{name:<10}{report['accuracy']:>10.4f}{report['parameters'] / 1e6:>12.1f}{report['size_mb']:>11.1f}"
+              f"{report['memory']['peak_delta_mb']:>10.1f}{report['images_per_sec']:>9.1f}"
+              f"{report['single_image_latency']['p50_ms']:>16.1f}")
+    for label, delta in comparison["per_class_delta"].items():
+        print(f"  {label:<45} {'n/a' if delta is None else f'{delta:+.4f}'}")
+    print(f"Student: {result['speedup']:.2f}x throughput, {result['size_ratio']:.2f}x size, "
+          f"{result['memory_ratio']:.2f}x runtime memory, "
+          f"accuracy {comparison['accuracy_delta']:+.4f}")
+    return result
+
+def run_distillation_pipeline(args):
+    if not args.report_only:
+        distill_model(
+            output_dir=args.output_dir,
+            data_dir=args.data_dir,
+            student_size=args.student,
+            pretrained=not args.from_scratch,
+            epochs=args.epochs,
+            batch_size=args.batch_size,
+            learning_rate=args.lr,
+            temperature=args.temperature,
+            alpha=args.alpha,
+            num_workers=args.workers,
+            precision=args.precision,
+        )
+
+    result = compare_teacher_student(args.output_dir, args.data_dir, args.eval_batch_size, args.latency_samples)
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(result, f, indent=2)
+    return result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--student", type=str, choices=["tiny", "small"], default="tiny")
+    parser.add_argument("--from-scratch", action="store_true", help="Don't start from ImageNet-pretrained DeiT weights")
+    parser.add_argument("--output-dir", type=str, default=None, help="Defaults to ./models/student_<size>")
+    parser.add_argument("--data-dir", type=str, default=None, help="Local dataset copy (defaults to the Hub dataset)")
+    parser.add_argument("--epochs", type=int, default=30)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--lr", type=float, default=5e-4)
+    parser.add_argument("--temperature", type=float, default=2.0)
+    parser.add_argument("--alpha", type=float, default=0.5, help="Weight of the teacher (soft-target) loss")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--precision", type=str, choices=PRECISIONS, default="auto",
+                        help="auto: fp16 on CUDA, bf16 on CPUs with native bf16, fp32 otherwise")
+    parser.add_argument("--eval-batch-size", type=int, default=16)
+    parser.add_argument("--latency-samples", type=int, default=32, help="Images timed one at a time")
+    parser.add_argument("--report-only", action="store_true", help="Skip training; compare an existing student")
+    parser.add_argument("--report", type=str, default=None, help="Optional JSON report path")
+    args = parser.parse_args()
+    args.output_dir = args.output_dir or f"./models/student_{args.student}"
+    run_distillation_pipeline(args)
+
+
+
+# Distill the served ViT-Base into a DeiT-tiny student, then compare accuracy / latency / size
+# python pipelines/distillation_pipeline.py --student tiny --report student_tiny.json
+# Serve the student
+# CONFIG_PATH=models/student_tiny/config.json MODEL_PATH=models/student_tiny/model.safetensors python pipelines/deploy_pipeline.py
@@ -0,0 +1,46 @@
+import sys
+import os
+import argparse
+import json
+
+import torch
+
+# Ensure the root project directory is in the path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, ".."))
+sys.path.insert(0, project_root)
+
+from src.utils.config import MODEL_PATH, CONFIG_PATH, ONNX_MODEL_PATH
+from src.models.backends import TorchBackend, OnnxBackend, load_torch_model, export_onnx, check_parity
+
+def run_export_pipeline(onnx_path, atol, num_samples):
+    device = torch.device("cpu")
+    model = load_torch_model(MODEL_PATH, CONFIG_PATH, device)
+
+    print(f"📦 Exporting {MODEL_PATH} → {onnx_path} ...")
+    export_onnx(model, onnx_path)
+
+    # Parity check: eager PyTorch vs ONNX Runtime on the same random inputs
+    torch.manual_seed(0)
+    pixel_values = torch.rand(num_samples, 3, 224, 224) * 2 - 1
+    report = check_parity(TorchBackend(model, device), OnnxBackend(onnx_path), pixel_values, atol=atol)
+    print(json.dumps(report, indent=2))
+
+    if not report["passed"]:
+        print("❌ ONNX logits do not match PyTorch within tolerance")
+        sys.exit(1)
+    print("✅ Parity check passed")
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--output", type=str, default=ONNX_MODEL_PATH, help="Where to write the ONNX model")
+    parser.add_argument("--atol", type=float, default=1e-3, help="Max allowed absolute logit difference")
+    parser.add_argument("--samples", type=int, default=8, help="Number of inputs used for the parity check")
+    args = parser.parse_args()
+    run_export_pipeline(args.output, args.atol, args.samples)
+
+
+
+# Export to ONNX and verify parity, then serve it with INFERENCE_BACKEND=onnx
+# python pipelines/export_onnx_pipeline.py
@@ -0,0 +1,45 @@
+import sys
+import os
+import argparse
+
+# Ensure the root project directory is in the path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, ".."))
+sys.path.insert(0, project_root)
+
+from src.models.trainer import train_head_model, BASE_CHECKPOINT
+
+def run_head_training_pipeline(args):
+    return train_head_model(
+        output_dir=args.output_dir,
+        data_dir=args.data_dir,
+        backbone=args.backbone,
+        train_last_n=args.train_last_n,
+        cache_dir=args.cache_dir,
+        epochs=args.epochs,
+        batch_size=args.batch_size,
+        lr=args.lr,
+        num_workers=args.workers,
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--output-dir", type=str, default="./models/head_retrained",
+                        help="Where config.json + model.safetensors are written")
+    parser.add_argument("--data-dir", type=str, default=None, help="Local dataset copy (defaults to the Hub dataset)")
+    parser.add_argument("--backbone", type=str, default=BASE_CHECKPOINT,
+                        help='Hub id or local directory, or "serving" to start from the model at MODEL_PATH')
+    parser.add_argument("--train-last-n", type=int, default=0, help="Also retrain the last N ViT blocks")
+    parser.add_argument("--cache-dir", type=str, default="./feature_cache")
+    parser.add_argument("--epochs", type=int, default=30)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--lr", type=float, default=1e-3)
+    parser.add_argument("--workers", type=int, default=4, help="DataLoader workers for the one-off feature pass")
+    run_head_training_pipeline(parser.parse_args())
+
+
+
+# Retrain the classification head on cached backbone features (the backbone runs once)
+# python pipelines/head_training_pipeline.py --data-dir <local copy>
+# Serve the result
+# CONFIG_PATH=models/head_retrained/config.json MODEL_PATH=models/head_retrained/model.safetensors python pipelines/deploy_pipeline.py
@@ -2,24 +2,61 @@ import sys
 import os
 import argparse
 
+import httpx
+
 # Ensure the root project directory is in the path
 current_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.abspath(os.path.join(current_dir, ".."))
 sys.path.insert(0, project_root)
 
-from src.models.classifier import predict_disease
+from src.models import classifier
+from src.models.bulk_inference import iter_sources, open_writer, run_bulk_inference
+from src.utils.config import FETCH_CONNECT_TIMEOUT, FETCH_READ_TIMEOUT, FETCH_MAX_CONNECTIONS
+
+def run_inference_pipeline(input_spec, output, output_format=None, batch_size=32, num_workers=8):
+    classifier.load_model(run_warmup=False)
+    model = classifier.registry.active
+    print(f"🔎 Classifying {input_spec} with model {model.version} → {output}")
+
+    http_client = httpx.Client(
+        timeout=httpx.Timeout(FETCH_READ_TIMEOUT, connect=FETCH_CONNECT_TIMEOUT),
+        limits=httpx.Limits(max_connections=FETCH_MAX_CONNECTIONS),
+        follow_redirects=True,
+    )
+    try:
+        stats = run_bulk_inference(
+            iter_sources(input_spec),
+            model.backend,
+            classifier.feature_extractor,
+            open_writer(output, output_format),
+            model.id2label,
+            model.version,
+            batch_size=batch_size,
+            num_workers=num_workers,
+            http_client=http_client,
+        )
+    finally:
+        http_client.close()
 
-def run_inference_pipeline(image_path):
-    result = predict_disease(image_path)
-    print(f"Prediction: {result['prediction']} (Confidence: {result['confidence']:.2f})")
+    print(f"✅ {stats['processed']} classified ({stats['failed']} failed, {stats['skipped']} already done) "
+          f"in {stats['seconds']:.1f}s — {stats['images_per_sec']:.1f} img/s")
+    return stats
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument("image_path", type=str, help="Path to the image for classification")
+    parser.add_argument("input", type=str,
+                        help="Image path/URL, directory, glob pattern, or CSV/JSONL manifest of paths or URLs")
+    parser.add_argument("--output", type=str, default="predictions.jsonl",
+                        help="JSONL file, or a directory of Parquet parts when it ends with .parquet")
+    parser.add_argument("--format", type=str, choices=["jsonl", "parquet"], default=None)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=8, help="Decode/preprocess threads")
     args = parser.parse_args()
-    run_inference_pipeline(args.image_path)
+    run_inference_pipeline(args.input, args.output, args.format, args.batch_size, args.workers)
 
 
 
-# Run Inference
+# Run Inference (re-running the same command resumes where it stopped)
 # python pipelines/inference_pipeline.py sample_image.jpg
+# python pipelines/inference_pipeline.py archive/ --output scores.jsonl
+# python pipelines/inference_pipeline.py manifest.csv --output scores.parquet --batch-size 64
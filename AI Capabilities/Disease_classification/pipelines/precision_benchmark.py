@@ -0,0 +1,114 @@
+import sys
+import os
+import argparse
+import json
+import time
+
+import torch
+
+# Ensure the root project directory is in the path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, ".."))
+sys.path.insert(0, project_root)
+
+from src.utils.config import MODEL_PATH, CONFIG_PATH
+from src.utils.profiling import latency_summary, throughput, run_metadata
+from src.models.backends import TorchBackend, load_torch_model, check_parity, cpu_supports_bf16
+
+# name -> (autocast dtype, channels_last); "fp32" is the current serving path
+VARIANTS = {
+    "fp32": (None, False),
+    "fp32_channels_last": (None, True),
+    "bf16": (torch.bfloat16, False),
+    "bf16_channels_last": (torch.bfloat16, True),
+}
+
+def load_parity_batches(data_dir, batch_size, limit):
+    from src.utils.dataset_loader import get_dataset
+    from src.utils.preprocessing import ImagePreprocessor
+    from src.models.evaluation import iter_batches
+
+    split = get_dataset(data_dir)["test"]
+    feature_extractor = ImagePreprocessor.from_config_file(num_threads=4)
+    return [pixel_values for pixel_values, _ in iter_batches(split, feature_extractor, batch_size, limit=limit)]
+
+def time_backend(backend, pixel_values, iterations, warmup):
+    latencies = []
+    for i in range(warmup + iterations):
+        start = time.perf_counter()
+        backend.logits(pixel_values)
+        if i >= warmup:
+            latencies.append(time.perf_counter() - start)
+    return {
+        "images_per_sec": throughput(len(pixel_values) * iterations, sum(latencies)),
+        "latency": latency_summary(latencies),
+    }
+
+def run_precision_benchmark(batch_sizes, variants, iterations, warmup, atol, data_dir, parity_samples):
+    device = torch.device("cpu")
+    model = load_torch_model(MODEL_PATH, CONFIG_PATH, device)
+    print(f"🧮 Native bf16 on this CPU: {cpu_supports_bf16()} | intra-op threads: {torch.get_num_threads()}")
+
+    # Parity inputs: real test images when a dataset is given, random inputs otherwise
+    if data_dir:
+        parity_batches = load_parity_batches(data_dir, 16, parity_samples)
+    else:
+        generator = torch.Generator().manual_seed(0)
+        parity_batches = [torch.rand(parity_samples, 3, 224, 224, generator=generator) * 2 - 1]
+
+    results = {}
+    for name in variants:
+        autocast_dtype, channels_last = VARIANTS[name]
+        reference = TorchBackend(model, device)
+        backend = TorchBackend(model, device, name=name, autocast_dtype=autocast_dtype, channels_last=channels_last)
+        reports = [check_parity(reference, backend, pixel_values, atol=atol) for pixel_values in parity_batches]
+        parity = {
+            "max_abs_diff": max(report["max_abs_diff"] for report in reports),
+            "top1_agreement": sum(report["top1_agreement"] for report in reports) / len(reports),
+            "passed": all(report["passed"] for report in reports),
+        }
+
+        generator = torch.Generator().manual_seed(1)
+        timings = {
+            batch_size: time_backend(backend, torch.rand(batch_size, 3, 224, 224, generator=generator) * 2 - 1,
+                                     iterations, warmup)
+            for batch_size in batch_sizes
+        }
+        results[name] = {"parity": parity, "batches": timings}
+        # channels_last converts the shared model in place; undo it for the next variant
+        model.to(memory_format=torch.contiguous_format)
+
+    print(f"{'variant':<20}{'batch':>6}{'img/s':>9}{'p50 (ms)':>10}{'speedup':>9}{'max diff':>10}{'top-1':>7}")
+    for name, result in results.items():
+        for batch_size, timing in result["batches"].items():
+            speedup = timing["images_per_sec"] / results["fp32"]["batches"][batch_size]["images_per_sec"]
+            print(f"{name:<20}{batch_size:>6}{timing['images_per_sec']:>9.1f}{timing['latency']['p50_ms']:>10.1f}"
+                  f"{speedup:>8.2f}x{result['parity']['max_abs_diff']:>10.4f}{result['parity']['top1_agreement']:>7.2f}")
+
+    return {"metadata": {**run_metadata(project_root), "native_bf16": cpu_supports_bf16()}, "results": results}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--variants", type=str, nargs="+", choices=list(VARIANTS), default=list(VARIANTS))
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--atol", type=float, default=0.25, help="Max allowed absolute logit difference from fp32")
+    parser.add_argument("--data-dir", type=str, default=None, help="Check parity on test-split images instead of random inputs")
+    parser.add_argument("--parity-samples", type=int, default=64)
+    parser.add_argument("--output", type=str, default=None, help="Optional JSON results file")
+    args = parser.parse_args()
+    if "fp32" not in args.variants:
+        args.variants.insert(0, "fp32")
+
+    report = run_precision_benchmark(args.batch_sizes, args.variants, args.iterations, args.warmup, args.atol,
+                                     args.data_dir, args.parity_samples)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+
+# Compare fp32 (the current path) with bf16 autocast and channels-last on this CPU
+# python pipelines/precision_benchmark.py --data-dir <local copy>
+# Then serve with INFERENCE_BACKEND=torch_bf16 (and optionally CHANNELS_LAST=1)
@@ -0,0 +1,78 @@
+import sys
+import os
+import argparse
+import json
+
+import torch
+
+# Ensure the root project directory is in the path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, ".."))
+sys.path.insert(0, project_root)
+
+from src.utils.config import MODEL_PATH, CONFIG_PATH, id2label
+from src.utils.dataset_loader import get_dataset
+from src.utils.preprocessing import ImagePreprocessor
+from src.models.backends import TorchBackend, load_torch_model, quantize_int8
+from src.models.evaluation import evaluate_backend, compare_reports, regression_gate
+
+def run_quantization_eval_pipeline(data_dir, batch_size, latency_samples, max_accuracy_drop, max_class_drop, output):
+    split = get_dataset(data_dir)["test"]
+    feature_extractor = ImagePreprocessor.from_config_file(num_threads=4)
+    device = torch.device("cpu")
+
+    fp32 = TorchBackend(load_torch_model(MODEL_PATH, CONFIG_PATH, device), device)
+    int8 = TorchBackend(quantize_int8(load_torch_model(MODEL_PATH, CONFIG_PATH, device)), device, name="torch_int8")
+
+    reports = {
+        "fp32": evaluate_backend("fp32", fp32, split, feature_extractor, id2label, batch_size, latency_samples),
+        "int8": evaluate_backend("int8", int8, split, feature_extractor, id2label, batch_size, latency_samples),
+    }
+    comparison = compare_reports(reports["fp32"], reports["int8"])
+    failures = regression_gate(comparison, max_accuracy_drop, max_class_drop)
+
+    result = {
+        **reports,
+        **comparison,
+        "size_ratio": reports["int8"]["size_mb"] / reports["fp32"]["size_mb"],
+        "speedup": reports["int8"]["images_per_sec"] / reports["fp32"]["images_per_sec"],
+        "failures": failures,
+    }
+
+    print(f"Accuracy: fp32 {reports['fp32']['accuracy']:.4f} | int8 {reports['int8']['accuracy']:.4f} "
+          f"| delta {comparison['accuracy_delta']:+.4f}")
+    for label, delta in comparison["per_class_delta"].items():
+        print(f"  {label:<45} {'n/a' if delta is None else f'{delta:+.4f}'}")
+    print(f"Size: fp32 {reports['fp32']['size_mb']:.1f} MB | int8 {reports['int8']['size_mb']:.1f} MB")
+    print(f"Speedup: {result['speedup']:.2f}x | single-image p50 "
+          f"{reports['fp32']['single_image_latency']['p50_ms']:.1f} → {reports['int8']['single_image_latency']['p50_ms']:.1f} ms")
+
+    if output:
+        with open(output, "w") as f:
+            json.dump(result, f, indent=2)
+
+    if failures:
+        print("❌ INT8 model regressed:")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+    print("✅ INT8 model passed the accuracy-regression gate")
+    return result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data-dir", type=str, default=None, help="Local copy of the dataset (defaults to the Hub)")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--latency-samples", type=int, default=32, help="Images timed one at a time")
+    parser.add_argument("--max-accuracy-drop", type=float, default=0.01)
+    parser.add_argument("--max-class-drop", type=float, default=0.05)
+    parser.add_argument("--output", type=str, default=None, help="Optional JSON report path")
+    args = parser.parse_args()
+    run_quantization_eval_pipeline(
+        args.data_dir, args.batch_size, args.latency_samples, args.max_accuracy_drop, args.max_class_drop, args.output
+    )
+
+
+
+# Compare fp32 vs INT8 on the test split, then serve with INFERENCE_BACKEND=torch_int8
+# python pipelines/quantization_eval_pipeline.py
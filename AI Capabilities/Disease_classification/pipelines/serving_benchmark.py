@@ -0,0 +1,126 @@
+import sys
+import os
+import time
+import argparse
+import asyncio
+import json
+import functools
+import subprocess
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+import httpx
+import numpy as np
+from PIL import Image
+
+# Ensure the root project directory is in the path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, ".."))
+sys.path.insert(0, project_root)
+
+from src.utils.profiling import latency_summary, throughput
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+def start_image_server(num_images):
+    """
+    Serves synthetic JPEGs locally, standing in for Cloudinary.
+    """
+    image_dir = tempfile.mkdtemp(prefix="sknai-bench-")
+    rng = np.random.default_rng(0)
+    for i in range(num_images):
+        pixels = rng.integers(0, 255, (768, 1024, 3), dtype=np.uint8)
+        Image.fromarray(pixels).save(os.path.join(image_dir, f"{i}.jpg"), "JPEG", quality=90)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(QuietHandler, directory=image_dir))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, [f"http://127.0.0.1:{server.server_port}/{i}.jpg" for i in range(num_images)]
+
+def start_api(workers, port, threads):
+    env = {**os.environ, "PREDICTION_CACHE_ENABLED": "0"}  # measure the model, not the cache
+    return subprocess.Popen(
+        [sys.executable, "pipelines/deploy_pipeline.py", "--workers", str(workers), "--port", str(port),
+         "--threads", str(threads)],
+        cwd=project_root, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+def wait_until_ready(base_url, workers, timeout=300):
+    # Requests land on random workers, so require several ready answers in a row
+    deadline = time.time() + timeout
+    streak = 0
+    while time.time() < deadline:
+        try:
+            ok = httpx.get(f"{base_url}/ready", timeout=2).status_code == 200
+        except httpx.HTTPError:
+            ok = False
+        streak = streak + 1 if ok else 0
+        if streak >= workers * 4:
+            return
+        time.sleep(0.25)
+    raise TimeoutError("API did not become ready")
+
+async def generate_load(base_url, urls, num_requests, concurrency):
+    latencies, errors = [], 0
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        async def one(i):
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post("/predict", json={"image_url": urls[i % len(urls)]})
+                latencies.append(time.perf_counter() - start)
+                errors += response.status_code != 200
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(num_requests)))
+        elapsed = time.perf_counter() - start
+
+    return {"requests_per_sec": throughput(num_requests, elapsed), "errors": errors, **latency_summary(latencies)}
+
+def run_serving_benchmark(worker_counts, num_requests, concurrency, threads, port):
+    image_server, urls = start_image_server(num_images=64)
+    results = {}
+    try:
+        for workers in worker_counts:
+            process = start_api(workers, port, threads)
+            base_url = f"http://127.0.0.1:{port}"
+            try:
+                wait_until_ready(base_url, workers)
+                asyncio.run(generate_load(base_url, urls, concurrency, concurrency))  # warm connections
+                results[f"{workers}_workers"] = stats = asyncio.run(
+                    generate_load(base_url, urls, num_requests, concurrency))
+            finally:
+                process.terminate()
+                process.wait()
+
+            print(f"{workers:>2} worker(s): {stats['requests_per_sec']:.1f} req/s | p50 {stats['p50_ms']:.0f} ms | "
+                  f"p99 {stats['p99_ms']:.0f} ms | errors {stats['errors']}")
+    finally:
+        image_server.shutdown()
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1],
+                        help="Worker counts to compare (default: 1 vs one per core)")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--threads", type=int, default=0, help="Intra-op threads per worker (default: cores // workers)")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--output", type=str, default=None, help="Optional JSON file for the results")
+    args = parser.parse_args()
+
+    results = run_serving_benchmark(args.workers, args.requests, args.concurrency, args.threads, args.port)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+
+# Throughput of single-worker vs multi-worker serving over real HTTP
+# python pipelines/serving_benchmark.py --workers 1 4 --requests 400 --concurrency 32
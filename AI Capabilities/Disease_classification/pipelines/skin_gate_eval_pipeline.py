@@ -0,0 +1,187 @@
+import sys
+import os
+import argparse
+import glob
+import json
+import time
+from collections import Counter
+
+import numpy as np
+import torch
+from PIL import Image, ImageDraw
+
+# Ensure the root project directory is in the path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, ".."))
+sys.path.insert(0, project_root)
+
+from src.utils.config import (
+    MODEL_PATH,
+    CONFIG_PATH,
+    SKIN_GATE_MIN_SKIN_FRACTION,
+    SKIN_GATE_MIN_CONTRAST,
+    SKIN_GATE_MAX_FLAT_FRACTION,
+)
+from src.utils.dataset_loader import get_dataset
+from src.utils.preprocessing import ImagePreprocessor, preprocess_image
+from src.utils.profiling import latency_summary
+from src.models.backends import TorchBackend, load_torch_model
+from src.models.skin_gate import SkinGate
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".bmp", ".gif", ".tif", ".tiff")
+
+def synthetic_non_skin_images(count, seed=0):
+    """
+    Stand-ins for the non-skin uploads seen in production: blank frames,
+    documents, app screenshots and outdoor photos. Returns (kind, image) pairs.
+    """
+    rng = np.random.default_rng(seed)
+    samples = []
+    for i in range(count):
+        kind = ("blank", "document", "screenshot", "outdoor")[i % 4]
+        if kind == "blank":
+            level = int(rng.integers(0, 256))
+            pixels = np.clip(level + rng.normal(0, 2, (480, 640, 3)), 0, 255).astype(np.uint8)
+            image = Image.fromarray(pixels)
+        elif kind == "document":
+            image = Image.new("RGB", (620, 880), "white")
+            draw = ImageDraw.Draw(image)
+            for line in range(40):
+                draw.text((40, 30 + line * 20), "Lorem ipsum dolor sit amet " * 3, fill=(20, 20, 20))
+        elif kind == "screenshot":
+            image = Image.new("RGB", (720, 1280), tuple(int(c) for c in rng.integers(200, 256, 3)))
+            draw = ImageDraw.Draw(image)
+            draw.rectangle((0, 0, 720, 120), fill=tuple(int(c) for c in rng.integers(0, 200, 3)))
+            for row in range(8):
+                top = 160 + row * 130
+                draw.rectangle((30, top, 690, top + 110), outline=(180, 180, 180), width=2)
+                draw.ellipse((50, top + 15, 130, top + 95), fill=tuple(int(c) for c in rng.integers(0, 256, 3)))
+                draw.text((150, top + 40), f"Message {row}", fill=(30, 30, 30))
+        else:
+            sky = np.linspace([90, 150, 230], [170, 210, 250], 240)[:, None, :]
+            grass = np.linspace([60, 140, 50], [30, 90, 30], 240)[:, None, :]
+            pixels = np.concatenate([sky, grass]).repeat(640, axis=1) + rng.normal(0, 12, (480, 640, 3))
+            image = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+        samples.append((kind, image))
+    return samples
+
+def load_folder_images(folder):
+    paths = sorted(p for p in glob.glob(os.path.join(folder, "**", "*"), recursive=True)
+                   if p.lower().endswith(IMAGE_EXTENSIONS))
+    return [("folder", Image.open(path).convert("RGB")) for path in paths]
+
+def run_gate(gate, images):
+    decisions, timings = [], []
+    for image in images:
+        start = time.perf_counter()
+        decisions.append(gate.check(image))
+        timings.append(time.perf_counter() - start)
+    return decisions, timings
+
+def time_forward(split, latency_samples):
+    # Single-image latency of the served model: what /predict pays for every image the gate lets through
+    device = torch.device("cpu")
+    backend = TorchBackend(load_torch_model(MODEL_PATH, CONFIG_PATH, device), device)
+    feature_extractor = ImagePreprocessor.from_config_file()
+    timings = []
+    for row in split.select(range(min(latency_samples, len(split)))):
+        pixel_values = preprocess_image([row["image"].convert("RGB")], feature_extractor)["pixel_values"]
+        start = time.perf_counter()
+        backend.logits(pixel_values)
+        timings.append(time.perf_counter() - start)
+    return latency_summary(timings)
+
+def run_skin_gate_eval_pipeline(data_dir, ood_dir, ood_count, ood_share, target_false_reject, latency_samples, output):
+    gate = SkinGate(SKIN_GATE_MIN_SKIN_FRACTION, SKIN_GATE_MIN_CONTRAST, SKIN_GATE_MAX_FLAT_FRACTION)
+    split = get_dataset(data_dir)["test"]
+    label_names = split.features["label"].names
+
+    # False rejects: real skin photos from the test split the gate turns away
+    skin_decisions, skin_timings = run_gate(gate, (row["image"].convert("RGB") for row in split))
+    labels = np.asarray(split["label"])
+    rejected = np.array([not decision["accepted"] for decision in skin_decisions])
+    per_class = {
+        name: float(rejected[labels == class_id].mean()) if (labels == class_id).any() else None
+        for class_id, name in enumerate(label_names)
+    }
+
+    # True rejects: non-skin images the gate catches
+    ood_samples = synthetic_non_skin_images(ood_count) + (load_folder_images(ood_dir) if ood_dir else [])
+    ood_decisions, ood_timings = run_gate(gate, [image for _, image in ood_samples])
+    caught = Counter()
+    totals = Counter(kind for kind, _ in ood_samples)
+    for (kind, _), decision in zip(ood_samples, ood_decisions):
+        caught[kind] += not decision["accepted"]
+
+    false_reject_rate = float(rejected.mean())
+    true_reject_rate = float(np.mean([not decision["accepted"] for decision in ood_decisions]))
+    gate_latency = latency_summary(skin_timings + ood_timings)
+    # --latency-samples 0 skips the model, so the false-reject figures need only the dataset
+    forward_latency = time_forward(split, latency_samples) if latency_samples else None
+
+    # Expected model time per request at `ood_share` non-skin traffic, with and without the gate
+    gate_ms = gate_latency["p50_ms"]
+    forward_ms = forward_latency["p50_ms"] if forward_latency else None
+    passed = ood_share * (1 - true_reject_rate) + (1 - ood_share) * (1 - false_reject_rate)
+    with_gate_ms = gate_ms + passed * forward_ms if forward_ms else None
+    skin_fractions = [decision["skin_fraction"] for decision in skin_decisions]
+
+    result = {
+        "thresholds": {
+            "min_skin_fraction": gate.min_skin_fraction,
+            "min_contrast": gate.min_contrast,
+            "max_flat_fraction": gate.max_flat_fraction,
+        },
+        "test_images": len(skin_decisions),
+        "false_reject_rate": false_reject_rate,
+        "false_reject_rate_per_class": per_class,
+        "false_reject_reasons": dict(Counter(d["reason"] for d in skin_decisions if not d["accepted"])),
+        "non_skin_images": len(ood_decisions),
+        "true_reject_rate": true_reject_rate,
+        "true_reject_rate_per_kind": {kind: caught[kind] / totals[kind] for kind in totals},
+        "gate_latency": gate_latency,
+        "forward_latency": forward_latency,
+        "ood_share": ood_share,
+        "model_ms_per_request": {"without_gate": forward_ms, "with_gate": with_gate_ms},
+        "compute_saved": 1 - with_gate_ms / forward_ms if forward_ms else None,
+        # min_skin_fraction at which `target_false_reject` of the test images would fail the skin check
+        "suggested_min_skin_fraction": float(np.quantile(skin_fractions, target_false_reject)) if skin_fractions else None,
+    }
+
+    print(f"False rejects on the test split: {false_reject_rate:.2%} of {len(skin_decisions)} "
+          f"{result['false_reject_reasons'] or ''}")
+    for name, rate in per_class.items():
+        print(f"  {name:<45} {'n/a' if rate is None else f'{rate:.2%}'}")
+    print(f"Non-skin images rejected: {true_reject_rate:.2%} of {len(ood_decisions)}")
+    for kind, rate in result["true_reject_rate_per_kind"].items():
+        print(f"  {kind:<45} {rate:.2%}")
+    if forward_ms:
+        print(f"Gate p50 {gate_ms:.2f} ms vs ViT forward p50 {forward_ms:.1f} ms per image")
+        print(f"At {ood_share:.0%} non-skin traffic: {forward_ms:.1f} → {with_gate_ms:.1f} ms of model time per request "
+              f"({result['compute_saved']:.1%} saved)")
+    else:
+        print(f"Gate p50 {gate_ms:.2f} ms per image (ViT latency not measured)")
+
+    if output:
+        with open(output, "w") as f:
+            json.dump(result, f, indent=2)
+    return result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data-dir", type=str, default=None, help="Local dataset copy (defaults to the Hub dataset)")
+    parser.add_argument("--ood-dir", type=str, default=None, help="Folder of real non-skin images to add to the synthetic ones")
+    parser.add_argument("--ood-count", type=int, default=200, help="Synthetic non-skin images to generate")
+    parser.add_argument("--ood-share", type=float, default=0.2, help="Share of non-skin uploads assumed for the savings estimate")
+    parser.add_argument("--target-false-reject", type=float, default=0.01)
+    parser.add_argument("--latency-samples", type=int, default=32, help="0 skips timing the ViT (no weights needed)")
+    parser.add_argument("--output", type=str, default=None, help="Optional JSON report path")
+    args = parser.parse_args()
+    run_skin_gate_eval_pipeline(args.data_dir, args.ood_dir, args.ood_count, args.ood_share,
+                                args.target_false_reject, args.latency_samples, args.output)
+
+
+
+# Measure the skin gate: false rejects on the test split, non-skin catch rate, compute saved
+# python pipelines/skin_gate_eval_pipeline.py --output skin_gate.json
+# Tune it with SKIN_GATE_MIN_SKIN_FRACTION / SKIN_GATE_MIN_CONTRAST / SKIN_GATE_MAX_FLAT_FRACTION
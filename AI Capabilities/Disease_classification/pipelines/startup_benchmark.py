@@ -0,0 +1,88 @@
+import sys
+import os
+import time
+import argparse
+import json
+import subprocess
+
+# Ensure the root project directory is in the path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, ".."))
+sys.path.insert(0, project_root)
+
+from src.utils.profiling import peak_rss_mb
+
+def start_current():
+    from src.models import classifier
+    classifier.load_model()
+
+def start_legacy():
+    # The pre-offline startup path: Hub feature extractor + Hub base checkpoint,
+    # whose weights are then overwritten by the fine-tuned safetensors file
+    import torch
+    from transformers import ViTForImageClassification, ViTFeatureExtractor
+    from safetensors.torch import safe_open
+    from src.utils.config import MODEL_PATH, id2label
+
+    ViTFeatureExtractor.from_pretrained("google/vit-base-patch16-224-in21k")
+    model = ViTForImageClassification.from_pretrained("google/vit-base-patch16-224-in21k", num_labels=len(id2label))
+    with safe_open(MODEL_PATH, framework="pt", device="cpu") as f:
+        model_weights = {k: f.get_tensor(k) for k in f.keys()}
+    model.load_state_dict(model_weights, strict=False)
+    model.eval()
+
+def run_child(mode):
+    start = time.perf_counter()
+    {"current": start_current, "legacy": start_legacy}[mode]()
+    print(json.dumps({"mode": mode, "ready_seconds": time.perf_counter() - start, "peak_rss_mb": peak_rss_mb()}))
+
+def run_startup_benchmark(modes, repeats):
+    results = {}
+    for mode in modes:
+        runs = []
+        for _ in range(repeats):
+            # A fresh interpreter per run, so imports and page cache effects are those of a new pod
+            start = time.perf_counter()
+            completed = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child", mode],
+                cwd=project_root, capture_output=True, text=True,
+            )
+            if completed.returncode != 0:
+                print(f"❌ {mode} startup failed:\n{completed.stderr[-2000:]}")
+                break
+            run = json.loads(completed.stdout.strip().splitlines()[-1])
+            run["process_seconds"] = time.perf_counter() - start
+            runs.append(run)
+        if not runs:
+            continue
+
+        results[mode] = {
+            "ready_seconds": min(run["ready_seconds"] for run in runs),
+            "process_seconds": min(run["process_seconds"] for run in runs),
+            "peak_rss_mb": max(run["peak_rss_mb"] for run in runs),
+            "runs": runs,
+        }
+        print(f"{mode:>8}: model ready in {results[mode]['ready_seconds']:.2f}s "
+              f"(process {results[mode]['process_seconds']:.2f}s) | peak RSS {results[mode]['peak_rss_mb']:.0f} MB")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--modes", nargs="+", default=["legacy", "current"], choices=["legacy", "current"])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output", type=str, default=None, help="Optional JSON file for the results")
+    parser.add_argument("--child", type=str, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child)
+    else:
+        results = run_startup_benchmark(args.modes, args.repeats)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(results, f, indent=2)
+
+
+
+# Cold-start time and peak RSS of the old Hub-based startup vs the offline loader
+# python pipelines/startup_benchmark.py --repeats 3
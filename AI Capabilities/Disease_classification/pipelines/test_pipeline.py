@@ -6,6 +6,18 @@ def run_test_pipeline():
     subprocess.run(["pytest", "tests/test_classifier.py"])
     subprocess.run(["pytest", "tests/test_trainer.py"])
     subprocess.run(["pytest", "tests/test_preprocessing.py"])
+    subprocess.run(["pytest", "tests/test_batching.py"])
+    subprocess.run(["pytest", "tests/test_fetcher.py"])
+    subprocess.run(["pytest", "tests/test_backends.py"])
+    subprocess.run(["pytest", "tests/test_evaluation.py"])
+    subprocess.run(["pytest", "tests/test_prediction_cache.py"])
+    subprocess.run(["pytest", "tests/test_bulk_inference.py"])
+    subprocess.run(["pytest", "tests/test_metrics.py"])
+    subprocess.run(["pytest", "tests/test_admission.py"])
+    subprocess.run(["pytest", "tests/test_feature_cache.py"])
+    subprocess.run(["pytest", "tests/test_distillation.py"])
+    subprocess.run(["pytest", "tests/test_registry.py"])
+    subprocess.run(["pytest", "tests/test_skin_gate.py"])
 
 if __name__ == "__main__":
     run_test_pipeline()
@@ -1,19 +1,33 @@
 import sys
 import os
+import argparse
 
 # Ensure the root project directory is in the path
 current_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.abspath(os.path.join(current_dir, ".."))
 sys.path.insert(0, project_root)
 
-from src.models.trainer import train_model
+from src.models.trainer import train_model, PRECISIONS
 
-def run_training_pipeline():
-    train_model()
+def run_training_pipeline(data_dir=None, num_workers=4, cache_resized=False, augment=False, precision="auto"):
+    train_model(data_dir=data_dir, num_workers=num_workers, cache_resized=cache_resized, augment=augment,
+                precision=precision)
 
 if __name__ == "__main__":
-    run_training_pipeline()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data-dir", type=str, default=None, help="Local dataset copy (defaults to the Hub dataset)")
+    parser.add_argument("--workers", type=int, default=4, help="DataLoader worker processes")
+    parser.add_argument("--cache-resized", action="store_true",
+                        help="Decode and resize every image once into a uint8 Arrow cache")
+    parser.add_argument("--augment", action="store_true", help="Add random horizontal flips (off in the original recipe)")
+    parser.add_argument("--precision", type=str, choices=PRECISIONS, default="auto",
+                        help="auto: fp16 on CUDA, bf16 on CPUs with native bf16, fp32 otherwise")
+    args = parser.parse_args()
+    run_training_pipeline(args.data_dir, args.workers, args.cache_resized, args.augment, args.precision)
 
 
 # Run Training
 # python pipelines/train_pipeline.py
+# python pipelines/train_pipeline.py --cache-resized --workers 8
+# CPU build box: bf16 where the CPU supports it, fp32 otherwise
+# python pipelines/train_pipeline.py --precision bf16
@@ -1,30 +1,366 @@
-from fastapi import APIRouter, File, UploadFile, HTTPException, Form
-from PIL import Image
-from io import BytesIO
-from src.models.classifier import predict_disease_from_bytes
-from pydantic import BaseModel
-import requests
+import asyncio
+import hmac
+from contextlib import asynccontextmanager
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import JSONResponse, Response
+from src.models import classifier
+from src.models.classifier import predict_disease_async, predict_images, ModelNotReadyError
+from src.utils.config import (
+    FETCH_CONNECT_TIMEOUT,
+    FETCH_READ_TIMEOUT,
+    FETCH_TOTAL_TIMEOUT,
+    FETCH_MAX_BYTES,
+    FETCH_MAX_CONNECTIONS,
+    FETCH_CACHE_DIR,
+    FETCH_CACHE_MAX_BYTES,
+    FETCH_CACHE_TTL_S,
+    DECODE_MAX_PIXELS,
+    DECODE_MAX_DIMENSION,
+    BATCH_REQUEST_MAX_ITEMS,
+    MAX_CONCURRENT_REQUESTS,
+    ADMISSION_QUEUE_SIZE,
+    ADMISSION_QUEUE_TIMEOUT_S,
+    ADMISSION_RETRY_AFTER_S,
+    REQUEST_DEFAULT_TIMEOUT_S,
+    ADMIN_TOKEN,
+    SKIN_GATE_ENABLED,
+    SKIN_GATE_MIN_SKIN_FRACTION,
+    SKIN_GATE_MIN_CONTRAST,
+    SKIN_GATE_MAX_FLAT_FRACTION,
+)
+from src.utils.fetcher import ImageFetcher, ImageFetchError
+from src.utils.preprocessing import decode_image, ImageTooLargeError
+from src.utils.uploads import read_image_upload, read_image_uploads, decode_upload
+from src.models.skin_gate import SkinGate
+from src.utils.metrics import time_stage, track_request, record_error, render_metrics, GATE_DECISIONS
+from src.utils.admission import AdmissionController, AdmissionRejected, request_deadline
+from pydantic import BaseModel, ValidationError
 
 router = APIRouter()
 
+# Shared keep-alive client for every image download
+image_fetcher = ImageFetcher(
+    connect_timeout=FETCH_CONNECT_TIMEOUT,
+    read_timeout=FETCH_READ_TIMEOUT,
+    total_timeout=FETCH_TOTAL_TIMEOUT,
+    max_bytes=FETCH_MAX_BYTES,
+    max_connections=FETCH_MAX_CONNECTIONS,
+    cache_dir=FETCH_CACHE_DIR,
+    cache_max_bytes=FETCH_CACHE_MAX_BYTES,
+    cache_ttl=FETCH_CACHE_TTL_S,
+)
+
+# Caps concurrent inference work in this worker and sheds the excess early
+admission = AdmissionController(
+    max_concurrency=MAX_CONCURRENT_REQUESTS,
+    max_queue=ADMISSION_QUEUE_SIZE,
+    queue_timeout_s=ADMISSION_QUEUE_TIMEOUT_S,
+    retry_after_s=ADMISSION_RETRY_AFTER_S,
+)
+
+# Turns away images that are clearly not skin photos before they cost a forward pass
+skin_gate = SkinGate(
+    min_skin_fraction=SKIN_GATE_MIN_SKIN_FRACTION,
+    min_contrast=SKIN_GATE_MIN_CONTRAST,
+    max_flat_fraction=SKIN_GATE_MAX_FLAT_FRACTION,
+) if SKIN_GATE_ENABLED else None
+
 # 🔸 Request schema
 class ImageURLRequest(BaseModel):
     image_url: str
 
+class BatchImageURLRequest(BaseModel):
+    image_urls: List[str]
+
+class ModelReloadRequest(BaseModel):
+    model_path: Optional[str] = None
+    config_path: Optional[str] = None
+
+def require_model():
+    if not classifier.is_ready():
+        raise HTTPException(status_code=503, detail="Model is still loading", headers={"Retry-After": "5"})
+
+@asynccontextmanager
+async def admit(http_request: Request):
+    """
+    Holds an admission slot for the handler body; rejected requests get a fast
+    429/503 with Retry-After instead of queueing behind the forward passes.
+    """
+    try:
+        async with admission.slot(http_request, request_deadline(http_request, REQUEST_DEFAULT_TIMEOUT_S)) as ticket:
+            yield ticket
+    except AdmissionRejected as e:
+        record_error("admission", e)
+        raise HTTPException(status_code=e.status_code, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+async def skip_if_abandoned(ticket):
+    # The caller has timed out or hung up: nobody will read the answer, so skip the forward pass
+    if await ticket.abandoned():
+        error = AdmissionRejected("Request deadline exceeded", status_code=504)
+        record_error("admission", error)
+        raise HTTPException(status_code=504, detail=str(error))
+
+@router.get("/")
+def home():
+    return {"message": "Welcome to the Skin Disease Classification API"}
+
+@router.get("/health")
+def health():
+    # Liveness: the process is up, whether or not the model has loaded
+    return {"status": "ok"}
+
+@router.get("/ready")
+def ready():
+    # Readiness: only true once the weights are loaded and warmed up
+    if not classifier.is_ready():
+        return JSONResponse(status_code=503, content={"status": "loading", **classifier.load_stats})
+    return {"status": "ready", **classifier.load_stats}
+
+@router.get("/metrics")
+def metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, headers={"Content-Type": content_type})
+
+def timed_decode(image_bytes: bytes):
+    with time_stage("decode"):
+        return decode_image(image_bytes, max_pixels=DECODE_MAX_PIXELS, max_dimension=DECODE_MAX_DIMENSION)
+
+def require_admin(http_request: Request):
+    token = http_request.headers.get("x-admin-token", "")
+    if not ADMIN_TOKEN or not hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Model reloads need a valid X-Admin-Token")
+
+# The background reload in progress, if any
+reload_task = None
+
+@router.get("/admin/model")
+def model_info():
+    # Served version with its load timings, versions still finishing requests, and the last reload
+    return {**classifier.registry.describe(), "reload": dict(classifier.reload_status)}
+
+@router.post("/admin/model/reload", status_code=202)
+async def reload_model(http_request: Request, request: Optional[ModelReloadRequest] = None):
+    """
+    Loads and warms up a new model version in the background, then swaps it
+    in. Poll GET /admin/model for the outcome.
+    """
+    global reload_task
+    require_admin(http_request)
+    if reload_task is not None and not reload_task.done():
+        raise HTTPException(status_code=409, detail="A model reload is already in progress")
+
+    request = request or ModelReloadRequest()
+    reload_task = asyncio.create_task(asyncio.to_thread(classifier.reload_model, request.model_path, request.config_path))
+    # Failures are reported through /admin/model; this only keeps them out of the "never retrieved" log
+    reload_task.add_done_callback(lambda task: task.cancelled() or task.exception())
+    active = classifier.registry.active
+    return {"status": "loading", "model_version": active.version if active is not None else None}
+
+def timed_upload_decode(upload):
+    with time_stage("decode"):
+        return decode_upload(upload, DECODE_MAX_PIXELS, DECODE_MAX_DIMENSION)
+
+def gate_images(images: list) -> list:
+    """
+    Skin-gate decision per image; None for every image when the gate is disabled.
+    """
+    if skin_gate is None:
+        return [None] * len(images)
+    decisions = []
+    for image in images:
+        with time_stage("gate"):
+            decision = skin_gate.check(image)
+        GATE_DECISIONS.labels("accepted" if decision["accepted"] else decision["reason"]).inc()
+        decisions.append(decision)
+    return decisions
+
+def is_rejected(decision) -> bool:
+    return decision is not None and not decision["accepted"]
+
+def not_skin_detail(decision: dict) -> dict:
+    return {"status": "not_skin", "reason": decision["reason"], "message": "The image does not look like a skin photo"}
+
+def decode_error(error: Exception) -> HTTPException:
+    if isinstance(error, ImageTooLargeError):
+        return HTTPException(status_code=413, detail=str(error))
+    return HTTPException(status_code=400, detail=f"Could not decode image: {str(error)}")
+
+async def timed_fetch(url: str):
+    with time_stage("fetch"):
+        return await image_fetcher.fetch(url)
+
 @router.post("/predict")
-def predict_from_url(request: ImageURLRequest):
+async def predict_from_url(request: ImageURLRequest, http_request: Request):
+    require_model()
+    with track_request("predict"):
+        async with admit(http_request) as ticket:
+            return await run_prediction(request.image_url, ticket)
+
+async def run_prediction(image_url: str, ticket):
+    # Step 1: Download image from Cloudinary
+    try:
+        image_bytes = await timed_fetch(image_url)
+    except ImageFetchError as e:
+        record_error("fetch", e)
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+    # Step 2: Decode; anything failing here is a bad image, not a server error
     try:
-        # Step 1: Download image from Cloudinary
-        response = requests.get(request.image_url)
-        if response.status_code != 200:
-            raise HTTPException(status_code=400, detail="Failed to fetch image from URL")
+        image = await asyncio.to_thread(timed_decode, image_bytes)
+    except Exception as e:
+        record_error("decode", e)
+        raise decode_error(e)
 
-        image = Image.open(BytesIO(response.content)).convert("RGB")
+    # Step 3: Gate and run prediction, unless the caller is no longer waiting for it
+    return await run_predict_step(image, ticket)
 
-        # Step 2: Run prediction
-        result = predict_disease_from_bytes(image)
-        return result
+async def run_predict_step(image, ticket):
+    # Images that are clearly not skin photos never reach the model (or the LLM after it)
+    decision = (await asyncio.to_thread(gate_images, [image]))[0]
+    if is_rejected(decision):
+        raise HTTPException(status_code=422, detail=not_skin_detail(decision))
 
+    await skip_if_abandoned(ticket)
+    try:
+        return await predict_disease_async(image)
+    except ModelNotReadyError as e:
+        record_error("predict", e)
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
+        record_error("predict", e)
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
 
+@router.post("/predict/upload")
+async def predict_from_upload(http_request: Request):
+    """
+    Classifies an image sent in the request body itself, skipping the
+    Cloudinary upload and download. Takes a multipart `file` part, or a bare
+    image body (JPEG, PNG, WebP, BMP, GIF, TIFF or image/x-raw-rgb pixels).
+    """
+    require_model()
+    with track_request("predict_upload"):
+        # Step 1: Read the body as it streams in, before taking a slot, so a slow
+        # client uploading over the WAN doesn't hold one; nothing is spooled to disk
+        try:
+            with time_stage("upload"):
+                upload = await read_image_upload(http_request, FETCH_MAX_BYTES, classifier.feature_extractor.size)
+        except ImageFetchError as e:
+            record_error("upload", e)
+            raise HTTPException(status_code=e.status_code, detail=str(e))
+
+        async with admit(http_request) as ticket:
+            return await run_upload_prediction(upload, ticket)
+
+async def run_upload_prediction(upload, ticket):
+    # Step 2: Decode (raw 224x224 pixels skip both decoding and resizing)
+    try:
+        image = await asyncio.to_thread(timed_upload_decode, upload)
+    except Exception as e:
+        record_error("decode", e)
+        raise decode_error(e)
+
+    # Step 3: Run prediction
+    return await run_predict_step(image, ticket)
+
+async def load_url_item(url: str):
+    try:
+        image_bytes = await timed_fetch(url)
+    except ImageFetchError as e:
+        record_error("fetch", e)
+        raise
+    return await decode_item(image_bytes)
+
+async def load_upload_item(upload):
+    if upload.too_large:
+        error = ImageFetchError("Image exceeds the maximum allowed size", status_code=413)
+        record_error("fetch", error)
+        raise error
+    return await decode_item(upload.data)
+
+async def decode_item(image_bytes: bytes):
+    try:
+        return await asyncio.to_thread(timed_decode, image_bytes)
+    except Exception as e:
+        record_error("decode", e)
+        raise
+
+async def read_batch_items(request: Request):
+    """
+    Returns (sources, items) for a JSON body of image URLs or a multipart form
+    with one or more `files` parts; items are the URLs or the uploaded parts.
+    Multipart bodies are parsed as they stream in and refused with 413 once
+    they pass BATCH_REQUEST_MAX_ITEMS images of FETCH_MAX_BYTES each.
+    """
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        try:
+            with time_stage("upload"):
+                uploads = await read_image_uploads(request, FETCH_MAX_BYTES, BATCH_REQUEST_MAX_ITEMS)
+        except ImageFetchError as e:
+            record_error("upload", e)
+            raise HTTPException(status_code=e.status_code, detail=str(e))
+        return [upload.filename for upload in uploads], uploads
+
+    try:
+        body = BatchImageURLRequest(**await request.json())
+    except (ValueError, TypeError, ValidationError):
+        raise HTTPException(status_code=422, detail="Expected a JSON body with `image_urls` or multipart `files`")
+    return body.image_urls, body.image_urls
+
+@router.post("/predict/batch")
+async def predict_batch_endpoint(request: Request):
+    require_model()
+    with track_request("predict_batch"):
+        # The body is read before taking a slot, so slow uploads don't hold one
+        sources, items = await read_batch_items(request)
+        if not sources:
+            raise HTTPException(status_code=400, detail="No images provided")
+        if len(sources) > BATCH_REQUEST_MAX_ITEMS:
+            raise HTTPException(status_code=413, detail=f"At most {BATCH_REQUEST_MAX_ITEMS} images per batch")
+        async with admit(request) as ticket:
+            return await run_batch_prediction(sources, items, ticket)
+
+async def run_batch_prediction(sources: list, items: list, ticket):
+    # Step 1: Download / read and decode every image concurrently
+    loaders = [load_url_item(item) if isinstance(item, str) else load_upload_item(item) for item in items]
+    loaded = await asyncio.gather(*loaders, return_exceptions=True)
+
+    results = [None] * len(sources)
+    images, image_indices = [], []
+    for i, (source, item) in enumerate(zip(sources, loaded)):
+        if isinstance(item, asyncio.CancelledError):
+            # A cancelled load (shutdown, or the request itself being cancelled) is not an image error
+            raise item
+        if isinstance(item, ImageFetchError):
+            results[i] = {"source": source, "status": "error", "status_code": item.status_code, "error": str(item)}
+        elif isinstance(item, BaseException):
+            error = decode_error(item)
+            results[i] = {"source": source, "status": "error", "status_code": error.status_code, "error": error.detail}
+        else:
+            images.append(item)
+            image_indices.append(i)
+
+    # Step 2: Drop images the skin gate rejects
+    decisions = await asyncio.to_thread(gate_images, images)
+    for i, decision in zip(image_indices, decisions):
+        if is_rejected(decision):
+            results[i] = {"source": sources[i], "status_code": 422, **not_skin_detail(decision)}
+    images = [image for image, decision in zip(images, decisions) if not is_rejected(decision)]
+    image_indices = [i for i, decision in zip(image_indices, decisions) if not is_rejected(decision)]
+
+    # Step 3: One batched forward pass over every remaining image
+    if images:
+        await skip_if_abandoned(ticket)
+        try:
+            predictions = await asyncio.to_thread(predict_images, images)
+        except ModelNotReadyError as e:
+            record_error("predict", e)
+            raise HTTPException(status_code=503, detail=str(e))
+        except Exception as e:
+            record_error("predict", e)
+            raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
+        for i, prediction in zip(image_indices, predictions):
+            results[i] = {"source": sources[i], "status": "ok", **prediction}
+
+    return {"results": results}
@@ -1,7 +1,28 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from src.api.endpoints import router
+from src.api.endpoints import router, image_fetcher
+from src.models import classifier
 
-app = FastAPI()
+logger = logging.getLogger(__name__)
+
+async def load_classifier():
+    # Runs in the background so /health and /ready answer while the weights load
+    try:
+        await asyncio.to_thread(classifier.load_model)
+    except Exception as e:
+        classifier.load_stats["error"] = str(e)
+        logger.exception("Classifier failed to load")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    loading = asyncio.create_task(load_classifier())
+    yield
+    loading.cancel()
+    await image_fetcher.aclose()
+
+app = FastAPI(lifespan=lifespan)
 
 app.include_router(router)
 
@@ -0,0 +1,209 @@
+import hashlib
+import io
+import json
+import os
+import logging
+import numpy as np
+import torch
+from torch import nn
+from transformers import ViTConfig, ViTForImageClassification
+from safetensors.torch import load_file, save_file
+
+logger = logging.getLogger(__name__)
+
+
+def load_torch_model(model_path: str, config_path: str, device: torch.device) -> ViTForImageClassification:
+    """
+    Builds the ViT classifier from the local config.json and loads the
+    fine-tuned weights from safetensors, without touching the network.
+
+    The architecture is created on the meta device, so no weights are allocated
+    or randomly initialized. The memory-mapped safetensors tensors are then
+    assigned to it directly.
+    """
+    config = ViTConfig.from_json_file(config_path)
+    with torch.device("meta"):
+        model = ViTForImageClassification(config)
+
+    model_weights = load_file(model_path, device="cpu")
+    missing, unexpected = model.load_state_dict(model_weights, strict=False, assign=True)
+    if missing:
+        raise RuntimeError(f"{model_path} is missing weights for: {', '.join(missing)}")
+    if unexpected:
+        logger.warning(f"Ignoring unexpected weights in {model_path}: {', '.join(unexpected)}")
+
+    model.to(device)
+    model.eval()
+    return model
+
+
+def save_torch_model(model: ViTForImageClassification, output_dir: str) -> str:
+    """
+    Writes `config.json` + `model.safetensors`, the layout load_torch_model()
+    reads, so a retrained model is served with CONFIG_PATH / MODEL_PATH
+    pointing at `output_dir`. Returns the weights path.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    model.config.to_json_file(os.path.join(output_dir, "config.json"))
+    model_path = os.path.join(output_dir, "model.safetensors")
+    save_file({name: tensor.detach().cpu().contiguous() for name, tensor in model.state_dict().items()}, model_path)
+    return model_path
+
+
+def artifact_version(path: str, backend_name: str, config_path: str = None) -> str:
+    """
+    Identifies a served model by its backend and a content hash of the weights
+    file and its config.json, so anything keyed by it changes whenever the
+    model is swapped, including when only the label names change.
+    """
+    digest = hashlib.sha256()
+    for file_path in (path, config_path):
+        if file_path is None:
+            continue
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+    return f"{backend_name}-{digest.hexdigest()[:12]}"
+
+
+def read_id2label(config_path: str) -> dict:
+    """
+    Class id (as a string) to label name, from a model's config.json.
+    """
+    with open(config_path) as f:
+        return {str(class_id): label for class_id, label in json.load(f)["id2label"].items()}
+
+
+def quantize_int8(model: nn.Module) -> nn.Module:
+    """
+    Dynamic INT8 quantization of every Linear layer (weights stored as int8,
+    activations quantized on the fly). CPU only.
+    """
+    model = model.cpu().eval()
+    return torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+def model_size_mb(model: nn.Module) -> float:
+    """
+    Serialized size of the model's state dict, a proxy for its resident weight memory.
+    """
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.getbuffer().nbytes / (1024 * 1024)
+
+
+def cpu_supports_bf16() -> bool:
+    """
+    True when the CPU has native bfloat16 instructions (AVX512-BF16 or AMX).
+    Elsewhere bf16 is emulated and slower than fp32.
+    """
+    try:
+        with open("/proc/cpuinfo") as f:
+            flags = f.read()
+    except OSError:
+        return False
+    return torch.backends.mkldnn.is_available() and ("avx512_bf16" in flags or "amx_bf16" in flags)
+
+
+class TorchBackend:
+    """
+    Eager PyTorch inference. With `autocast_dtype` (e.g. torch.bfloat16) the
+    forward pass runs under autocast while the weights stay fp32; logits are
+    always returned as fp32. `channels_last` stores the input and the patch
+    embedding convolution in NHWC.
+    """
+
+    def __init__(self, model: nn.Module, device: torch.device, name: str = "torch", autocast_dtype=None,
+                 channels_last: bool = False):
+        self.model = model
+        self.device = device
+        self.name = name
+        self.autocast_dtype = autocast_dtype
+        self.channels_last = channels_last
+        if channels_last:
+            model.to(memory_format=torch.channels_last)
+
+    @property
+    def id2label(self) -> dict:
+        return {str(class_id): label for class_id, label in self.model.config.id2label.items()}
+
+    def logits(self, pixel_values: torch.Tensor) -> torch.Tensor:
+        pixel_values = pixel_values.to(self.device)
+        if self.channels_last:
+            pixel_values = pixel_values.contiguous(memory_format=torch.channels_last)
+        with torch.inference_mode(), torch.autocast(self.device.type, dtype=self.autocast_dtype,
+                                                    enabled=self.autocast_dtype is not None):
+            return self.model(pixel_values=pixel_values).logits.float().cpu()
+
+
+class OnnxBackend:
+    """
+    ONNX Runtime inference with all graph optimizations enabled. The graph
+    carries no label names, so they are read from `config_path` if given.
+    """
+
+    name = "onnx"
+
+    def __init__(self, onnx_path: str, num_threads: int = 0, config_path: str = None):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+
+        self.session = ort.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+        self.id2label = read_id2label(config_path) if config_path else None
+
+    def logits(self, pixel_values: torch.Tensor) -> torch.Tensor:
+        inputs = {self.input_name: pixel_values.detach().cpu().numpy().astype(np.float32, copy=False)}
+        (logits,) = self.session.run(["logits"], inputs)
+        return torch.from_numpy(logits)
+
+
+class _LogitsOnly(nn.Module):
+    # ONNX export needs a plain tensor output instead of a ModelOutput
+    def __init__(self, model: nn.Module):
+        super().__init__()
+        self.model = model
+
+    def forward(self, pixel_values):
+        return self.model(pixel_values=pixel_values).logits
+
+
+def export_onnx(model: nn.Module, onnx_path: str, image_size: int = 224, opset: int = 17):
+    """
+    Exports the classifier to ONNX with a dynamic batch dimension.
+    """
+    model = model.cpu().eval()
+    dummy = torch.randn(2, 3, image_size, image_size)
+    with torch.no_grad():
+        torch.onnx.export(
+            _LogitsOnly(model),
+            (dummy,),
+            onnx_path,
+            input_names=["pixel_values"],
+            output_names=["logits"],
+            dynamic_axes={"pixel_values": {0: "batch"}, "logits": {0: "batch"}},
+            opset_version=opset,
+        )
+
+
+def check_parity(reference, candidate, pixel_values: torch.Tensor, atol: float = 1e-3) -> dict:
+    """
+    Compares the logits of two backends on the same inputs.
+    """
+    expected = reference.logits(pixel_values).float()
+    actual = candidate.logits(pixel_values).float()
+
+    max_abs_diff = (expected - actual).abs().max().item()
+    top1_agreement = (expected.argmax(dim=1) == actual.argmax(dim=1)).float().mean().item()
+    return {
+        "reference": reference.name,
+        "candidate": candidate.name,
+        "max_abs_diff": max_abs_diff,
+        "top1_agreement": top1_agreement,
+        "atol": atol,
+        "passed": max_abs_diff <= atol and top1_agreement == 1.0,
+    }
@@ -0,0 +1,252 @@
+import csv
+import glob
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import torch
+
+from src.utils.preprocessing import decode_image
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".bmp", ".gif", ".tif", ".tiff"}
+SOURCE_KEYS = ("source", "path", "url", "image", "image_url")
+
+
+def _manifest_row(row: dict, line_number: int) -> dict:
+    source = next((row[key] for key in SOURCE_KEYS if row.get(key)), None)
+    if source is None:
+        raise ValueError(f"Manifest row {line_number} has none of the columns {SOURCE_KEYS}")
+    return {"id": str(row.get("id") or source), "source": source}
+
+
+def iter_sources(input_spec: str):
+    """
+    Yields {"id", "source"} for every image referenced by `input_spec`, which can be:
+    a directory (searched recursively), a glob pattern, a CSV or JSONL manifest with a
+    source/path/url/image column (and an optional id column), or a single image path/URL.
+    """
+    if os.path.isdir(input_spec):
+        for root, _, files in sorted(os.walk(input_spec)):
+            for name in sorted(files):
+                if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS:
+                    path = os.path.join(root, name)
+                    yield {"id": path, "source": path}
+    elif input_spec.endswith(".csv"):
+        with open(input_spec, newline="") as f:
+            for line_number, row in enumerate(csv.DictReader(f), start=2):
+                yield _manifest_row(row, line_number)
+    elif input_spec.endswith(".jsonl"):
+        with open(input_spec) as f:
+            for line_number, line in enumerate(f, start=1):
+                if line.strip():
+                    yield _manifest_row(json.loads(line), line_number)
+    elif any(char in input_spec for char in "*?["):
+        for path in sorted(glob.glob(input_spec, recursive=True)):
+            yield {"id": path, "source": path}
+    else:
+        yield {"id": input_spec, "source": input_spec}
+
+
+def _is_complete(row: dict, model_version: str) -> bool:
+    # Failed items are retried, and results of another model version are redone
+    return row.get("error") is None and row.get("model_version") == model_version
+
+
+class JsonlResultWriter:
+    """
+    Appends one JSON line per result; the file doubles as the resume checkpoint.
+    An id retried on a later run gets a new line, and its last line wins.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "a")
+
+    def completed_ids(self, model_version: str) -> set:
+        # Last row per id wins, so an item that succeeded once stays done until a model change
+        latest = {}
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                    latest[row["id"]] = row
+                except (ValueError, KeyError):
+                    # A line cut short by a crash; that item is simply redone
+                    continue
+        return {item_id for item_id, row in latest.items() if _is_complete(row, model_version)}
+
+    def write(self, rows: list):
+        self._file.write("".join(json.dumps(row) + "\n" for row in rows))
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetResultWriter:
+    """
+    Writes results as numbered part files in a directory, so a resumed run adds
+    new parts instead of rewriting old ones. Buffered rows are written out every
+    `rows_per_file` rows or `flush_interval_s` seconds, whichever comes first, so
+    a crash loses at most that much finished work.
+    """
+
+    def __init__(self, directory: str, rows_per_file: int = 1000, flush_interval_s: float = 30.0):
+        import pyarrow  # noqa: F401  fail fast when pyarrow is missing
+
+        self.directory = directory
+        self.rows_per_file = rows_per_file
+        self.flush_interval_s = flush_interval_s
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        os.makedirs(directory, exist_ok=True)
+
+    def _parts(self):
+        return sorted(glob.glob(os.path.join(self.directory, "part-*.parquet")))
+
+    def completed_ids(self, model_version: str) -> set:
+        import pyarrow.parquet as pq
+
+        # Parts are numbered in write order, so later rows replace earlier ones
+        latest = {}
+        for part in self._parts():
+            for row in pq.read_table(part, columns=["id", "model_version", "error"]).to_pylist():
+                latest[row["id"]] = row
+        return {item_id for item_id, row in latest.items() if _is_complete(row, model_version)}
+
+    def write(self, rows: list):
+        self._buffer.extend(rows)
+        if len(self._buffer) >= self.rows_per_file or time.monotonic() - self._last_flush >= self.flush_interval_s:
+            self._flush()
+
+    def _flush(self):
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        path = os.path.join(self.directory, f"part-{len(self._parts()):05d}.parquet")
+        columns = ["id", "source", "prediction", "confidence", "model_version", "error"]
+        table = pa.table({column: [row.get(column) for row in self._buffer] for column in columns})
+        pq.write_table(table, path + ".tmp")
+        os.replace(path + ".tmp", path)
+        self._buffer = []
+
+    def close(self):
+        self._flush()
+
+
+def open_writer(output: str, output_format: str = None):
+    output_format = output_format or ("parquet" if output.endswith(".parquet") else "jsonl")
+    if output_format == "parquet":
+        return ParquetResultWriter(output)
+    return JsonlResultWriter(output)
+
+
+def read_source(source: str, http_client=None, max_bytes: int = 20 * 1024 * 1024) -> bytes:
+    if source.startswith(("http://", "https://")):
+        # Streamed with a running count, so an oversized body is dropped before it is all in memory
+        with http_client.stream("GET", source) as response:
+            response.raise_for_status()
+            content_length = response.headers.get("content-length")
+            if content_length is not None and content_length.isdigit() and int(content_length) > max_bytes:
+                raise ValueError("Image exceeds the maximum allowed size")
+            chunks = []
+            received = 0
+            for chunk in response.iter_bytes():
+                received += len(chunk)
+                if received > max_bytes:
+                    raise ValueError("Image exceeds the maximum allowed size")
+                chunks.append(chunk)
+            return b"".join(chunks)
+    with open(source, "rb") as f:
+        if os.fstat(f.fileno()).st_size > max_bytes:
+            raise ValueError("Image exceeds the maximum allowed size")
+        return f.read()
+
+
+def _load_item(item, preprocessor, http_client):
+    try:
+        image = decode_image(read_source(item["source"], http_client))
+        return item, preprocessor.resize(image), None
+    except Exception as e:
+        return item, None, f"{type(e).__name__}: {e}"
+
+
+def _batches(items, batch_size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def run_bulk_inference(sources, backend, preprocessor, writer, id2label, model_version,
+                       batch_size=32, num_workers=8, prefetch=2, http_client=None, log_every=1000):
+    """
+    Classifies every source without a successful `model_version` result in the
+    writer's output: failed items are retried, and rows of another model
+    version are redone.
+
+    Decoding and resizing run in a thread pool and are prefetched `prefetch`
+    batches ahead, so the pool keeps working while the model runs a batched
+    forward pass over the previous batch. Failed items are written with an error
+    instead of stopping the run.
+    """
+    completed = writer.completed_ids(model_version)
+    pending = (item for item in sources if item["id"] not in completed)
+
+    stats = {"skipped": len(completed), "processed": 0, "failed": 0}
+    start = time.perf_counter()
+
+    try:
+        with ThreadPoolExecutor(max_workers=num_workers) as pool:
+            in_flight = deque()
+            batches = _batches(pending, batch_size)
+
+            def submit_next():
+                batch = next(batches, None)
+                if batch is not None:
+                    in_flight.append([pool.submit(_load_item, item, preprocessor, http_client) for item in batch])
+
+            for _ in range(prefetch + 1):
+                submit_next()
+
+            while in_flight:
+                loaded = [future.result() for future in in_flight.popleft()]
+                submit_next()
+
+                rows = []
+                ok = [(item, pixels) for item, pixels, error in loaded if error is None]
+                if ok:
+                    logits = backend.logits(preprocessor.normalize(np.stack([pixels for _, pixels in ok])))
+                    probs = torch.nn.functional.softmax(logits.float(), dim=1)
+                    confidences, classes = probs.max(dim=1)
+                    for (item, _), class_id, confidence in zip(ok, classes.tolist(), confidences.tolist()):
+                        rows.append({**item, "prediction": id2label[str(class_id)], "confidence": confidence,
+                                     "model_version": model_version, "error": None})
+                for item, _, error in loaded:
+                    if error is not None:
+                        rows.append({**item, "prediction": None, "confidence": None,
+                                     "model_version": model_version, "error": error})
+                        stats["failed"] += 1
+
+                writer.write(rows)
+                previous = stats["processed"]
+                stats["processed"] += len(rows)
+                if log_every and stats["processed"] // log_every > previous // log_every:
+                    rate = stats["processed"] / (time.perf_counter() - start)
+                    print(f"[bulk] {stats['processed']} images ({rate:.1f} img/s, {stats['failed']} failed)")
+    finally:
+        writer.close()
+
+    stats["seconds"] = time.perf_counter() - start
+    stats["images_per_sec"] = stats["processed"] / stats["seconds"] if stats["seconds"] > 0 else 0.0
+    return stats
@@ -1,38 +1,328 @@
+import asyncio
+import functools
+import logging
+import threading
+import time
 import torch
 from PIL import Image
-from transformers import ViTForImageClassification, ViTFeatureExtractor
-from safetensors.torch import safe_open
-import os
-from src.utils.config import MODEL_PATH, id2label
-from src.utils.preprocessing import preprocess_image
+from src.utils.config import (
+    MODEL_PATH,
+    CONFIG_PATH,
+    ONNX_MODEL_PATH,
+    INFERENCE_BACKEND,
+    BF16_PARITY_ATOL,
+    CHANNELS_LAST,
+    ORT_NUM_THREADS,
+    BATCHING_ENABLED,
+    BATCH_MAX_SIZE,
+    BATCH_MAX_WAIT_MS,
+    PREDICTION_CACHE_ENABLED,
+    PREDICTION_CACHE_MAX_ENTRIES,
+    PREDICTION_CACHE_TTL_S,
+    PREDICTION_CACHE_REDIS_URL,
+    PREPROCESS_THREADS,
+    WARMUP_ENABLED,
+)
+from src.utils.preprocessing import preprocess_image, ImagePreprocessor
+from src.models.batching import MicroBatcher
+from src.models.backends import (
+    TorchBackend,
+    OnnxBackend,
+    load_torch_model,
+    quantize_int8,
+    artifact_version,
+    check_parity,
+    cpu_supports_bf16,
+)
+from src.models.prediction_cache import PredictionCache
+from src.models.registry import ModelRegistry, ModelVersion, ModelNotReadyError
+from src.utils.metrics import time_stage, BATCH_SIZE, BATCH_QUEUE_DEPTH, CACHE_LOOKUPS
+
+logger = logging.getLogger(__name__)
 
 device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 
-# Load feature extractor and model
-feature_extractor = ViTFeatureExtractor.from_pretrained("google/vit-base-patch16-224-in21k")
-model = ViTForImageClassification.from_pretrained(
-    "google/vit-base-patch16-224-in21k", num_labels=len(id2label)
-)
+def load_backend(name: str, model_path: str = None, config_path: str = CONFIG_PATH, run_checks: bool = True):
+    """
+    With `run_checks=False`, torch_bf16 comes back as its fp32 fallback without
+    the bf16 parity check (which runs forward passes); `finish_preloaded`
+    runs it later in the worker.
+    """
+    if name == "torch":
+        return TorchBackend(load_torch_model(model_path or MODEL_PATH, config_path, device), device,
+                            channels_last=CHANNELS_LAST)
+    if name == "torch_bf16":
+        cpu = torch.device("cpu")
+        model = load_torch_model(model_path or MODEL_PATH, config_path, cpu)
+        if not run_checks:
+            return TorchBackend(model, cpu, channels_last=CHANNELS_LAST)
+        return load_bf16_backend(model, cpu)
+    if name == "torch_int8":
+        cpu = torch.device("cpu")
+        return TorchBackend(quantize_int8(load_torch_model(model_path or MODEL_PATH, config_path, cpu)), cpu, name=name)
+    if name == "onnx":
+        # Follow torch's intra-op setting so per-worker thread tuning applies to both backends
+        return OnnxBackend(model_path or ONNX_MODEL_PATH, num_threads=ORT_NUM_THREADS or torch.get_num_threads(),
+                           config_path=config_path)
+    raise ValueError(f"Unknown inference backend: {name}")
+
+def load_bf16_backend(model, cpu: torch.device):
+    """
+    bfloat16 autocast on CPUs with native bf16 support. Falls back to fp32
+    when the CPU lacks it or the bf16 logits fail the parity check against fp32.
+    """
+    fp32 = TorchBackend(model, cpu, channels_last=CHANNELS_LAST)
+    if not cpu_supports_bf16():
+        logger.warning("CPU has no native bf16 support; serving fp32 instead of torch_bf16")
+        return fp32
+
+    bf16 = TorchBackend(model, cpu, name="torch_bf16", autocast_dtype=torch.bfloat16, channels_last=CHANNELS_LAST)
+    generator = torch.Generator().manual_seed(0)
+    report = check_parity(fp32, bf16, torch.rand(4, 3, 224, 224, generator=generator) * 2 - 1, atol=BF16_PARITY_ATOL)
+    if not report["passed"]:
+        logger.warning(f"bf16 logits drift from fp32 (max diff {report['max_abs_diff']:.4f}, top-1 agreement "
+                       f"{report['top1_agreement']:.2f}); serving fp32 instead of torch_bf16")
+        return fp32
+    logger.info(f"Serving bf16 autocast (max logit diff vs fp32: {report['max_abs_diff']:.4f})")
+    return bf16
+
+def default_model_path(backend_name: str = INFERENCE_BACKEND) -> str:
+    return ONNX_MODEL_PATH if backend_name == "onnx" else MODEL_PATH
+
+def load_prediction_cache():
+    if not PREDICTION_CACHE_ENABLED:
+        return None
+    redis_client = None
+    if PREDICTION_CACHE_REDIS_URL:
+        from redis import Redis
+        redis_client = Redis.from_url(PREDICTION_CACHE_REDIS_URL, socket_timeout=0.05)
+    return PredictionCache(PREDICTION_CACHE_MAX_ENTRIES, PREDICTION_CACHE_TTL_S, redis_client=redis_client)
+
+# Cheap to build: no network access, no weights
+feature_extractor = ImagePreprocessor.from_config_file(num_threads=PREPROCESS_THREADS)
+prediction_cache = load_prediction_cache()
+
+# The served model version; populated by load_model() and replaced by reload_model()
+registry = ModelRegistry()
+load_stats = {}
+reload_status = {"status": "idle"}
+_preloaded = None
+_load_lock = threading.Lock()
+
+def is_ready() -> bool:
+    return registry.active is not None
+
+def preload_weights():
+    """
+    Loads the weights without starting threads or running the model, so it is
+    safe to call in a pre-fork server master: forked workers then share the
+    weight pages copy-on-write. ONNX Runtime sessions own a thread pool that
+    does not survive fork, so the onnx backend is always loaded per worker.
+    torch_bf16 only loads its fp32 weights here; the parity check that picks
+    bf16 or fp32 runs forward passes, so each worker runs it in load_model().
+    """
+    global _preloaded
+    with _load_lock:
+        if _preloaded is not None or INFERENCE_BACKEND == "onnx":
+            return
+        _preloaded = _load_weights(default_model_path(), CONFIG_PATH, run_checks=False)
+
+def _load_weights(model_path: str, config_path: str, run_checks: bool = True):
+    start = time.perf_counter()
+    loaded_backend = load_backend(INFERENCE_BACKEND, model_path, config_path, run_checks=run_checks)
+    load_seconds = time.perf_counter() - start
+    version = artifact_version(model_path, loaded_backend.name, config_path)
+    return loaded_backend, version, load_seconds, model_path, config_path
+
+def finish_preloaded(weights):
+    """
+    Runs, in the worker, the load-time checks preload_weights() skipped in the master.
+    """
+    if INFERENCE_BACKEND != "torch_bf16":
+        return weights
+    loaded_backend, _, load_seconds, model_path, config_path = weights
+    start = time.perf_counter()
+    loaded_backend = load_bf16_backend(loaded_backend.model, loaded_backend.device)
+    load_seconds += time.perf_counter() - start
+    version = artifact_version(model_path, loaded_backend.name, config_path)
+    return loaded_backend, version, load_seconds, model_path, config_path
+
+def load_model(run_warmup: bool = WARMUP_ENABLED):
+    """
+    Loads and publishes the configured model once (reusing preloaded weights
+    if any). Safe to call from several threads; later calls return immediately.
+    """
+    global _preloaded
+    with _load_lock:
+        if registry.active is not None:
+            return
+
+        preloaded = _preloaded is not None
+        weights = finish_preloaded(_preloaded) if preloaded else _load_weights(default_model_path(), CONFIG_PATH)
+        _preloaded = None
+        _activate(weights, run_warmup, preloaded)
 
-# Load trained weights
-with safe_open(MODEL_PATH, framework="pt", device=device.type) as f:
-    model_weights = {k: f.get_tensor(k) for k in f.keys()}
-model.load_state_dict(model_weights, strict=False)
-model.to(device)
-model.eval()
+def reload_model(model_path: str = None, config_path: str = None, run_warmup: bool = WARMUP_ENABLED) -> dict:
+    """
+    Loads a model version in the calling thread while the current one keeps
+    serving, warms it up and then swaps it in atomically. Requests already
+    running finish on the previous version. The version is computed from the
+    backend that actually loaded (torch_bf16 may fall back to fp32), and a
+    model identical to the active version is not swapped in.
+    """
+    model_path = model_path or default_model_path()
+    config_path = config_path or CONFIG_PATH
+    with _load_lock:
+        reload_status.clear()
+        reload_status.update({"status": "loading", "model_path": model_path, "started_at": time.time()})
+        try:
+            weights = _load_weights(model_path, config_path)
+            active = registry.active
+            if active is not None and active.version == weights[1]:
+                reload_status.update({"status": "unchanged", "model_version": active.version})
+                return active.stats
+            model = _activate(weights, run_warmup, preloaded=False)
+        except Exception as e:
+            reload_status.update({"status": "failed", "error": str(e)})
+            logger.exception(f"Reloading the model from {model_path} failed; still serving the previous version")
+            raise
+        reload_status.update({"status": "swapped", "model_version": model.version})
+        return model.stats
+
+def _activate(weights, run_warmup: bool, preloaded: bool) -> ModelVersion:
+    loaded_backend, version, load_seconds, model_path, _ = weights
+
+    warmup_seconds = 0.0
+    if run_warmup:
+        start = time.perf_counter()
+        warmup_batch(loaded_backend)
+        warmup_seconds = time.perf_counter() - start
+
+    model = ModelVersion(version, loaded_backend, {
+        "backend": loaded_backend.name,
+        "model_version": version,
+        "model_path": model_path,
+        "load_seconds": load_seconds,
+        "warmup_seconds": warmup_seconds,
+        "preloaded": preloaded,
+        "intra_op_threads": torch.get_num_threads(),
+        "loaded_at": time.time(),
+    }, id2label=loaded_backend.id2label)
+    # Concurrent callers share forward passes through the version's own micro-batcher
+    if BATCHING_ENABLED:
+        model.batcher = MicroBatcher(functools.partial(run_forward, model), max_batch_size=BATCH_MAX_SIZE,
+                                     max_wait_ms=BATCH_MAX_WAIT_MS)
+
+    # Publishing is what flips is_ready() and moves new requests over
+    previous = registry.publish(model)
+    load_stats.clear()
+    load_stats.update(model.stats)
+    logger.info(f"Model {version} loaded in {load_seconds:.2f}s (warmup {warmup_seconds:.2f}s)"
+                + (f", replacing {previous.version}" if previous is not None else ""))
+    return model
+
+def warmup_batch(model_backend, num_images: int = 1):
+    """
+    Runs a dummy batch through a freshly loaded backend so lazy allocations
+    and kernel selection happen before the first real request.
+    """
+    pixel_values = preprocess_image([Image.new("RGB", (224, 224))] * num_images, feature_extractor)["pixel_values"]
+    model_backend.logits(pixel_values)
+
+def run_forward(model: ModelVersion, images: list) -> list:
+    """
+    Classifies a list of PIL images with `model` in a single forward pass.
+    Returns one result dict per image, in input order.
+    """
+    if model.batcher is not None:
+        BATCH_QUEUE_DEPTH.set(model.batcher.queue_depth)
+    BATCH_SIZE.observe(len(images))
+
+    with time_stage("preprocess"):
+        inputs = preprocess_image(images, feature_extractor)
+
+    with time_stage("forward"):
+        logits = model.backend.logits(inputs["pixel_values"])
+    probs = torch.nn.functional.softmax(logits, dim=1)
+    confidences, predicted_classes = probs.max(dim=1)
+
+    return [
+        {"prediction": model.id2label[str(predicted_class)], "confidence": confidence, "model_version": model.version}
+        for predicted_class, confidence in zip(predicted_classes.tolist(), confidences.tolist())
+    ]
+
+def predict_batch(images: list) -> list:
+    """
+    Classifies a list of PIL images in a single forward pass on the active version.
+    """
+    with registry.acquire() as model:
+        return run_forward(model, images)
+
+def cache_lookup(image: Image.Image, version: str):
+    """
+    Returns (cache_key, cached_result); both are None when caching is disabled.
+    """
+    if prediction_cache is None:
+        return None, None
+    with time_stage("cache_lookup"):
+        key = prediction_cache.make_key(image, version)
+        cached = prediction_cache.get(key)
+    CACHE_LOOKUPS.labels("miss" if cached is None else "hit").inc()
+    return key, cached
 
 def predict_disease_from_bytes(image: Image.Image):
-    inputs = preprocess_image(image, feature_extractor)
-    inputs = {k: v.to(device) for k, v in inputs.items()}
+    with registry.acquire() as model:
+        key, cached = cache_lookup(image, model.version)
+        if cached is not None:
+            return cached
+
+        if model.batcher is not None:
+            future = model.batcher.submit(image)
+            BATCH_QUEUE_DEPTH.set(model.batcher.queue_depth)
+            result = future.result()
+        else:
+            result = run_forward(model, [image])[0]
+
+    if key is not None:
+        prediction_cache.set(key, result)
+    return result
+
+def predict_images(images: list) -> list:
+    """
+    Classifies many images at once: cached results are reused and every
+    remaining image goes through a single batched forward pass.
+    """
+    with registry.acquire() as model:
+        lookups = [cache_lookup(image, model.version) for image in images]
+        results = [cached for _, cached in lookups]
+
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            fresh = run_forward(model, [images[i] for i in missing])
+            for i, result in zip(missing, fresh):
+                results[i] = result
+                key = lookups[i][0]
+                if key is not None:
+                    prediction_cache.set(key, result)
+    return results
 
-    with torch.no_grad():
-        outputs = model(**inputs)
-        logits = outputs.logits
-        probs = torch.nn.functional.softmax(logits, dim=1)
-        predicted_class = torch.argmax(probs, dim=1).item()
-        confidence = probs[0, predicted_class].item()
+async def predict_disease_async(image: Image.Image):
+    """
+    Awaitable variant of predict_disease_from_bytes for async handlers.
+    Never blocks the event loop on hashing or the forward pass.
+    """
+    with registry.acquire() as model:
+        key, cached = await asyncio.to_thread(cache_lookup, image, model.version)
+        if cached is not None:
+            return cached
 
-    return {
-        "prediction": id2label[str(predicted_class)]
-    }
+        if model.batcher is not None:
+            future = model.batcher.submit(image)
+            BATCH_QUEUE_DEPTH.set(model.batcher.queue_depth)
+            result = await asyncio.wrap_future(future)
+        else:
+            result = (await asyncio.to_thread(run_forward, model, [image]))[0]
 
+    if key is not None:
+        await asyncio.to_thread(prediction_cache.set, key, result)
+    return result
@@ -0,0 +1,117 @@
+import torch
+import torch.nn.functional as F
+from transformers import ViTConfig, ViTForImageClassification, TrainingArguments, Trainer
+
+from src.utils.config import MODEL_PATH, CONFIG_PATH
+from src.utils.dataset_loader import get_dataset
+from src.utils.preprocessing import ImagePreprocessor, PixelCollator
+from src.models.backends import load_torch_model, save_torch_model
+from src.models.trainer import prepare_datasets, compute_metrics, resolve_precision, precision_args
+
+# DeiT widths; depth, patch size and resolution match the ViT-Base teacher
+STUDENT_SIZES = {
+    "tiny": {"hidden_size": 192, "num_attention_heads": 3, "intermediate_size": 768},
+    "small": {"hidden_size": 384, "num_attention_heads": 6, "intermediate_size": 1536},
+}
+# ImageNet-pretrained DeiT weights in the plain ViT layout (no distillation token)
+STUDENT_CHECKPOINTS = {
+    "tiny": "facebook/deit-tiny-patch16-224",
+    "small": "facebook/deit-small-patch16-224",
+}
+
+def build_student(size: str, id2label: dict, pretrained: bool = True) -> ViTForImageClassification:
+    """
+    A DeiT-sized ViTForImageClassification, so the exported student is served
+    by classifier.py exactly like the teacher.
+    """
+    label2id = {label: int(class_id) for class_id, label in id2label.items()}
+    if pretrained:
+        return ViTForImageClassification.from_pretrained(
+            STUDENT_CHECKPOINTS[size], num_labels=len(id2label), id2label=id2label, label2id=label2id,
+            ignore_mismatched_sizes=True)
+
+    config = ViTConfig(**STUDENT_SIZES[size], num_labels=len(id2label), id2label=id2label, label2id=label2id)
+    return ViTForImageClassification(config)
+
+def distillation_loss(student_logits, teacher_logits, labels, temperature=2.0, alpha=0.5):
+    """
+    alpha * soft-target KL at `temperature` (scaled by T^2 so its gradients
+    keep the same magnitude) + (1 - alpha) * cross-entropy on the true labels.
+    """
+    soft = F.kl_div(
+        F.log_softmax(student_logits / temperature, dim=-1),
+        F.softmax(teacher_logits / temperature, dim=-1),
+        reduction="batchmean",
+    ) * temperature ** 2
+    hard = F.cross_entropy(student_logits, labels)
+    return alpha * soft + (1 - alpha) * hard
+
+class DistillationTrainer(Trainer):
+    """
+    Trainer whose loss matches the frozen teacher's logits as well as the labels.
+    """
+
+    def __init__(self, *args, teacher=None, temperature=2.0, alpha=0.5, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.teacher = teacher.to(self.args.device).eval()
+        for parameter in self.teacher.parameters():
+            parameter.requires_grad_(False)
+        self.temperature = temperature
+        self.alpha = alpha
+
+    def compute_loss(self, model, inputs, return_outputs=False):
+        outputs = model(pixel_values=inputs["pixel_values"])
+        with torch.no_grad():
+            teacher_logits = self.teacher(pixel_values=inputs["pixel_values"]).logits
+        loss = distillation_loss(outputs.logits, teacher_logits, inputs["labels"], self.temperature, self.alpha)
+        return (loss, outputs) if return_outputs else loss
+
+def distill_model(output_dir, data_dir=None, student_size="tiny", pretrained=True, epochs=30, batch_size=64,
+                  learning_rate=5e-4, temperature=2.0, alpha=0.5, num_workers=4, precision="auto"):
+    """
+    Trains a DeiT-sized student against the served teacher (MODEL_PATH /
+    CONFIG_PATH) and writes it as config.json + model.safetensors.
+    """
+    preprocessor = ImagePreprocessor.from_config_file(num_threads=0)
+    datasets = prepare_datasets(get_dataset(data_dir), preprocessor, augment=True)
+
+    teacher = load_torch_model(MODEL_PATH, CONFIG_PATH, torch.device("cpu"))
+    id2label = {str(class_id): label for class_id, label in teacher.config.id2label.items()}
+    student = build_student(student_size, id2label, pretrained=pretrained)
+
+    training_args = TrainingArguments(
+        output_dir=f"./SknAI_student_{student_size}",
+        per_device_train_batch_size=batch_size,
+        per_device_eval_batch_size=batch_size,
+        seed=42,
+        evaluation_strategy="epoch",
+        save_strategy="epoch",
+        num_train_epochs=epochs,
+        logging_steps=10,
+        learning_rate=learning_rate,
+        weight_decay=0.05,
+        warmup_ratio=0.05,
+        save_total_limit=2,
+        remove_unused_columns=False,
+        push_to_hub=False,
+        load_best_model_at_end=True,
+        metric_for_best_model="accuracy",
+        **precision_args(resolve_precision(precision)),
+        dataloader_num_workers=num_workers,
+        dataloader_persistent_workers=num_workers > 0,
+        dataloader_pin_memory=torch.cuda.is_available(),
+    )
+
+    trainer = DistillationTrainer(
+        model=student,
+        args=training_args,
+        data_collator=PixelCollator(preprocessor),
+        train_dataset=datasets["train"],
+        eval_dataset=datasets["test"],
+        compute_metrics=compute_metrics,
+        teacher=teacher,
+        temperature=temperature,
+        alpha=alpha,
+    )
+    trainer.train()
+    return save_torch_model(trainer.model, output_dir)
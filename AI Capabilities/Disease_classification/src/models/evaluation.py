@@ -0,0 +1,157 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from src.utils.profiling import latency_summary, throughput, current_rss_mb, peak_rss_mb
+from src.utils.preprocessing import preprocess_image
+from src.models.backends import model_size_mb
+
+
+def iter_batches(split, feature_extractor, batch_size, limit=None):
+    """
+    Yields `(pixel_values, labels)` batches from a dataset split with an `image` column.
+    """
+    total = len(split) if limit is None else min(limit, len(split))
+    for start in range(0, total, batch_size):
+        rows = split[start:min(start + batch_size, total)]
+        images = [image.convert("RGB") for image in rows["image"]]
+        pixel_values = preprocess_image(images, feature_extractor)["pixel_values"]
+        yield pixel_values, rows["label"]
+
+
+def run_backend(backend, batches):
+    """
+    Runs a backend over `(pixel_values, labels)` batches.
+    Returns predictions, labels and timing for the whole pass.
+    """
+    predictions, references, latencies = [], [], []
+    start = time.perf_counter()
+    for pixel_values, labels in batches:
+        batch_start = time.perf_counter()
+        logits = backend.logits(pixel_values)
+        latencies.append(time.perf_counter() - batch_start)
+        predictions.extend(logits.argmax(dim=1).tolist())
+        references.extend(int(label) for label in labels)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "predictions": np.asarray(predictions),
+        "references": np.asarray(references),
+        "images_per_sec": throughput(len(predictions), elapsed),
+        "batch_latency": latency_summary(latencies),
+    }
+
+
+def classification_report(predictions, references, id2label):
+    """
+    Overall accuracy plus per-class accuracy (recall) for every label in id2label.
+    """
+    predictions = np.asarray(predictions)
+    references = np.asarray(references)
+    per_class = {}
+    for class_id, label in sorted(id2label.items(), key=lambda item: int(item[0])):
+        mask = references == int(class_id)
+        support = int(mask.sum())
+        per_class[label] = {
+            "accuracy": float((predictions[mask] == int(class_id)).mean()) if support else None,
+            "support": support,
+        }
+
+    return {
+        "accuracy": float((predictions == references).mean()) if references.size else 0.0,
+        "per_class": per_class,
+    }
+
+
+def evaluate_backend(name, backend, split, feature_extractor, id2label, batch_size=16, latency_samples=32):
+    """
+    Accuracy report plus size, throughput and batch / single-image latency for
+    one backend on a dataset split.
+    """
+    print(f"🔎 Evaluating {name} ...")
+    run = run_backend(backend, iter_batches(split, feature_extractor, batch_size))
+    single = run_backend(backend, iter_batches(split, feature_extractor, 1, limit=latency_samples))
+    return {
+        **classification_report(run["predictions"], run["references"], id2label),
+        "size_mb": model_size_mb(backend.model),
+        "parameters": sum(p.numel() for p in backend.model.parameters()),
+        "images_per_sec": run["images_per_sec"],
+        "batch_latency": run["batch_latency"],
+        "single_image_latency": single["batch_latency"],
+    }
+
+
+def runtime_memory(model_path, config_path, batch_size=1, image_size=224):
+    """
+    Resident memory of serving one model: RSS added by loading it and the peak
+    added by a forward pass of `batch_size` images, both over a baseline taken
+    once torch is imported. Runs in a fresh interpreter per model, so neither
+    the caller's memory nor another model's is counted.
+    """
+    project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+    completed = subprocess.run(
+        [sys.executable, "-m", "src.models.evaluation", "--memory-child", model_path, config_path,
+         str(batch_size), str(image_size)],
+        cwd=project_root, capture_output=True, text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Memory measurement failed:\n{completed.stderr[-2000:]}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def _memory_child(model_path, config_path, batch_size, image_size):
+    import torch
+    from src.models.backends import TorchBackend, load_torch_model
+
+    baseline = current_rss_mb()
+    device = torch.device("cpu")
+    backend = TorchBackend(load_torch_model(model_path, config_path, device), device)
+    loaded = current_rss_mb()
+    backend.logits(torch.zeros(batch_size, 3, image_size, image_size))
+    peak = peak_rss_mb()
+    print(json.dumps({
+        "batch_size": batch_size,
+        "baseline_rss_mb": baseline,
+        "load_delta_mb": max(0.0, loaded - baseline),
+        "peak_delta_mb": max(0.0, peak - baseline),
+        "peak_rss_mb": peak,
+    }))
+
+
+def compare_reports(reference, candidate):
+    """
+    Accuracy deltas (candidate - reference), overall and per class.
+    """
+    per_class_delta = {}
+    for label, stats in reference["per_class"].items():
+        ref_acc = stats["accuracy"]
+        cand_acc = candidate["per_class"][label]["accuracy"]
+        per_class_delta[label] = None if ref_acc is None or cand_acc is None else cand_acc - ref_acc
+
+    return {
+        "accuracy_delta": candidate["accuracy"] - reference["accuracy"],
+        "per_class_delta": per_class_delta,
+    }
+
+
+def regression_gate(comparison, max_accuracy_drop=0.01, max_class_drop=0.05):
+    """
+    Returns a list of human-readable failures; an empty list means no regression.
+    """
+    failures = []
+    if comparison["accuracy_delta"] < -max_accuracy_drop:
+        failures.append(f"accuracy dropped by {-comparison['accuracy_delta']:.4f} (max {max_accuracy_drop})")
+    for label, delta in comparison["per_class_delta"].items():
+        if delta is not None and delta < -max_class_drop:
+            failures.append(f"'{label}' accuracy dropped by {-delta:.4f} (max {max_class_drop})")
+    return failures
+
+
+if __name__ == "__main__":
+    # Child process of runtime_memory()
+    if len(sys.argv) == 6 and sys.argv[1] == "--memory-child":
+        _memory_child(sys.argv[2], sys.argv[3], int(sys.argv[4]), int(sys.argv[5]))
@@ -0,0 +1,184 @@
+import copy
+import json
+import logging
+import os
+import time
+
+import numpy as np
+import torch
+from torch import nn
+from transformers import ViTForImageClassification
+
+logger = logging.getLogger(__name__)
+
+
+class FrozenBackbone(nn.Module):
+    """
+    Every ViT block that stays frozen: patch embeddings plus the first
+    `num_layers - train_last_n` encoder blocks. With `train_last_n == 0` it
+    also applies the final layernorm and returns the pooled [CLS] feature;
+    otherwise it returns the full token sequence the trainable blocks start from.
+    """
+
+    def __init__(self, model: ViTForImageClassification, train_last_n: int = 0):
+        super().__init__()
+        vit = model.vit
+        split = len(vit.encoder.layer) - train_last_n
+        self.embeddings = vit.embeddings
+        self.layers = nn.ModuleList(vit.encoder.layer[:split])
+        self.layernorm = vit.layernorm if train_last_n == 0 else None
+
+    @torch.no_grad()
+    def forward(self, pixel_values):
+        hidden_states = self.embeddings(pixel_values)
+        for layer in self.layers:
+            hidden_states = layer(hidden_states)[0]
+        if self.layernorm is not None:
+            return self.layernorm(hidden_states)[:, 0]
+        return hidden_states
+
+
+class TrainableHead(nn.Module):
+    """
+    The part that is retrained on cached features: the last `train_last_n`
+    blocks (if any), the final layernorm and the classifier. Deep copies, so
+    the source model is only changed by `merge_head`.
+    """
+
+    def __init__(self, model: ViTForImageClassification, train_last_n: int = 0):
+        super().__init__()
+        vit = model.vit
+        split = len(vit.encoder.layer) - train_last_n
+        self.layers = nn.ModuleList(copy.deepcopy(layer) for layer in vit.encoder.layer[split:])
+        self.layernorm = copy.deepcopy(vit.layernorm) if train_last_n else None
+        self.classifier = copy.deepcopy(model.classifier)
+
+    def forward(self, features):
+        if self.layernorm is None:
+            return self.classifier(features)
+        hidden_states = features
+        for layer in self.layers:
+            hidden_states = layer(hidden_states)[0]
+        return self.classifier(self.layernorm(hidden_states)[:, 0])
+
+
+def merge_head(model: ViTForImageClassification, head: TrainableHead) -> ViTForImageClassification:
+    """
+    Copies the retrained blocks and classifier back into the full model.
+    """
+    split = len(model.vit.encoder.layer) - len(head.layers)
+    for i, layer in enumerate(head.layers):
+        model.vit.encoder.layer[split + i].load_state_dict(layer.state_dict())
+    if head.layernorm is not None:
+        model.vit.layernorm.load_state_dict(head.layernorm.state_dict())
+    model.classifier.load_state_dict(head.classifier.state_dict())
+    return model.eval()
+
+
+def extract_features(backbone: FrozenBackbone, loader, num_examples: int, cache_dir: str, meta: dict):
+    """
+    Runs the frozen backbone once over `loader` and writes the features to a
+    memory-mapped `features.npy` (float16 for token sequences, float32 for
+    pooled features) plus `labels.npy` and `meta.json` in `cache_dir`.
+    A cache whose meta.json matches `meta` is reused as is.
+    """
+    cached = load_feature_cache(cache_dir, meta)
+    if cached is not None:
+        logger.info(f"Reusing feature cache in {cache_dir}")
+        return cached
+
+    os.makedirs(cache_dir, exist_ok=True)
+    features_path = os.path.join(cache_dir, "features.npy")
+    features = labels = None
+    offset = 0
+    start = time.perf_counter()
+
+    backbone.eval()
+    for batch in loader:
+        output = backbone(batch["pixel_values"])
+        if features is None:
+            dtype = np.float32 if output.dim() == 2 else np.float16
+            features = np.lib.format.open_memmap(features_path, mode="w+", dtype=dtype,
+                                                 shape=(num_examples, *output.shape[1:]))
+            labels = np.zeros(num_examples, dtype=np.int64)
+        size = output.shape[0]
+        features[offset:offset + size] = output.numpy().astype(features.dtype, copy=False)
+        labels[offset:offset + size] = batch["labels"].numpy()
+        offset += size
+
+    features.flush()
+    np.save(os.path.join(cache_dir, "labels.npy"), labels)
+    with open(os.path.join(cache_dir, "meta.json"), "w") as f:
+        json.dump({**meta, "shape": list(features.shape), "dtype": str(features.dtype)}, f, indent=2)
+    logger.info(f"Cached {offset} feature rows in {time.perf_counter() - start:.1f}s to {cache_dir}")
+    return load_feature_cache(cache_dir, meta)
+
+
+def load_feature_cache(cache_dir: str, meta: dict):
+    """
+    Returns (features memmap, labels) if `cache_dir` holds features computed
+    with the same `meta`, else None.
+    """
+    meta_path = os.path.join(cache_dir, "meta.json")
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path) as f:
+        stored = json.load(f)
+    if any(stored.get(key) != value for key, value in meta.items()):
+        return None
+    features = np.load(os.path.join(cache_dir, "features.npy"), mmap_mode="r")
+    return features, np.load(os.path.join(cache_dir, "labels.npy"))
+
+
+def _feature_batches(features, labels, batch_size, shuffle, rng):
+    order = rng.permutation(len(labels)) if shuffle else np.arange(len(labels))
+    for start in range(0, len(order), batch_size):
+        # Sorted indices keep reads from the memmap mostly sequential
+        index = np.sort(order[start:start + batch_size])
+        yield torch.from_numpy(np.asarray(features[index], dtype=np.float32)), torch.from_numpy(labels[index])
+
+
+def evaluate_head(head: TrainableHead, features, labels, batch_size=256) -> float:
+    head.eval()
+    correct = 0
+    with torch.no_grad():
+        for inputs, targets in _feature_batches(features, labels, batch_size, False, None):
+            correct += (head(inputs).argmax(dim=1) == targets).sum().item()
+    return correct / max(len(labels), 1)
+
+
+def train_head(head: TrainableHead, train_cache, eval_cache, epochs=30, batch_size=64, lr=1e-3,
+               weight_decay=1e-4, seed=42):
+    """
+    Trains the head on cached features and keeps the weights from the epoch
+    with the best eval accuracy. Returns the per-epoch history.
+    """
+    torch.manual_seed(seed)
+    rng = np.random.default_rng(seed)
+    train_features, train_labels = train_cache
+    eval_features, eval_labels = eval_cache
+
+    optimizer = torch.optim.AdamW(head.parameters(), lr=lr, weight_decay=weight_decay)
+    scheduler = torch.optim.lr_scheduler.CosineAnnealingLR(optimizer, T_max=max(epochs, 1))
+    loss_fn = nn.CrossEntropyLoss()
+
+    best_accuracy, best_state, history = -1.0, None, []
+    for epoch in range(epochs):
+        head.train()
+        total_loss = 0.0
+        for inputs, targets in _feature_batches(train_features, train_labels, batch_size, True, rng):
+            optimizer.zero_grad()
+            loss = loss_fn(head(inputs), targets)
+            loss.backward()
+            optimizer.step()
+            total_loss += loss.item() * len(targets)
+        scheduler.step()
+
+        accuracy = evaluate_head(head, eval_features, eval_labels)
+        history.append({"epoch": epoch + 1, "loss": total_loss / len(train_labels), "eval_accuracy": accuracy})
+        logger.info(f"Epoch {epoch + 1}: loss {history[-1]['loss']:.4f} | eval accuracy {accuracy:.4f}")
+        if accuracy > best_accuracy:
+            best_accuracy, best_state = accuracy, copy.deepcopy(head.state_dict())
+
+    head.load_state_dict(best_state)
+    return history
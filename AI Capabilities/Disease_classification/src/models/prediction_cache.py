@@ -0,0 +1,123 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+
+def image_digest(image: Image.Image) -> str:
+    """
+    Content hash of the decoded pixels, so re-uploads and re-fetches of the
+    same photo map to the same key regardless of URL or container format.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f"{image.mode}:{image.size[0]}x{image.size[1]}:".encode("ascii"))
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+class PredictionCache:
+    """
+    Two-tier cache of prediction results keyed by image content + model version.
+
+    The in-process tier is a bounded LRU with a TTL. When a Redis client is
+    given, results are also shared across workers through Redis (same TTL).
+    Every key embeds the model version, so results of another model are never
+    read. Entries of a replaced model are not dropped eagerly: while a reload
+    drains, requests on the old and new versions interleave, so old entries are
+    left to age out through the LRU and TTL.
+    """
+
+    def __init__(self, max_entries=10000, ttl_s=3600.0, redis_client=None, namespace="sknai:prediction"):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.redis = redis_client
+        self.namespace = namespace
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._model_version = None
+        self.hits = 0
+        self.misses = 0
+        self.redis_hits = 0
+        self.redis_errors = 0
+
+    def make_key(self, image: Image.Image, model_version: str) -> str:
+        return f"{model_version}:{image_digest(image)}"
+
+    def get(self, key: str):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return dict(value)
+                del self._entries[key]
+
+        value = self._redis_get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.redis_hits += 1
+            self._store_local(key, value, now)
+        return dict(value)
+
+    def set(self, key: str, value: dict):
+        with self._lock:
+            # Reported in stats only; lookups never depend on it
+            self._model_version = key.split(":", 1)[0]
+            self._store_local(key, dict(value), time.monotonic())
+        self._redis_set(key, value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "redis_hits": self.redis_hits,
+                "redis_errors": self.redis_errors,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "model_version": self._model_version,
+            }
+
+    def _store_local(self, key, value, now):
+        self._entries[key] = (now + self.ttl_s, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _redis_get(self, key):
+        if self.redis is None:
+            return None
+        try:
+            raw = self.redis.get(f"{self.namespace}:{key}")
+        except Exception as e:
+            self.redis_errors += 1
+            logger.warning(f"Prediction cache Redis read failed: {e}")
+            return None
+        return json.loads(raw) if raw is not None else None
+
+    def _redis_set(self, key, value):
+        if self.redis is None:
+            return
+        try:
+            self.redis.setex(f"{self.namespace}:{key}", max(1, int(self.ttl_s)), json.dumps(value))
+        except Exception as e:
+            self.redis_errors += 1
+            logger.warning(f"Prediction cache Redis write failed: {e}")
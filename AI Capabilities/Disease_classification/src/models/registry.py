@@ -0,0 +1,95 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+class ModelNotReadyError(RuntimeError):
+    """Raised when a prediction is requested before a model version has been published."""
+
+
+class ModelVersion:
+    """
+    One loaded and warmed-up model: its inference backend, the micro-batcher
+    feeding it (if any), a version id, its label names and its load statistics.
+    """
+
+    def __init__(self, version: str, backend, stats: dict, batcher=None, id2label: dict = None):
+        self.version = version
+        self.backend = backend
+        self.stats = stats
+        self.batcher = batcher
+        self.id2label = id2label
+        self.in_flight = 0
+        self.retired_at = None
+
+    def close(self):
+        # Queued items are still processed before the batcher's worker exits
+        if self.batcher is not None:
+            self.batcher.close()
+
+
+class ModelRegistry:
+    """
+    Holds the model version that serves traffic and swaps it atomically.
+
+    Requests pin a version with `acquire()` for as long as they need it, so a
+    swap never changes the model under a running request. A replaced version
+    keeps serving its pinned requests and is closed once the last one is done.
+    """
+
+    def __init__(self):
+        self._active = None
+        self._draining = []
+        self._lock = threading.Lock()
+
+    @property
+    def active(self):
+        return self._active
+
+    @contextmanager
+    def acquire(self):
+        with self._lock:
+            model = self._active
+            if model is None:
+                raise ModelNotReadyError("Model is still loading")
+            model.in_flight += 1
+        try:
+            yield model
+        finally:
+            with self._lock:
+                model.in_flight -= 1
+                drained = model.retired_at is not None and model.in_flight == 0
+                if drained:
+                    self._draining.remove(model)
+            if drained:
+                # The last request may be running on the event loop, and closing
+                # joins the batcher's thread, so it happens in the background
+                threading.Thread(target=model.close, name=f"close-{model.version}", daemon=True).start()
+
+    def publish(self, model: ModelVersion):
+        """
+        Makes `model` the version new requests get and retires the previous
+        one, which is returned.
+        """
+        with self._lock:
+            previous, self._active = self._active, model
+            drained = False
+            if previous is not None:
+                previous.retired_at = time.time()
+                drained = previous.in_flight == 0
+                if not drained:
+                    self._draining.append(previous)
+        if drained:
+            previous.close()
+        return previous
+
+    def describe(self) -> dict:
+        with self._lock:
+            active = self._active
+            return {
+                "active": None if active is None else {**active.stats, "in_flight": active.in_flight},
+                "draining": [
+                    {"model_version": model.version, "in_flight": model.in_flight, "retired_at": model.retired_at}
+                    for model in self._draining
+                ],
+            }
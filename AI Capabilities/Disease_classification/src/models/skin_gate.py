@@ -0,0 +1,60 @@
+import numpy as np
+from PIL import Image
+
+# Chai & Ngan skin-tone box in YCbCr, with Cr widened upwards for inflamed skin
+SKIN_CB_RANGE = (77, 127)
+SKIN_CR_RANGE = (133, 180)
+
+
+class SkinGate:
+    """
+    Image-statistics pre-filter that rejects inputs which are clearly not skin
+    photos before they reach the ViT. Works on a small thumbnail and takes a
+    millisecond or two per image.
+
+    An image is rejected as
+      - "blank" when neither brightness nor colour varies (black, white or uniform frames),
+      - "no_skin" when too few pixels fall in the skin-tone box,
+      - "flat" when one colour covers most of it (screenshots, documents, graphics).
+    """
+
+    def __init__(self, min_skin_fraction=0.15, min_contrast=4.0, max_flat_fraction=0.6, size=64):
+        self.min_skin_fraction = min_skin_fraction
+        self.min_contrast = min_contrast
+        self.max_flat_fraction = max_flat_fraction
+        self.size = (size, size)
+
+    def statistics(self, image: Image.Image) -> dict:
+        # Nearest-neighbour sampling keeps the sensor noise that averaging would smooth away,
+        # which is what tells a photo of even skin from a rendered flat colour
+        thumbnail = image.convert("RGB").resize(self.size, resample=Image.NEAREST)
+        ycbcr = np.asarray(thumbnail.convert("YCbCr"), dtype=np.uint8)
+        luma, cb, cr = ycbcr[..., 0], ycbcr[..., 1], ycbcr[..., 2]
+
+        skin = (cb >= SKIN_CB_RANGE[0]) & (cb <= SKIN_CB_RANGE[1]) & (cr >= SKIN_CR_RANGE[0]) & (cr <= SKIN_CR_RANGE[1])
+        # Share of the single most common exact colour
+        rgb = np.asarray(thumbnail, dtype=np.uint32)
+        colours = (rgb[..., 0] << 16) | (rgb[..., 1] << 8) | rgb[..., 2]
+        flat_fraction = np.unique(colours, return_counts=True)[1].max() / colours.size
+
+        return {
+            "skin_fraction": float(skin.mean()),
+            # Largest std over Y, Cb and Cr, so redness on evenly lit skin still counts as detail
+            "contrast": float(max(luma.std(), cb.std(), cr.std())),
+            "flat_fraction": float(flat_fraction),
+        }
+
+    def check(self, image: Image.Image) -> dict:
+        """
+        Returns the statistics plus `accepted` and, for rejected images, the `reason`.
+        """
+        stats = self.statistics(image)
+        if stats["contrast"] < self.min_contrast:
+            reason = "blank"
+        elif stats["skin_fraction"] < self.min_skin_fraction:
+            reason = "no_skin"
+        elif stats["flat_fraction"] > self.max_flat_fraction:
+            reason = "flat"
+        else:
+            reason = None
+        return {"accepted": reason is None, "reason": reason, **stats}
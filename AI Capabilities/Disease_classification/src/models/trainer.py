@@ -1,17 +1,52 @@
+import os
+import logging
+from functools import lru_cache
 import numpy as np
+import torch
+from torch.utils.data import DataLoader
 import evaluate
-from transformers import ViTForImageClassification, TrainingArguments, Trainer, get_scheduler, ViTFeatureExtractor
-from transformers.data.data_collator import DefaultDataCollator
+from datasets import Value
+from transformers import ViTForImageClassification, TrainingArguments, Trainer, get_scheduler
 from torch.optim import Adam
-from src.utils.config import config
+from src.utils.config import config, MODEL_PATH, CONFIG_PATH
 from src.utils.dataset_loader import get_dataset
-from src.utils.preprocessing import transform_data
+from src.utils.preprocessing import ImagePreprocessor, TrainTransform, PixelCollator, resize_to_uint8
+from src.models.backends import load_torch_model, save_torch_model, artifact_version, cpu_supports_bf16
+from src.models.feature_cache import FrozenBackbone, TrainableHead, extract_features, train_head, merge_head
 
-# Load accuracy metric
-metric = evaluate.load("accuracy")
+logger = logging.getLogger(__name__)
+
+PRECISIONS = ("auto", "fp16", "bf16", "fp32")
+
+def resolve_precision(requested: str = "auto") -> str:
+    """
+    The training precision this machine can run. fp16 needs CUDA; bf16 needs a
+    bf16-capable GPU or a CPU with native bf16; fp32 always works. "auto" picks
+    the fastest available, and an unavailable request falls back instead of
+    failing inside TrainingArguments.
+    """
+    cuda = torch.cuda.is_available()
+    bf16 = torch.cuda.is_bf16_supported() if cuda else cpu_supports_bf16()
+    if requested == "auto":
+        return "fp16" if cuda else "bf16" if bf16 else "fp32"
+
+    available = {"fp16": cuda, "bf16": bf16, "fp32": True}
+    if available[requested]:
+        return requested
+    fallback = "bf16" if bf16 else "fp32"
+    logger.warning(f"{requested} training is not supported on this machine; using {fallback}")
+    return fallback
+
+def precision_args(precision: str) -> dict:
+    return {"fp16": precision == "fp16", "bf16": precision == "bf16"}
+
+@lru_cache()
+def accuracy_metric():
+    # Loaded on first use so importing the trainer needs no network access
+    return evaluate.load("accuracy")
 
 def compute_metrics(p):
-    return metric.compute(
+    return accuracy_metric().compute(
         predictions=np.argmax(p.predictions, axis=1),
         references=p.label_ids
     )
@@ -28,10 +63,31 @@ def custom_optimizer(model, training_args, train_dataset):
 
     return optimizer, scheduler
 
-def train_model():
-    datasets = get_dataset()
-    feature_extractor = ViTFeatureExtractor.from_pretrained("google/vit-base-patch16-224-in21k")
-    datasets = datasets.map(lambda batch: transform_data(batch, feature_extractor), remove_columns=["image"], batched=True)
+def prepare_datasets(datasets, preprocessor, cache_resized=False, augment=False):
+    """
+    Keeps images compact and transforms them lazily, one batch at a time, in
+    the DataLoader workers; nothing is ever stored as float32 pixels.
+
+    By default the encoded images stay in the memory-mapped Arrow files and are
+    decoded per batch. With `cache_resized`, every image is decoded and resized
+    once into a uint8 Arrow column (reused across runs through the datasets
+    cache), so epochs skip JPEG decoding entirely.
+    """
+    if cache_resized:
+        features = datasets["train"].features.copy()
+        del features["image"]
+        features["pixels"] = Value("binary")
+        datasets = datasets.map(resize_to_uint8, fn_kwargs={"preprocessor": preprocessor}, batched=True,
+                                remove_columns=["image"], features=features)
+
+    datasets["train"] = datasets["train"].with_transform(TrainTransform(preprocessor, augment=augment))
+    datasets["test"] = datasets["test"].with_transform(TrainTransform(preprocessor))
+    return datasets
+
+def train_model(data_dir=None, num_workers=4, cache_resized=False, augment=False, precision="auto"):
+    # No thread pool: the DataLoader workers already run transforms in parallel
+    preprocessor = ImagePreprocessor.from_config_file(num_threads=0)
+    datasets = prepare_datasets(get_dataset(data_dir), preprocessor, cache_resized=cache_resized, augment=augment)
 
     model = ViTForImageClassification.from_pretrained(
         "google/vit-base-patch16-224-in21k", num_labels=len(config["id2label"]))
@@ -51,7 +107,10 @@ def train_model():
         remove_unused_columns=False,
         push_to_hub=False,
         load_best_model_at_end=True,
-        fp16=True
+        **precision_args(resolve_precision(precision)),
+        dataloader_num_workers=num_workers,
+        dataloader_persistent_workers=num_workers > 0,
+        dataloader_pin_memory=torch.cuda.is_available(),
     )
 
     optimizer, scheduler = custom_optimizer(model, training_args, datasets["train"])
@@ -59,7 +118,7 @@ def train_model():
     trainer = Trainer(
         model=model,
         args=training_args,
-        data_collator=DefaultDataCollator(),
+        data_collator=PixelCollator(preprocessor),
         train_dataset=datasets["train"],
         eval_dataset=datasets["test"],
         optimizers=(optimizer, scheduler),
@@ -67,4 +126,52 @@ def train_model():
     )
 
     trainer.train()
-    trainer.save_model("./../../models")
\ No newline at end of file
+    trainer.save_model("./../../models")
+
+BASE_CHECKPOINT = "google/vit-base-patch16-224-in21k"
+
+def load_backbone(backbone, id2label):
+    """
+    Returns a ViT classifier for `id2label` built on `backbone`: a Hub id or
+    local directory, or "serving" for the fine-tuned model at MODEL_PATH.
+    The classifier layer is re-initialized whenever the label set changes.
+    """
+    label2id = {label: int(class_id) for class_id, label in id2label.items()}
+    if backbone != "serving":
+        return ViTForImageClassification.from_pretrained(
+            backbone, num_labels=len(id2label), id2label=id2label, label2id=label2id, ignore_mismatched_sizes=True)
+
+    model = load_torch_model(MODEL_PATH, CONFIG_PATH, torch.device("cpu"))
+    if {str(k): v for k, v in model.config.id2label.items()} != id2label:
+        model.classifier = torch.nn.Linear(model.config.hidden_size, len(id2label))
+    model.config.id2label, model.config.label2id, model.num_labels = id2label, label2id, len(id2label)
+    return model
+
+def train_head_model(output_dir, data_dir=None, backbone=BASE_CHECKPOINT, train_last_n=0, cache_dir="./feature_cache",
+                     epochs=30, batch_size=64, lr=1e-3, num_workers=4):
+    """
+    Retrains only the classification head (plus optionally the last
+    `train_last_n` ViT blocks) on backbone features computed once and cached
+    on disk, then writes a checkpoint classifier.py can serve.
+    """
+    preprocessor = ImagePreprocessor.from_config_file(num_threads=0)
+    datasets = prepare_datasets(get_dataset(data_dir), preprocessor, augment=False)
+    names = datasets["train"].features["label"].names
+    id2label = {str(i): name for i, name in enumerate(names)}
+
+    model = load_backbone(backbone, id2label).eval()
+    frozen = FrozenBackbone(model, train_last_n)
+    backbone_id = artifact_version(MODEL_PATH, "torch") if backbone == "serving" else backbone
+
+    caches = {}
+    for split in ("train", "test"):
+        loader = DataLoader(datasets[split], batch_size=32, num_workers=num_workers, collate_fn=PixelCollator(preprocessor))
+        meta = {"backbone": backbone_id, "train_last_n": train_last_n, "split": split,
+                "fingerprint": datasets[split]._fingerprint, "num_examples": len(datasets[split])}
+        caches[split] = extract_features(frozen, loader, len(datasets[split]), os.path.join(cache_dir, split), meta)
+
+    head = TrainableHead(model, train_last_n)
+    history = train_head(head, caches["train"], caches["test"], epochs=epochs, batch_size=batch_size, lr=lr)
+    model_path = save_torch_model(merge_head(model, head), output_dir)
+    print(f"✅ Best eval accuracy {max(h['eval_accuracy'] for h in history):.4f}; checkpoint written to {model_path}")
+    return history
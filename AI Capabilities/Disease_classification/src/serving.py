@@ -0,0 +1,71 @@
+import os
+import tempfile
+
+import torch
+from gunicorn.app.base import BaseApplication
+
+
+def threads_per_worker(workers: int) -> int:
+    """
+    Splits the cores evenly so N workers x intra-op threads never oversubscribes the node.
+    """
+    return max(1, (os.cpu_count() or 1) // workers)
+
+
+class ClassifierServer(BaseApplication):
+    """
+    Pre-fork server for the classifier: gunicorn master + Uvicorn workers.
+
+    The master imports the app and loads the model weights once (no forward
+    pass, no threads). Workers are forked from it and share those weight pages
+    copy-on-write. Each worker pins its intra-op thread count, then warms up
+    and starts its own micro-batcher from the FastAPI lifespan.
+    """
+
+    def __init__(self, host: str, port: int, workers: int, threads: int = 0, timeout: int = 120):
+        self.threads = threads or threads_per_worker(workers)
+        self.options = {
+            "bind": f"{host}:{port}",
+            "workers": workers,
+            "worker_class": "uvicorn.workers.UvicornWorker",
+            "preload_app": True,
+            "timeout": timeout,
+            "on_starting": self.on_starting,
+            "post_fork": self.post_fork,
+            "child_exit": self.child_exit,
+        }
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from src.main import app
+        return app
+
+    def on_starting(self, server):
+        from src.models import classifier
+
+        # Keep the master single-threaded: an OpenMP pool started before fork
+        # is not usable in the children
+        torch.set_num_threads(1)
+        classifier.preload_weights()
+        server.log.info(f"Preloaded classifier weights; {self.threads} intra-op thread(s) per worker")
+
+    def post_fork(self, server, worker):
+        torch.set_num_threads(self.threads)
+        os.environ["OMP_NUM_THREADS"] = str(self.threads)
+
+    def child_exit(self, server, worker):
+        # Drop the dead worker's live gauges from the merged /metrics output
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
+
+
+def run_multiworker(host: str, port: int, workers: int, threads: int = 0):
+    # Workers write their metrics here so /metrics reports all of them, whichever one is scraped.
+    # Must be set before prometheus_client is first imported.
+    if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="sknai-metrics-")
+    ClassifierServer(host, port, workers, threads).run()
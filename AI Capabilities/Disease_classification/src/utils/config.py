@@ -1,11 +1,74 @@
 import json
 import os
 
-CONFIG_PATH = "./config/config.json"
-PREPROCESSOR_CONFIG_PATH = "./config/preprocessor_config.json"
-MODEL_PATH = "./models/model.safetensors"
+CONFIG_PATH = os.getenv("CONFIG_PATH", "./config/config.json")
+PREPROCESSOR_CONFIG_PATH = os.getenv("PREPROCESSOR_CONFIG_PATH", "./config/preprocessor_config.json")
+MODEL_PATH = os.getenv("MODEL_PATH", "./models/model.safetensors")
+ONNX_MODEL_PATH = os.getenv("ONNX_MODEL_PATH", "./models/model.onnx")
 UPLOAD_FOLDER = "uploads/"
 
+# Inference backend picked at startup: "torch" (eager fp32), "torch_bf16" (bfloat16
+# autocast on CPUs with native bf16, fp32 otherwise), "torch_int8" (dynamic INT8
+# Linear layers, CPU only) or "onnx" (ONNX Runtime)
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "torch")
+# torch_bf16 falls back to fp32 when its logits drift further than this from fp32 at load time
+BF16_PARITY_ATOL = float(os.getenv("BF16_PARITY_ATOL", 0.25))
+# Keep the input and patch-embedding convolution in NHWC for the torch backends
+CHANNELS_LAST = os.getenv("CHANNELS_LAST", "0") == "1"
+ORT_NUM_THREADS = int(os.getenv("ORT_NUM_THREADS", 0))  # 0 lets onnxruntime decide
+
+# Threads used to resize the images of one batch in parallel (0 = resize inline)
+PREPROCESS_THREADS = int(os.getenv("PREPROCESS_THREADS", 4))
+
+# Run one dummy forward pass after loading so the first real request doesn't pay for it
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "1") == "1"
+
+# Micro-batching of concurrent /predict calls (see src/models/batching.py)
+BATCHING_ENABLED = os.getenv("BATCHING_ENABLED", "1") == "1"
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", 16))
+BATCH_MAX_WAIT_MS = float(os.getenv("BATCH_MAX_WAIT_MS", 10))
+
+# Pre-filter that turns away images that are clearly not skin photos before the ViT (see src/models/skin_gate.py).
+# Off until its false-reject rate on real photos has been measured with pipelines/skin_gate_eval_pipeline.py
+SKIN_GATE_ENABLED = os.getenv("SKIN_GATE_ENABLED", "0") == "1"
+SKIN_GATE_MIN_SKIN_FRACTION = float(os.getenv("SKIN_GATE_MIN_SKIN_FRACTION", 0.15))
+SKIN_GATE_MIN_CONTRAST = float(os.getenv("SKIN_GATE_MIN_CONTRAST", 4.0))
+SKIN_GATE_MAX_FLAT_FRACTION = float(os.getenv("SKIN_GATE_MAX_FLAT_FRACTION", 0.6))
+
+# Max images accepted by one /predict/batch request
+BATCH_REQUEST_MAX_ITEMS = int(os.getenv("BATCH_REQUEST_MAX_ITEMS", 64))
+
+# Admission control for /predict and /predict/batch, per worker (see src/utils/admission.py)
+MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", 32))
+ADMISSION_QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", 64))
+ADMISSION_QUEUE_TIMEOUT_S = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_S", 5))
+ADMISSION_RETRY_AFTER_S = int(os.getenv("ADMISSION_RETRY_AFTER_S", 1))
+# Deadline for callers that don't send X-Request-Timeout-Ms (0 = none)
+REQUEST_DEFAULT_TIMEOUT_S = float(os.getenv("REQUEST_DEFAULT_TIMEOUT_S", 0))
+
+# Required in X-Admin-Token to hot-reload the model via POST /admin/model/reload (unset disables reloads)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+# Prediction cache keyed by image content + model version (see src/models/prediction_cache.py)
+PREDICTION_CACHE_ENABLED = os.getenv("PREDICTION_CACHE_ENABLED", "1") == "1"
+PREDICTION_CACHE_MAX_ENTRIES = int(os.getenv("PREDICTION_CACHE_MAX_ENTRIES", 10000))
+PREDICTION_CACHE_TTL_S = float(os.getenv("PREDICTION_CACHE_TTL_S", 3600))
+PREDICTION_CACHE_REDIS_URL = os.getenv("PREDICTION_CACHE_REDIS_URL")  # unset keeps the cache per-process
+
+# Image download for /predict (see src/utils/fetcher.py)
+FETCH_CONNECT_TIMEOUT = float(os.getenv("FETCH_CONNECT_TIMEOUT", 3))
+FETCH_READ_TIMEOUT = float(os.getenv("FETCH_READ_TIMEOUT", 10))
+FETCH_TOTAL_TIMEOUT = float(os.getenv("FETCH_TOTAL_TIMEOUT", 15))
+FETCH_MAX_BYTES = int(os.getenv("FETCH_MAX_BYTES", 10 * 1024 * 1024))
+FETCH_MAX_CONNECTIONS = int(os.getenv("FETCH_MAX_CONNECTIONS", 100))
+FETCH_CACHE_DIR = os.getenv("FETCH_CACHE_DIR")  # unset disables the on-disk cache
+FETCH_CACHE_MAX_BYTES = int(os.getenv("FETCH_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+FETCH_CACHE_TTL_S = float(os.getenv("FETCH_CACHE_TTL_S", 24 * 3600))
+
+# Images larger than this are refused from their header, before any pixels are decoded
+DECODE_MAX_PIXELS = int(os.getenv("DECODE_MAX_PIXELS", 40_000_000))
+DECODE_MAX_DIMENSION = int(os.getenv("DECODE_MAX_DIMENSION", 12_000))
+
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
 def load_config():
@@ -17,4 +80,4 @@ def load_preprocessor_config():
         return json.load(f)
 
 config = load_config()
-id2label = config["id2label"]
\ No newline at end of file
+id2label = config["id2label"]
@@ -1,5 +1,13 @@
-from datasets import load_dataset
+import os
+from datasets import load_dataset, load_from_disk
 
-def get_dataset():
-    dataset = load_dataset("Team-SknAI/SknAI_300_v3_11Labels")
-    return dataset
\ No newline at end of file
+def get_dataset(local_path=None):
+    """
+    Loads the SknAI dataset from the Hugging Face Hub, or from a local copy:
+    either a `save_to_disk` directory or an imagefolder (one sub-folder per label).
+    """
+    if local_path is None:
+        return load_dataset("Team-SknAI/SknAI_300_v3_11Labels")
+    if os.path.exists(os.path.join(local_path, "dataset_dict.json")):
+        return load_from_disk(local_path)
+    return load_dataset("imagefolder", data_dir=local_path)
\ No newline at end of file
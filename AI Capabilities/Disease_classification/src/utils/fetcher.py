@@ -0,0 +1,169 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+import threading
+import time
+
+import httpx
+
+
+class ImageFetchError(Exception):
+    """
+    Raised when an image URL cannot be downloaded. `status_code` is the HTTP
+    status the API should answer with.
+    """
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class ImageFetcher:
+    """
+    Downloads images over a shared keep-alive `httpx.AsyncClient`.
+
+    Every download is bounded by connect/read timeouts, an overall deadline
+    and a cap on the streamed body size. When `cache_dir` is set, successful
+    downloads are also stored on disk keyed by a hash of the URL. Entries
+    older than `cache_ttl` seconds are ignored, and once the directory grows
+    past `cache_max_bytes` the least recently used files are deleted.
+    """
+
+    def __init__(
+        self,
+        connect_timeout=3.0,
+        read_timeout=10.0,
+        total_timeout=15.0,
+        max_bytes=10 * 1024 * 1024,
+        max_connections=100,
+        cache_dir=None,
+        cache_max_bytes=512 * 1024 * 1024,
+        cache_ttl=24 * 3600,
+        transport=None,
+    ):
+        self.total_timeout = total_timeout
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self.cache_max_bytes = cache_max_bytes
+        self.cache_ttl = cache_ttl
+        self._cache_lock = threading.Lock()
+        self._cache_bytes = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._cache_bytes = sum(size for _, size, _ in self._cache_entries())
+
+        self._client_kwargs = {
+            "timeout": httpx.Timeout(read_timeout, connect=connect_timeout),
+            "limits": httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            "follow_redirects": True,
+            "transport": transport,
+        }
+        self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Created lazily so the client binds to the running event loop
+        if self._client is None:
+            self._client = httpx.AsyncClient(**self._client_kwargs)
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def fetch(self, url: str) -> bytes:
+        if self.cache_dir:
+            cached = await asyncio.to_thread(self._read_cache, url)
+            if cached is not None:
+                return cached
+
+        try:
+            content = await asyncio.wait_for(self._download(url), timeout=self.total_timeout)
+        except (asyncio.TimeoutError, httpx.TimeoutException):
+            raise ImageFetchError("Timed out fetching image from URL", status_code=504)
+        except httpx.HTTPError as e:
+            raise ImageFetchError(f"Failed to fetch image from URL: {e}", status_code=502)
+
+        if self.cache_dir:
+            await asyncio.to_thread(self._write_cache, url, content)
+        return content
+
+    async def _download(self, url: str) -> bytes:
+        async with self.client.stream("GET", url) as response:
+            if response.status_code != 200:
+                raise ImageFetchError("Failed to fetch image from URL", status_code=400)
+
+            content_length = response.headers.get("content-length")
+            if content_length is not None and content_length.isdigit() and int(content_length) > self.max_bytes:
+                raise ImageFetchError("Image exceeds the maximum allowed size", status_code=413)
+
+            chunks = []
+            received = 0
+            async for chunk in response.aiter_bytes():
+                received += len(chunk)
+                if received > self.max_bytes:
+                    raise ImageFetchError("Image exceeds the maximum allowed size", status_code=413)
+                chunks.append(chunk)
+            return b"".join(chunks)
+
+    def _cache_path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha256(url.encode("utf-8")).hexdigest())
+
+    def _read_cache(self, url: str):
+        path = self._cache_path(url)
+        try:
+            if time.time() - os.path.getmtime(path) > self.cache_ttl:
+                self._remove_cached(path)
+                return None
+            with open(path, "rb") as f:
+                content = f.read()
+            # The mtime doubles as the last-use time for eviction
+            os.utime(path)
+            return content
+        except FileNotFoundError:
+            return None
+
+    def _write_cache(self, url: str, content: bytes):
+        # Write to a temp file first so concurrent readers never see partial bytes
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=".tmp-")
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, self._cache_path(url))
+        with self._cache_lock:
+            self._cache_bytes += len(content)
+            if self._cache_bytes > self.cache_max_bytes:
+                self._evict()
+
+    def _cache_entries(self):
+        # (path, size, mtime) of every cached download; temp files of in-flight writes are skipped
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.startswith(".tmp-"):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((entry.path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _remove_cached(self, path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        # Rescan rather than trust the running total: other workers may share the directory
+        entries = self._cache_entries()
+        total = sum(size for _, size, _ in entries)
+        now = time.time()
+        # Drop expired files, then the least recently used ones until under 90% of the cap
+        for path, size, mtime in sorted(entries, key=lambda entry: entry[2]):
+            if total <= self.cache_max_bytes * 0.9 and now - mtime <= self.cache_ttl:
+                continue
+            self._remove_cached(path)
+            total -= size
+        self._cache_bytes = total
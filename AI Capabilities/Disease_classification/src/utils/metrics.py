@@ -0,0 +1,112 @@
+import os
+import time
+from contextlib import contextmanager
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# Stage timings span sub-millisecond cache lookups to multi-second downloads
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+STAGE_SECONDS = Histogram(
+    "classifier_stage_seconds",
+    "Time spent in each stage of a prediction (fetch, upload, decode, gate, preprocess, forward, cache)",
+    ["stage"],
+    buckets=STAGE_BUCKETS,
+)
+REQUEST_SECONDS = Histogram(
+    "classifier_request_seconds",
+    "End-to-end handler latency",
+    ["endpoint"],
+    buckets=STAGE_BUCKETS,
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "classifier_requests_in_flight",
+    "Requests currently being handled",
+    ["endpoint"],
+    multiprocess_mode="livesum",
+)
+BATCH_QUEUE_DEPTH = Gauge(
+    "classifier_batch_queue_depth",
+    "Images waiting for the micro-batcher",
+    multiprocess_mode="livesum",
+)
+BATCH_SIZE = Histogram(
+    "classifier_batch_size",
+    "Images per forward pass",
+    buckets=(1, 2, 4, 8, 16, 32, 64),
+)
+CACHE_LOOKUPS = Counter(
+    "classifier_cache_lookups_total",
+    "Prediction cache lookups by result",
+    ["result"],
+)
+GATE_DECISIONS = Counter(
+    "classifier_gate_decisions_total",
+    "Skin pre-filter outcomes: accepted, or the rejection reason",
+    ["result"],
+)
+ERRORS = Counter(
+    "classifier_errors_total",
+    "Failed predictions by stage and error type",
+    ["stage", "type"],
+)
+
+# Pre-create the common label sets so they are exported as 0 before the first event
+for _stage in ("fetch", "upload", "decode", "gate", "preprocess", "forward", "cache_lookup"):
+    STAGE_SECONDS.labels(_stage)
+for _result in ("accepted", "blank", "no_skin", "flat"):
+    GATE_DECISIONS.labels(_result)
+for _result in ("hit", "miss"):
+    CACHE_LOOKUPS.labels(_result)
+
+
+@contextmanager
+def time_stage(stage: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.labels(stage).observe(time.perf_counter() - start)
+
+
+@contextmanager
+def track_request(endpoint: str):
+    in_flight = REQUESTS_IN_FLIGHT.labels(endpoint)
+    in_flight.inc()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        REQUEST_SECONDS.labels(endpoint).observe(time.perf_counter() - start)
+        in_flight.dec()
+
+
+def record_error(stage: str, error: Exception):
+    error_type = type(error).__name__
+    # Fetch errors share one class; the status code tells timeouts from oversized or missing images
+    status_code = getattr(error, "status_code", None)
+    if status_code is not None:
+        error_type = f"{error_type}_{status_code}"
+    ERRORS.labels(stage, error_type).inc()
+
+
+def render_metrics():
+    """
+    Returns (body, content_type) for the /metrics endpoint. Under a multi-worker
+    server, set PROMETHEUS_MULTIPROC_DIR so every worker's samples are merged.
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -1,4 +1,6 @@
 from PIL import Image
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
 import torch
 import numpy as np
 
@@ -14,4 +16,158 @@ def transform_data(batch, feature_extractor):
 
     encodings = feature_extractor(images=images, return_tensors="pt")
     batch["pixel_values"] = encodings["pixel_values"].numpy()
-    return batch
\ No newline at end of file
+    return batch
+
+# Formats accepted from clients; everything else is refused before any decoder runs.
+# "JPEG" also covers the multi-picture (MPO) files many phones produce. GIF and TIFF
+# were always accepted by /predict and stay allowed (GIFs are classified on their first frame).
+ALLOWED_FORMATS = ("JPEG", "PNG", "WEBP", "BMP", "GIF", "TIFF")
+MAX_DECODE_PIXELS = 40_000_000
+MAX_DECODE_DIMENSION = 12_000
+
+class ImageTooLargeError(ValueError):
+    """Raised before decoding when an image exceeds the pixel or dimension limits."""
+
+def check_image_size(width: int, height: int, max_pixels: int, max_dimension: int):
+    if width > max_dimension or height > max_dimension or width * height > max_pixels:
+        raise ImageTooLargeError(
+            f"Image is {width}x{height}; limits are {max_dimension} px per side and {max_pixels} px in total")
+
+def decode_image(image_bytes: bytes, draft_size=(448, 448), max_pixels: int = MAX_DECODE_PIXELS,
+                 max_dimension: int = MAX_DECODE_DIMENSION) -> Image.Image:
+    """
+    Decodes image bytes to RGB. For JPEGs the decoder is asked for the smallest
+    DCT scale that still covers `draft_size`, so a 12 MP phone photo is decoded
+    at a fraction of its resolution instead of in full. Pass None to disable.
+
+    Only the header has been read when the size limits are checked, so an
+    oversized image (a decompression bomb) is rejected without allocating its
+    pixels. For JPEGs the limits apply to the reduced draft size.
+    """
+    try:
+        image = Image.open(BytesIO(image_bytes), formats=ALLOWED_FORMATS)
+    except Image.DecompressionBombError as e:
+        raise ImageTooLargeError(str(e)) from e
+    if draft_size is not None and image.format in ("JPEG", "MPO"):
+        image.draft("RGB", draft_size)
+    check_image_size(*image.size, max_pixels=max_pixels, max_dimension=max_dimension)
+    return image.convert("RGB")
+
+def decode_raw_pixels(pixel_bytes: bytes, width: int, height: int, max_pixels: int = MAX_DECODE_PIXELS,
+                      max_dimension: int = MAX_DECODE_DIMENSION) -> Image.Image:
+    """
+    Wraps a client-resized, uncompressed RGB uint8 buffer (row-major HWC) as an
+    image without any decoding. At the model's input size the preprocessor's
+    resize is then a no-op.
+    """
+    check_image_size(width, height, max_pixels=max_pixels, max_dimension=max_dimension)
+    if len(pixel_bytes) != width * height * 3:
+        raise ValueError(f"Expected {width * height * 3} bytes of RGB pixels for {width}x{height}, got {len(pixel_bytes)}")
+    return Image.frombuffer("RGB", (width, height), pixel_bytes, "raw", "RGB", 0, 1)
+
+class ImagePreprocessor:
+    """
+    Vectorized replacement for ViTFeatureExtractor, driven by preprocessor_config.json.
+
+    Each image is resized straight to the target size with PIL, then the whole
+    batch is rescaled and normalized in one fused multiply-add on a uint8
+    tensor. Call it like a feature extractor: `preprocessor(images=[...], return_tensors="pt")`.
+    """
+
+    def __init__(self, preprocessor_config: dict, num_threads: int = 0):
+        size = preprocessor_config["size"]
+        self.size = (size["width"], size["height"])
+        self.do_resize = preprocessor_config.get("do_resize", True)
+        self.resample = preprocessor_config.get("resample", Image.BILINEAR)
+
+        rescale_factor = preprocessor_config["rescale_factor"] if preprocessor_config.get("do_rescale", True) else 1.0
+        if preprocessor_config.get("do_normalize", True):
+            mean = np.asarray(preprocessor_config["image_mean"], dtype=np.float64)
+            std = np.asarray(preprocessor_config["image_std"], dtype=np.float64)
+        else:
+            mean, std = np.zeros(3), np.ones(3)
+
+        # (x * rescale - mean) / std  ==  x * scale + offset
+        self.scale = torch.tensor(rescale_factor / std, dtype=torch.float32).view(1, 3, 1, 1)
+        self.offset = torch.tensor(-mean / std, dtype=torch.float32).view(1, 3, 1, 1)
+
+        self._pool = ThreadPoolExecutor(max_workers=num_threads) if num_threads > 1 else None
+
+    @classmethod
+    def from_config_file(cls, num_threads: int = 0):
+        from src.utils.config import load_preprocessor_config
+        return cls(load_preprocessor_config(), num_threads=num_threads)
+
+    def resize(self, image: Image.Image) -> np.ndarray:
+        image = image.convert("RGB")
+        if self.do_resize and image.size != self.size:
+            image = image.resize(self.size, resample=self.resample)
+        return np.asarray(image, dtype=np.uint8)
+
+    def resize_batch(self, images) -> np.ndarray:
+        # PIL releases the GIL while resizing, so a thread pool scales across cores
+        mapper = self._pool.map if self._pool is not None else map
+        return np.stack(list(mapper(self.resize, images)))
+
+    def normalize(self, pixels: np.ndarray) -> torch.Tensor:
+        """
+        uint8 NHWC array -> normalized float32 NCHW tensor.
+        """
+        pixel_values = torch.from_numpy(pixels).permute(0, 3, 1, 2).float()
+        return pixel_values.mul_(self.scale).add_(self.offset).contiguous()
+
+    def __call__(self, images, return_tensors="pt"):
+        if isinstance(images, Image.Image):
+            images = [images]
+        return {"pixel_values": self.normalize(self.resize_batch(images))}
+
+
+def resize_to_uint8(batch, preprocessor):
+    """
+    datasets.map function that replaces encoded images with the raw bytes of
+    their resized uint8 pixels: 150 KB per 224x224 image instead of 600 KB as
+    float32, and read back without any decoding.
+    """
+    return {"pixels": [preprocessor.resize(image).tobytes() for image in batch["image"]]}
+
+class TrainTransform:
+    """
+    Lazy per-batch transform for `Dataset.with_transform`. Runs inside the
+    DataLoader workers, so only the current batch is ever decoded.
+
+    Reads the compact `pixels` column when the dataset was resized ahead of
+    time, otherwise decodes and resizes the encoded `image` column. With
+    `augment`, applies random horizontal flips on the uint8 pixels.
+    """
+
+    def __init__(self, preprocessor: ImagePreprocessor, augment: bool = False):
+        self.preprocessor = preprocessor
+        self.augment = augment
+
+    def __call__(self, batch):
+        if "pixels" in batch:
+            width, height = self.preprocessor.size
+            pixels = np.stack([np.frombuffer(raw, dtype=np.uint8).reshape(height, width, 3) for raw in batch["pixels"]])
+        else:
+            pixels = np.stack([self.preprocessor.resize(image) for image in batch["image"]])
+
+        if self.augment:
+            flip = np.random.random(len(pixels)) < 0.5
+            pixels[flip] = pixels[flip, :, ::-1]
+        return {"pixels": list(pixels), "label": batch["label"]}
+
+class PixelCollator:
+    """
+    Stacks uint8 examples and normalizes the whole batch at once, producing
+    the `pixel_values` / `labels` inputs the Trainer expects.
+    """
+
+    def __init__(self, preprocessor: ImagePreprocessor):
+        self.preprocessor = preprocessor
+
+    def __call__(self, features):
+        pixels = np.stack([feature["pixels"] for feature in features])
+        return {
+            "pixel_values": self.preprocessor.normalize(pixels),
+            "labels": torch.tensor([feature["label"] for feature in features], dtype=torch.long),
+        }
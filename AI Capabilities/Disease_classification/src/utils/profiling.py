@@ -0,0 +1,69 @@
+import os
+import platform
+import resource
+import subprocess
+from datetime import datetime, timezone
+
+import numpy as np
+
+
+def latency_summary(latencies_s):
+    """
+    Summarizes a list of per-request latencies (in seconds) as milliseconds.
+    """
+    values = np.asarray(latencies_s, dtype=np.float64) * 1000.0
+    if values.size == 0:
+        return {"count": 0, "mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+
+    return {
+        "count": int(values.size),
+        "mean_ms": float(values.mean()),
+        "p50_ms": float(np.percentile(values, 50)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "p99_ms": float(np.percentile(values, 99)),
+        "max_ms": float(values.max()),
+    }
+
+
+def throughput(num_items, elapsed_s):
+    return num_items / elapsed_s if elapsed_s > 0 else 0.0
+
+
+
+def peak_rss_mb():
+    # ru_maxrss is reported in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def current_rss_mb():
+    # Resident set right now (Linux); elsewhere falls back to the peak so far
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        return peak_rss_mb()
+
+
+def git_commit(cwd=None):
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=cwd, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_metadata(cwd=None):
+    """
+    Describes where a benchmark ran, so results from different commits and
+    machines are only compared like for like.
+    """
+    import torch
+
+    return {
+        "commit": git_commit(cwd),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "torch": torch.__version__,
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
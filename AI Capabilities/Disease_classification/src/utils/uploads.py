@@ -0,0 +1,208 @@
+from multipart.multipart import MultipartParser, parse_options_header
+
+from src.utils.fetcher import ImageFetchError
+from src.utils.preprocessing import decode_image, decode_raw_pixels
+
+# Uncompressed RGB uint8 pixels, row-major HWC, sized by X-Image-Width / X-Image-Height
+RAW_RGB_CONTENT_TYPE = "image/x-raw-rgb"
+ENCODED_CONTENT_TYPES = ("image/jpeg", "image/png", "image/webp", "image/bmp", "image/gif", "image/tiff")
+# Room for the multipart boundaries and part headers on top of the image itself
+MULTIPART_OVERHEAD_BYTES = 16 * 1024
+
+
+class ImageUpload:
+    """
+    One image read from a request body: the bytes, their content type and,
+    for raw RGB pixels, the dimensions sent alongside them.
+    """
+
+    def __init__(self, data: bytes, content_type: str, filename=None, width=None, height=None):
+        self.data = data
+        self.content_type = content_type
+        self.filename = filename
+        self.width = width
+        self.height = height
+        # Set for multipart parts that went past the size cap; their bytes are dropped
+        self.too_large = False
+
+    @property
+    def is_raw(self) -> bool:
+        return self.content_type == RAW_RGB_CONTENT_TYPE
+
+
+def _header_dimension(headers, name, default):
+    value = headers.get(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ImageFetchError(f"Invalid {name} header: {value!r}", status_code=400)
+
+
+class _FilePartCollector:
+    """
+    MultipartParser callbacks that keep the bodies of up to `max_parts` parts
+    named `field`, in memory. A part past `max_bytes` stops being buffered and
+    is flagged `too_large`; more than `max_parts` of them is refused with 413.
+    Every other part is parsed and dropped.
+    """
+
+    def __init__(self, field: str, max_bytes: int, max_parts: int = 1, drop_extra_parts: bool = False):
+        self.field = field
+        self.max_bytes = max_bytes
+        self.max_parts = max_parts
+        self.drop_extra_parts = drop_extra_parts
+        self.parts = []
+        self._headers = {}
+        self._header_field = b""
+        self._header_value = b""
+        self._current = None
+
+    def callbacks(self):
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+        }
+
+    def on_part_begin(self):
+        self._headers = {}
+        self._header_field = self._header_value = b""
+
+    def on_header_field(self, data, start, end):
+        self._header_field += data[start:end]
+
+    def on_header_value(self, data, start, end):
+        self._header_value += data[start:end]
+
+    def on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = self._header_value = b""
+
+    def on_headers_finished(self):
+        _, disposition = parse_options_header(self._headers.get(b"content-disposition", b""))
+        name = disposition.get(b"name", b"").decode("latin-1")
+        if name != self.field:
+            return
+        if len(self.parts) == self.max_parts:
+            if self.drop_extra_parts:
+                return
+            raise ImageFetchError(f"At most {self.max_parts} images per request", status_code=413)
+
+        content_type, _ = parse_options_header(self._headers.get(b"content-type", b""))
+        filename = disposition.get(b"filename")
+        self._current = ImageUpload(bytearray(), content_type.decode("latin-1").lower(),
+                                    filename.decode("utf-8", "replace") if filename else None)
+        self.parts.append(self._current)
+
+    def on_part_data(self, data, start, end):
+        part = self._current
+        if part is None or part.too_large:
+            return
+        if len(part.data) + end - start > self.max_bytes:
+            part.too_large = True
+            part.data = bytearray()
+            return
+        part.data += data[start:end]
+
+    def on_part_end(self):
+        self._current = None
+
+
+async def _parse_multipart(request, options, collector: _FilePartCollector, limit: int):
+    boundary = options.get(b"boundary")
+    if not boundary:
+        raise ImageFetchError("Multipart body without a boundary", status_code=400)
+    parser = MultipartParser(boundary, collector.callbacks())
+    received = 0
+    async for chunk in request.stream():
+        # Also bounds what non-image parts may send
+        received += len(chunk)
+        if received > limit:
+            raise ImageFetchError("Request body exceeds the maximum allowed size", status_code=413)
+        parser.write(chunk)
+    parser.finalize()
+    for part in collector.parts:
+        part.data = bytes(part.data)
+    return collector.parts
+
+
+def _check_content_length(request, limit: int):
+    content_length = request.headers.get("content-length")
+    if content_length is not None and content_length.isdigit() and int(content_length) > limit:
+        raise ImageFetchError("Request body exceeds the maximum allowed size", status_code=413)
+
+
+async def read_image_upload(request, max_bytes: int, default_size=(224, 224), field: str = "file") -> ImageUpload:
+    """
+    Reads one image from `request` while the body streams in, without temp
+    files. Accepts either a multipart form with a `field` part or a bare body
+    with an image content type (JPEG, PNG, WebP or raw RGB pixels). Raw pixels
+    default to `default_size`; X-Image-Width / X-Image-Height override it.
+
+    Raises ImageFetchError with 413 once the body passes `max_bytes`, and with
+    400/415 for a missing or unsupported image.
+    """
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+    content_type = content_type.decode("latin-1").lower()
+    is_multipart = content_type == "multipart/form-data"
+
+    limit = max_bytes + (MULTIPART_OVERHEAD_BYTES if is_multipart else 0)
+    _check_content_length(request, limit)
+
+    width = _header_dimension(request.headers, "x-image-width", default_size[0])
+    height = _header_dimension(request.headers, "x-image-height", default_size[1])
+
+    if is_multipart:
+        parts = await _parse_multipart(request, options, _FilePartCollector(field, max_bytes, drop_extra_parts=True), limit)
+        if not parts:
+            raise ImageFetchError(f"Missing multipart `{field}` part", status_code=400)
+        upload = parts[0]
+        if upload.too_large:
+            raise ImageFetchError("Image exceeds the maximum allowed size", status_code=413)
+        upload.width, upload.height = width, height
+    elif content_type in ENCODED_CONTENT_TYPES or content_type == RAW_RGB_CONTENT_TYPE:
+        body = bytearray()
+        async for chunk in request.stream():
+            if len(body) + len(chunk) > max_bytes:
+                raise ImageFetchError("Image exceeds the maximum allowed size", status_code=413)
+            body += chunk
+        upload = ImageUpload(bytes(body), content_type, None, width, height)
+    else:
+        raise ImageFetchError(
+            f"Unsupported content type {content_type!r}; send multipart/form-data, "
+            f"{', '.join(ENCODED_CONTENT_TYPES)} or {RAW_RGB_CONTENT_TYPE}",
+            status_code=415)
+
+    if not upload.data:
+        raise ImageFetchError("Empty image upload", status_code=400)
+    return upload
+
+
+async def read_image_uploads(request, max_bytes: int, max_items: int, field: str = "files") -> list:
+    """
+    Reads every `field` part of a multipart body while it streams in, without
+    temp files. The whole body is capped at `max_items` images of `max_bytes`
+    each (plus multipart overhead) and refused with 413 as soon as it passes
+    that, or once it carries more than `max_items` parts. A single part past
+    `max_bytes` comes back flagged `too_large` so it fails on its own.
+    """
+    _, options = parse_options_header(request.headers.get("content-type", ""))
+    limit = max_items * (max_bytes + MULTIPART_OVERHEAD_BYTES)
+    _check_content_length(request, limit)
+    return await _parse_multipart(request, options, _FilePartCollector(field, max_bytes, max_items), limit)
+
+
+def decode_upload(upload: ImageUpload, max_pixels: int, max_dimension: int):
+    """
+    Raw RGB pixels are wrapped as is; anything else goes through decode_image,
+    which sniffs the actual format rather than trusting the content type.
+    """
+    if upload.is_raw:
+        return decode_raw_pixels(upload.data, upload.width, upload.height, max_pixels, max_dimension)
+    return decode_image(upload.data, max_pixels=max_pixels, max_dimension=max_dimension)
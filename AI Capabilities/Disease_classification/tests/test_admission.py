@@ -0,0 +1,88 @@
+import asyncio
+import time
+import pytest
+
+import sys
+import os
+
+# Ensure the root project directory is in the path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, ".."))
+sys.path.insert(0, project_root)
+
+from src.utils.admission import AdmissionController, AdmissionRejected, request_deadline
+
+class FakeRequest:
+    def __init__(self, headers=None, disconnected=False):
+        self.headers = headers or {}
+        self.disconnected = disconnected
+
+    async def is_disconnected(self):
+        return self.disconnected
+
+async def hold(controller, release, request=None, deadline=None):
+    async with controller.slot(request, deadline):
+        await release.wait()
+        return "done"
+
+def test_limits_concurrency_and_rejects_when_queue_is_full():
+    async def scenario():
+        controller = AdmissionController(max_concurrency=2, max_queue=1, queue_timeout_s=5, poll_interval_s=0.01)
+        release = asyncio.Event()
+        running = [asyncio.create_task(hold(controller, release)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        assert controller.in_flight == 2 and controller.waiting == 1
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            await hold(controller, release)
+        assert rejected.value.status_code == 429
+
+        release.set()
+        assert await asyncio.gather(*running) == ["done"] * 3
+        assert controller.in_flight == 0 and controller.waiting == 0
+
+    asyncio.run(scenario())
+
+def test_queued_request_times_out_with_503():
+    async def scenario():
+        controller = AdmissionController(max_concurrency=1, max_queue=4, queue_timeout_s=0.05, poll_interval_s=0.01)
+        release = asyncio.Event()
+        running = asyncio.create_task(hold(controller, release))
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            await hold(controller, release)
+        assert rejected.value.status_code == 503
+
+        release.set()
+        await running
+        # The timed-out waiter must not have leaked the slot
+        assert await asyncio.wait_for(hold(controller, release), 1) == "done"
+
+    asyncio.run(scenario())
+
+def test_queued_request_dropped_when_client_disconnects_or_deadline_passes():
+    async def scenario():
+        controller = AdmissionController(max_concurrency=1, max_queue=4, queue_timeout_s=5, poll_interval_s=0.01)
+        release = asyncio.Event()
+        running = asyncio.create_task(hold(controller, release))
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            await hold(controller, release, request=FakeRequest(disconnected=True))
+        assert rejected.value.status_code == 499
+
+        start = time.monotonic()
+        with pytest.raises(AdmissionRejected):
+            await hold(controller, release, deadline=time.monotonic() + 0.05)
+        assert time.monotonic() - start < 1
+
+        release.set()
+        await running
+
+    asyncio.run(scenario())
+
+def test_request_deadline_from_header():
+    assert request_deadline(FakeRequest()) is None
+    assert request_deadline(FakeRequest({"x-request-timeout-ms": "2000"})) - time.monotonic() == pytest.approx(2, abs=0.1)
+    assert request_deadline(FakeRequest({"x-request-timeout-ms": "soon"}), default_timeout_s=1) is not None
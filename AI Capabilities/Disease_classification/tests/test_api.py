@@ -1,5 +1,8 @@
 import pytest
 from fastapi.testclient import TestClient
+from io import BytesIO
+from PIL import Image
+import numpy as np
 
 import sys
 import os
@@ -10,10 +13,112 @@ project_root = os.path.abspath(os.path.join(current_dir, ".."))
 sys.path.insert(0, project_root)
 
 from src.main import app
+from src.models.classifier import load_model
 
 client = TestClient(app)
 
+def skin_image(size=(224, 224), seed=0):
+    # Noisy skin tone, so requests get past the skin gate
+    rng = np.random.default_rng(seed)
+    pixels = np.array([198, 134, 100], dtype=np.float32) + rng.normal(0, 10, (size[1], size[0], 3))
+    return Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+
 def test_home():
     response = client.get("/")
     assert response.status_code == 200
-    assert response.json() == {"message": "Welcome to the Skin Disease Classification API"}
\ No newline at end of file
+    assert response.json() == {"message": "Welcome to the Skin Disease Classification API"}
+def test_ready_after_model_load():
+    load_model()
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+
+def test_predict_batch_reports_per_item_failures():
+    load_model()
+    image = BytesIO()
+    skin_image().save(image, "JPEG")
+    files = [
+        ("files", ("skin.jpg", image.getvalue(), "image/jpeg")),
+        ("files", ("notes.txt", b"not an image", "text/plain")),
+    ]
+    response = client.post("/predict/batch", files=files)
+    assert response.status_code == 200
+
+    results = response.json()["results"]
+    assert [item["source"] for item in results] == ["skin.jpg", "notes.txt"]
+    assert results[0]["status"] == "ok" and "prediction" in results[0]
+    assert results[1]["status"] == "error"
+
+def test_predict_batch_refuses_too_many_parts_while_streaming():
+    load_model()
+    from src.api.endpoints import BATCH_REQUEST_MAX_ITEMS
+    files = [("files", (f"{i}.jpg", b"x", "image/jpeg")) for i in range(BATCH_REQUEST_MAX_ITEMS + 1)]
+    response = client.post("/predict/batch", files=files)
+    assert response.status_code == 413
+
+def test_predict_upload_accepts_multipart_encoded_and_raw_bodies():
+    load_model()
+    image = skin_image()
+    buffer = BytesIO()
+    image.save(buffer, "JPEG")
+
+    response = client.post("/predict/upload", files={"file": ("skin.jpg", buffer.getvalue(), "image/jpeg")})
+    assert response.status_code == 200 and "prediction" in response.json()
+
+    response = client.post("/predict/upload", content=buffer.getvalue(), headers={"Content-Type": "image/jpeg"})
+    assert response.status_code == 200
+
+    raw = image.tobytes()
+    response = client.post("/predict/upload", content=raw, headers={"Content-Type": "image/x-raw-rgb"})
+    assert response.status_code == 200
+    response = client.post("/predict/upload", content=raw[:-3], headers={"Content-Type": "image/x-raw-rgb"})
+    assert response.status_code == 400
+
+def test_predict_upload_rejects_bad_uploads():
+    load_model()
+    response = client.post("/predict/upload", files={"other": ("a.jpg", b"x", "image/jpeg")})
+    assert response.status_code == 400
+    response = client.post("/predict/upload", content=b"hello", headers={"Content-Type": "text/plain"})
+    assert response.status_code == 415
+
+    # Small on the wire, far too many pixels once decoded
+    bomb = BytesIO()
+    Image.new("L", (20000, 20000)).save(bomb, "PNG")
+    response = client.post("/predict/upload", files={"file": ("bomb.png", bomb.getvalue(), "image/png")})
+    assert response.status_code == 413
+
+def test_admin_model_info_and_protected_reload():
+    load_model()
+    info = client.get("/admin/model").json()
+    assert info["active"]["model_version"] and "load_seconds" in info["active"]
+
+    # Reloads are disabled unless ADMIN_TOKEN is configured and sent
+    assert client.post("/admin/model/reload").status_code == 403
+    assert client.post("/admin/model/reload", headers={"X-Admin-Token": "guess"}).status_code == 403
+
+def test_predict_response_names_the_model_version():
+    load_model()
+    image = BytesIO()
+    skin_image(seed=1).save(image, "PNG")
+    response = client.post("/predict/upload", content=image.getvalue(), headers={"Content-Type": "image/png"})
+    assert response.json()["model_version"] == client.get("/admin/model").json()["active"]["model_version"]
+
+def test_non_skin_images_are_turned_away_before_the_model(monkeypatch):
+    from src.api import endpoints
+    from src.models.skin_gate import SkinGate
+
+    # The gate is opt-in
+    monkeypatch.setattr(endpoints, "skin_gate", SkinGate())
+    load_model()
+    blank = BytesIO()
+    Image.new("RGB", (640, 480), color="black").save(blank, "PNG")
+    response = client.post("/predict/upload", content=blank.getvalue(), headers={"Content-Type": "image/png"})
+    assert response.status_code == 422
+    assert response.json()["detail"]["status"] == "not_skin"
+
+    photo = BytesIO()
+    skin_image().save(photo, "PNG")
+    files = [("files", ("blank.png", blank.getvalue(), "image/png")), ("files", ("skin.png", photo.getvalue(), "image/png"))]
+    results = client.post("/predict/batch", files=files).json()["results"]
+    assert [item["status"] for item in results] == ["not_skin", "ok"]
+    assert results[0]["reason"] == "blank"
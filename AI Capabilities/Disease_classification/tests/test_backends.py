@@ -0,0 +1,85 @@
+import torch
+from transformers import ViTConfig, ViTForImageClassification
+import sys
+import os
+
+# Ensure the root project directory is in the path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, ".."))
+sys.path.insert(0, project_root)
+
+from src.models.backends import (TorchBackend, OnnxBackend, export_onnx, check_parity, quantize_int8, model_size_mb,
+                                 save_torch_model, artifact_version)
+
+def tiny_vit():
+    config = ViTConfig(
+        hidden_size=32,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=64,
+        image_size=224,
+        patch_size=16,
+        num_labels=11,
+    )
+    return ViTForImageClassification(config).eval()
+
+def test_onnx_backend_matches_torch(tmp_path):
+    model = tiny_vit()
+    onnx_path = str(tmp_path / "model.onnx")
+    export_onnx(model, onnx_path)
+
+    pixel_values = torch.rand(3, 3, 224, 224) * 2 - 1
+    report = check_parity(TorchBackend(model, torch.device("cpu")), OnnxBackend(onnx_path), pixel_values)
+
+    assert report["passed"]
+    assert report["max_abs_diff"] < 1e-3
+
+def test_torch_backend_returns_logits_per_image():
+    backend = TorchBackend(tiny_vit(), torch.device("cpu"))
+    logits = backend.logits(torch.zeros(4, 3, 224, 224))
+    assert logits.shape == (4, 11)
+
+def test_int8_quantization_shrinks_model_and_keeps_logits_close():
+    model = tiny_vit()
+    fp32_size = model_size_mb(model)
+    pixel_values = torch.rand(2, 3, 224, 224) * 2 - 1
+    reference = TorchBackend(model, torch.device("cpu")).logits(pixel_values)
+
+    quantized = quantize_int8(model)
+    logits = TorchBackend(quantized, torch.device("cpu"), name="torch_int8").logits(pixel_values)
+
+    assert model_size_mb(quantized) < fp32_size
+    assert (logits - reference).abs().max().item() < 0.1
+
+def test_bf16_autocast_returns_fp32_logits_close_to_fp32():
+    model = tiny_vit()
+    pixel_values = torch.rand(2, 3, 224, 224) * 2 - 1
+    fp32 = TorchBackend(model, torch.device("cpu"))
+    bf16 = TorchBackend(model, torch.device("cpu"), name="torch_bf16", autocast_dtype=torch.bfloat16,
+                        channels_last=True)
+
+    logits = bf16.logits(pixel_values)
+    assert logits.dtype == torch.float32
+    report = check_parity(fp32, bf16, pixel_values, atol=0.1)
+    assert report["max_abs_diff"] < 0.1
+
+def test_label_only_change_gets_a_new_version(tmp_path):
+    model = tiny_vit()
+    model_path = save_torch_model(model, str(tmp_path))
+    config_path = str(tmp_path / "config.json")
+    before = artifact_version(model_path, "torch", config_path)
+
+    model.config.id2label = {i: f"class {i}" for i in range(11)}
+    model.config.to_json_file(config_path)
+    assert artifact_version(model_path, "torch", config_path) != before
+
+def test_onnx_backend_reads_label_names_from_the_config(tmp_path):
+    model = tiny_vit()
+    model.config.id2label = {i: f"class {i}" for i in range(11)}
+    save_torch_model(model, str(tmp_path))
+    onnx_path = str(tmp_path / "model.onnx")
+    export_onnx(model, onnx_path)
+
+    backend = OnnxBackend(onnx_path, config_path=str(tmp_path / "config.json"))
+    assert backend.id2label == TorchBackend(model, torch.device("cpu")).id2label
+    assert backend.id2label["10"] == "class 10"
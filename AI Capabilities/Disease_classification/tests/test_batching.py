@@ -0,0 +1,82 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import sys
+import os
+
+# Ensure the root project directory is in the path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, ".."))
+sys.path.insert(0, project_root)
+
+from src.models.batching import MicroBatcher
+from src.utils.profiling import latency_summary
+
+def test_batcher_returns_each_caller_its_own_result():
+    batch_sizes = []
+
+    def double_all(items):
+        batch_sizes.append(len(items))
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(double_all, max_batch_size=8, max_wait_ms=50)
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(batcher.predict, range(32)))
+    batcher.close()
+
+    assert results == [i * 2 for i in range(32)]
+    assert max(batch_sizes) <= 8
+    assert len(batch_sizes) < 32
+
+def test_batcher_flushes_partial_batch_after_max_wait():
+    batcher = MicroBatcher(lambda items: items, max_batch_size=16, max_wait_ms=5)
+    assert batcher.predict("only", timeout=2) == "only"
+    batcher.close()
+
+def test_batcher_propagates_errors_to_every_caller():
+    def fail(items):
+        raise ValueError("boom")
+
+    batcher = MicroBatcher(fail, max_batch_size=4, max_wait_ms=5)
+    futures = [batcher.submit(i) for i in range(3)]
+    for future in futures:
+        with pytest.raises(ValueError):
+            future.result(timeout=2)
+    batcher.close()
+
+# A caller cancelled mid-request (client hang-up, timeout) must not take the worker thread down
+def test_batcher_survives_cancelled_callers():
+    release = threading.Event()
+
+    def gated(items):
+        release.wait(2)
+        return items
+
+    batcher = MicroBatcher(gated, max_batch_size=1, max_wait_ms=1)
+
+    async def scenario():
+        running = asyncio.ensure_future(asyncio.wrap_future(batcher.submit("running")))
+        await asyncio.sleep(0.05)  # the worker is now inside gated()
+        queued = asyncio.ensure_future(asyncio.wrap_future(batcher.submit("queued")))
+        await asyncio.sleep(0.01)
+        running.cancel()
+        queued.cancel()
+        await asyncio.sleep(0.01)
+        release.set()
+
+    asyncio.run(scenario())
+    assert batcher.predict("next", timeout=2) == "next"
+    batcher.close()
+
+def test_batcher_rejects_after_close():
+    batcher = MicroBatcher(lambda items: items)
+    batcher.close()
+    with pytest.raises(RuntimeError):
+        batcher.submit(1)
+
+def test_latency_summary():
+    summary = latency_summary([0.001 * i for i in range(1, 101)])
+    assert summary["count"] == 100
+    assert summary["p50_ms"] == pytest.approx(50.5)
+    assert summary["p99_ms"] <= summary["max_ms"] == pytest.approx(100.0)
@@ -0,0 +1,108 @@
+import json
+import httpx
+import pytest
+import torch
+from PIL import Image
+import sys
+import os
+
+# Ensure the root project directory is in the path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, ".."))
+sys.path.insert(0, project_root)
+
+from src.models.bulk_inference import iter_sources, read_source, JsonlResultWriter, ParquetResultWriter, run_bulk_inference
+from src.utils.preprocessing import ImagePreprocessor
+from src.utils.config import load_preprocessor_config
+
+ID2LABEL = {"0": "Acne", "1": "Eczema"}
+
+class BrightnessBackend:
+    # Predicts "Eczema" for bright images, "Acne" for dark ones
+    name = "fake"
+
+    def logits(self, pixel_values):
+        brightness = pixel_values.mean(dim=(1, 2, 3))
+        return torch.stack([-brightness, brightness], dim=1)
+
+def make_images(directory, count):
+    paths = []
+    for i in range(count):
+        path = directory / f"img_{i}.jpg"
+        Image.new("RGB", (64, 48), color=(255, 255, 255) if i % 2 else (0, 0, 0)).save(path)
+        paths.append(str(path))
+    return paths
+
+def test_iter_sources_reads_directories_and_manifests(tmp_path):
+    paths = make_images(tmp_path, 3)
+    (tmp_path / "notes.txt").write_text("not an image")
+
+    assert [item["source"] for item in iter_sources(str(tmp_path))] == paths
+
+    csv_manifest = tmp_path / "manifest.csv"
+    csv_manifest.write_text("id,url\na,https://example.com/a.jpg\nb,https://example.com/b.jpg\n")
+    assert list(iter_sources(str(csv_manifest))) == [
+        {"id": "a", "source": "https://example.com/a.jpg"},
+        {"id": "b", "source": "https://example.com/b.jpg"},
+    ]
+
+    jsonl_manifest = tmp_path / "manifest.jsonl"
+    jsonl_manifest.write_text(json.dumps({"path": paths[0]}) + "\n")
+    assert list(iter_sources(str(jsonl_manifest))) == [{"id": paths[0], "source": paths[0]}]
+
+    assert len(list(iter_sources(str(tmp_path / "*.jpg")))) == 3
+
+def test_bulk_inference_writes_results_and_resumes(tmp_path):
+    paths = make_images(tmp_path, 5)
+    sources = [{"id": path, "source": path} for path in paths] + [{"id": "missing", "source": str(tmp_path / "x.jpg")}]
+    preprocessor = ImagePreprocessor(load_preprocessor_config())
+    output = str(tmp_path / "out.jsonl")
+
+    stats = run_bulk_inference(sources[:3], BrightnessBackend(), preprocessor, JsonlResultWriter(output),
+                               ID2LABEL, "test-v1", batch_size=2, num_workers=2)
+    assert stats["processed"] == 3
+
+    stats = run_bulk_inference(sources, BrightnessBackend(), preprocessor, JsonlResultWriter(output),
+                               ID2LABEL, "test-v1", batch_size=2, num_workers=2)
+    assert stats["skipped"] == 3 and stats["processed"] == 3 and stats["failed"] == 1
+
+    with open(output) as f:
+        rows = {row["id"]: row for row in map(json.loads, f)}
+    assert len(rows) == 6
+    assert rows[paths[0]]["prediction"] == "Acne"
+    assert rows[paths[1]]["prediction"] == "Eczema"
+    assert rows["missing"]["error"] is not None
+
+    # Failed items are retried on every run; successful ones are not redone
+    stats = run_bulk_inference(sources, BrightnessBackend(), preprocessor, JsonlResultWriter(output),
+                               ID2LABEL, "test-v1", batch_size=2, num_workers=2)
+    assert stats["skipped"] == 5 and stats["processed"] == 1 and stats["failed"] == 1
+
+    # A new model version redoes everything instead of keeping the old predictions
+    stats = run_bulk_inference(sources[:5], BrightnessBackend(), preprocessor, JsonlResultWriter(output),
+                               ID2LABEL, "test-v2", batch_size=2, num_workers=2)
+    assert stats["skipped"] == 0 and stats["processed"] == 5
+    assert JsonlResultWriter(output).completed_ids("test-v2") == set(paths)
+
+def test_parquet_writer_round_trip(tmp_path):
+    writer = ParquetResultWriter(str(tmp_path / "out.parquet"), rows_per_file=2)
+    writer.write([{"id": "a", "prediction": "Acne", "model_version": "v1"},
+                  {"id": "b", "prediction": "Acne", "model_version": "v0"},
+                  {"id": "c", "error": "x", "model_version": "v1"}])
+    writer.close()
+    assert ParquetResultWriter(str(tmp_path / "out.parquet")).completed_ids("v1") == {"a"}
+
+def test_read_source_streams_urls_with_a_size_cap():
+    def handler(request):
+        return httpx.Response(200, content=b"x" * 2048)
+
+    with httpx.Client(transport=httpx.MockTransport(handler)) as client:
+        assert read_source("http://stand-in/a.jpg", client, max_bytes=4096) == b"x" * 2048
+        with pytest.raises(ValueError):
+            read_source("http://stand-in/a.jpg", client, max_bytes=1024)
+
+def test_parquet_writer_flushes_on_an_interval(tmp_path):
+    writer = ParquetResultWriter(str(tmp_path / "out.parquet"), rows_per_file=1000, flush_interval_s=0)
+    writer.write([{"id": "a", "model_version": "v1"}])
+    # Written out without close(), so a crash here would not lose the row
+    assert ParquetResultWriter(str(tmp_path / "out.parquet")).completed_ids("v1") == {"a"}
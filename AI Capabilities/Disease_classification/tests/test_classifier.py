@@ -7,14 +7,114 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.abspath(os.path.join(current_dir, ".."))
 sys.path.insert(0, project_root)
 
-from src.models.classifier import predict_disease
+from src.models.classifier import load_model, predict_images
 
 def test_predict_disease(tmp_path):
     image_path = tmp_path / "test.jpg"
     img = Image.new("RGB", (224, 224), color="white")
     img.save(image_path)
 
-    result = predict_disease(str(image_path))
+    load_model()
+    result = predict_images([Image.open(image_path)])[0]
     assert "prediction" in result
     assert "confidence" in result
     assert 0.0 <= result["confidence"] <= 1.0
+
+def test_reload_swaps_to_new_weights(tmp_path):
+    import copy
+    import torch
+    from src.models import classifier
+    from src.models.backends import save_torch_model
+
+    load_model()
+    old = classifier.registry.active
+    unchanged = classifier.reload_model(old.stats["model_path"], run_warmup=False)
+    assert unchanged["model_version"] == old.version and classifier.reload_status["status"] == "unchanged"
+
+    model = copy.deepcopy(old.backend.model)
+    with torch.no_grad():
+        model.classifier.bias.add_(1.0)
+    model_path = save_torch_model(model, str(tmp_path))
+
+    try:
+        stats = classifier.reload_model(model_path, str(tmp_path / "config.json"), run_warmup=False)
+        assert stats["model_version"] != old.version
+        assert classifier.registry.active.version == stats["model_version"]
+        result = predict_images([Image.new("RGB", (224, 224), color="black")])[0]
+        assert result["model_version"] == stats["model_version"]
+    finally:
+        classifier.reload_model(old.stats["model_path"], run_warmup=False)
+
+def test_bf16_preload_defers_the_parity_check_to_the_worker(monkeypatch):
+    import torch
+    from transformers import ViTConfig, ViTForImageClassification
+    from src.models import classifier
+
+    tiny = ViTForImageClassification(ViTConfig(hidden_size=32, num_hidden_layers=1, num_attention_heads=2,
+                                               intermediate_size=64, num_labels=3)).eval()
+    parity_checks = []
+
+    def recording_check(reference, candidate, pixel_values, atol):
+        parity_checks.append(candidate.name)
+        return {"passed": True, "max_abs_diff": 0.0, "top1_agreement": 1.0}
+
+    monkeypatch.setattr(classifier, "INFERENCE_BACKEND", "torch_bf16")
+    monkeypatch.setattr(classifier, "load_torch_model", lambda model_path, config_path, device: tiny)
+    monkeypatch.setattr(classifier, "artifact_version", lambda path, backend_name, config_path=None: backend_name)
+    monkeypatch.setattr(classifier, "cpu_supports_bf16", lambda: True)
+    monkeypatch.setattr(classifier, "check_parity", recording_check)
+    monkeypatch.setattr(classifier, "_preloaded", None)
+
+    # The pre-fork master loads weights only: no forward pass, so no intra-op threads
+    classifier.preload_weights()
+    assert parity_checks == []
+    assert classifier._preloaded[0].name == "torch"
+
+    # Each worker runs the check before serving
+    loaded_backend, version, _, _, _ = classifier.finish_preloaded(classifier._preloaded)
+    assert parity_checks == ["torch_bf16"]
+    assert loaded_backend.name == version == "torch_bf16"
+
+def test_predictions_use_the_served_model_labels(tmp_path, monkeypatch):
+    from transformers import ViTConfig, ViTForImageClassification
+    from src.models import classifier
+    from src.models.backends import save_torch_model
+    from src.models.registry import ModelRegistry
+
+    # A retrained model whose classes differ from the global config/config.json
+    tiny = ViTForImageClassification(ViTConfig(hidden_size=32, num_hidden_layers=1, num_attention_heads=2,
+                                               intermediate_size=64, num_labels=2,
+                                               id2label={0: "Alpha", 1: "Beta"})).eval()
+    model_path = save_torch_model(tiny, str(tmp_path))
+
+    monkeypatch.setattr(classifier, "INFERENCE_BACKEND", "torch")
+    monkeypatch.setattr(classifier, "BATCHING_ENABLED", False)
+    monkeypatch.setattr(classifier, "prediction_cache", None)
+    monkeypatch.setattr(classifier, "registry", ModelRegistry())
+    classifier.reload_model(model_path, str(tmp_path / "config.json"), run_warmup=False)
+
+    result = classifier.predict_images([Image.new("RGB", (224, 224))])[0]
+    assert result["prediction"] in {"Alpha", "Beta"}
+
+def test_reload_compares_the_version_of_the_backend_that_loaded(tmp_path, monkeypatch):
+    from transformers import ViTConfig, ViTForImageClassification
+    from src.models import classifier
+    from src.models.backends import save_torch_model
+    from src.models.registry import ModelRegistry
+
+    tiny = ViTForImageClassification(ViTConfig(hidden_size=32, num_hidden_layers=1, num_attention_heads=2,
+                                               intermediate_size=64, num_labels=3)).eval()
+    model_path = save_torch_model(tiny, str(tmp_path))
+    config_path = str(tmp_path / "config.json")
+
+    # torch_bf16 serves fp32 on this CPU, so the active version is a "torch-" one
+    monkeypatch.setattr(classifier, "INFERENCE_BACKEND", "torch_bf16")
+    monkeypatch.setattr(classifier, "cpu_supports_bf16", lambda: False)
+    monkeypatch.setattr(classifier, "BATCHING_ENABLED", False)
+    monkeypatch.setattr(classifier, "registry", ModelRegistry())
+    loaded = classifier.reload_model(model_path, config_path, run_warmup=False)
+    assert loaded["model_version"].startswith("torch-")
+
+    unchanged = classifier.reload_model(model_path, config_path, run_warmup=False)
+    assert classifier.reload_status["status"] == "unchanged"
+    assert unchanged["model_version"] == loaded["model_version"]
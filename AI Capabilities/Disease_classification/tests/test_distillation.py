@@ -0,0 +1,34 @@
+import os
+import torch
+import torch.nn.functional as F
+import sys
+
+# Ensure the root project directory is in the path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, ".."))
+sys.path.insert(0, project_root)
+
+from src.models.distillation import build_student, distillation_loss
+from src.models.backends import save_torch_model, load_torch_model
+from src.utils.config import id2label
+
+def test_distillation_loss_blends_teacher_and_labels():
+    torch.manual_seed(0)
+    student, teacher = torch.randn(4, 11), torch.randn(4, 11)
+    labels = torch.tensor([0, 3, 5, 10])
+
+    assert torch.allclose(distillation_loss(student, teacher, labels, alpha=0.0), F.cross_entropy(student, labels))
+    # Matching the teacher exactly leaves only the label term
+    assert torch.allclose(distillation_loss(teacher, teacher, labels, alpha=1.0), torch.tensor(0.0), atol=1e-6)
+    assert distillation_loss(student, teacher, labels, alpha=1.0) > 0
+
+def test_student_exports_in_the_served_format(tmp_path):
+    student = build_student("tiny", id2label, pretrained=False).eval()
+    assert sum(p.numel() for p in student.parameters()) < 6_000_000
+
+    model_path = save_torch_model(student, str(tmp_path))
+    served = load_torch_model(model_path, str(tmp_path / "config.json"), torch.device("cpu"))
+    pixel_values = torch.rand(2, 3, 224, 224)
+    with torch.no_grad():
+        assert torch.allclose(served(pixel_values=pixel_values).logits, student(pixel_values=pixel_values).logits)
+    assert served.config.id2label[0] == id2label["0"]
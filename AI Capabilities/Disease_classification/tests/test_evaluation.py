@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+import sys
+import os
+
+# Ensure the root project directory is in the path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, ".."))
+sys.path.insert(0, project_root)
+
+from src.models.evaluation import classification_report, compare_reports, regression_gate
+
+ID2LABEL = {"0": "Acne", "1": "Eczema", "2": "Warts"}
+
+def test_classification_report_per_class_accuracy():
+    report = classification_report(np.array([0, 0, 1, 2]), np.array([0, 1, 1, 2]), ID2LABEL)
+    assert report["accuracy"] == pytest.approx(0.75)
+    assert report["per_class"]["Eczema"] == {"accuracy": 0.5, "support": 2}
+    assert report["per_class"]["Warts"]["accuracy"] == 1.0
+
+def test_regression_gate_flags_class_drop():
+    reference = classification_report([0, 1, 1, 2], [0, 1, 1, 2], ID2LABEL)
+    candidate = classification_report([0, 1, 0, 2], [0, 1, 1, 2], ID2LABEL)
+    comparison = compare_reports(reference, candidate)
+
+    assert comparison["accuracy_delta"] == pytest.approx(-0.25)
+    assert comparison["per_class_delta"]["Eczema"] == pytest.approx(-0.5)
+    failures = regression_gate(comparison, max_accuracy_drop=0.3, max_class_drop=0.1)
+    assert len(failures) == 1 and "Eczema" in failures[0]
+
+def test_regression_gate_passes_identical_predictions():
+    report = classification_report([0, 1, 2], [0, 1, 2], ID2LABEL)
+    assert regression_gate(compare_reports(report, report)) == []
+
+def test_runtime_memory_is_measured_in_a_separate_process(tmp_path):
+    from transformers import ViTConfig, ViTForImageClassification
+    from src.models.backends import save_torch_model
+    from src.models.evaluation import runtime_memory
+
+    tiny = ViTForImageClassification(ViTConfig(hidden_size=32, num_hidden_layers=1, num_attention_heads=2,
+                                               intermediate_size=64, num_labels=3)).eval()
+    model_path = save_torch_model(tiny, str(tmp_path))
+    memory = runtime_memory(model_path, str(tmp_path / "config.json"))
+    assert memory["batch_size"] == 1
+    assert 0 <= memory["load_delta_mb"] <= memory["peak_delta_mb"]
+    assert memory["peak_rss_mb"] == pytest.approx(memory["baseline_rss_mb"] + memory["peak_delta_mb"])
@@ -0,0 +1,98 @@
+import asyncio
+import httpx
+import pytest
+import sys
+import os
+import time
+
+# Ensure the root project directory is in the path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, ".."))
+sys.path.insert(0, project_root)
+
+from src.utils.fetcher import ImageFetcher, ImageFetchError
+
+IMAGE_BYTES = b"\xff\xd8fake-jpeg-bytes\xff\xd9"
+
+def stand_in_handler(request):
+    # Local stand-in for Cloudinary
+    if request.url.path == "/image.jpg":
+        return httpx.Response(200, content=IMAGE_BYTES)
+    if request.url.path == "/huge.jpg":
+        return httpx.Response(200, content=b"x" * 2048)
+    if request.url.path == "/slow.jpg":
+        raise httpx.ReadTimeout("read timed out", request=request)
+    return httpx.Response(404)
+
+def fetch(fetcher, url):
+    async def run():
+        try:
+            return await fetcher.fetch(url)
+        finally:
+            await fetcher.aclose()
+    return asyncio.run(run())
+
+def test_fetch_returns_image_bytes():
+    fetcher = ImageFetcher(transport=httpx.MockTransport(stand_in_handler))
+    assert fetch(fetcher, "http://stand-in/image.jpg") == IMAGE_BYTES
+
+def test_fetch_rejects_missing_image():
+    fetcher = ImageFetcher(transport=httpx.MockTransport(stand_in_handler))
+    with pytest.raises(ImageFetchError) as exc:
+        fetch(fetcher, "http://stand-in/missing.jpg")
+    assert exc.value.status_code == 400
+
+def test_fetch_enforces_size_cap():
+    fetcher = ImageFetcher(max_bytes=1024, transport=httpx.MockTransport(stand_in_handler))
+    with pytest.raises(ImageFetchError) as exc:
+        fetch(fetcher, "http://stand-in/huge.jpg")
+    assert exc.value.status_code == 413
+
+def test_fetch_maps_timeouts_to_504():
+    fetcher = ImageFetcher(transport=httpx.MockTransport(stand_in_handler))
+    with pytest.raises(ImageFetchError) as exc:
+        fetch(fetcher, "http://stand-in/slow.jpg")
+    assert exc.value.status_code == 504
+
+def test_fetch_serves_repeat_urls_from_disk_cache(tmp_path):
+    calls = []
+
+    def counting_handler(request):
+        calls.append(request.url.path)
+        return stand_in_handler(request)
+
+    fetcher = ImageFetcher(cache_dir=str(tmp_path), transport=httpx.MockTransport(counting_handler))
+    assert fetch(fetcher, "http://stand-in/image.jpg") == IMAGE_BYTES
+    assert fetch(fetcher, "http://stand-in/image.jpg") == IMAGE_BYTES
+    assert calls == ["/image.jpg"]
+
+def test_disk_cache_evicts_least_recently_used_past_the_byte_cap(tmp_path):
+    def sized_handler(request):
+        return httpx.Response(200, content=b"x" * 400)
+
+    fetcher = ImageFetcher(cache_dir=str(tmp_path), cache_max_bytes=1000, transport=httpx.MockTransport(sized_handler))
+    now = time.time()
+    for index in range(2):
+        fetch(fetcher, f"http://stand-in/{index}.jpg")
+        # Distinct recent mtimes so the eviction order is deterministic
+        os.utime(fetcher._cache_path(f"http://stand-in/{index}.jpg"), (now - 100 + index, now - 100 + index))
+    # A hit refreshes the entry, so the other one is evicted first
+    fetch(fetcher, "http://stand-in/0.jpg")
+    fetch(fetcher, "http://stand-in/2.jpg")
+
+    assert os.path.exists(fetcher._cache_path("http://stand-in/0.jpg"))
+    assert not os.path.exists(fetcher._cache_path("http://stand-in/1.jpg"))
+    assert sum(os.path.getsize(entry.path) for entry in os.scandir(tmp_path)) <= 1000
+
+def test_disk_cache_ignores_expired_entries(tmp_path):
+    calls = []
+
+    def counting_handler(request):
+        calls.append(request.url.path)
+        return stand_in_handler(request)
+
+    fetcher = ImageFetcher(cache_dir=str(tmp_path), cache_ttl=60, transport=httpx.MockTransport(counting_handler))
+    fetch(fetcher, "http://stand-in/image.jpg")
+    os.utime(fetcher._cache_path("http://stand-in/image.jpg"), (0, 0))
+    assert fetch(fetcher, "http://stand-in/image.jpg") == IMAGE_BYTES
+    assert calls == ["/image.jpg", "/image.jpg"]
@@ -0,0 +1,50 @@
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+import sys
+import os
+
+# Ensure the root project directory is in the path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, ".."))
+sys.path.insert(0, project_root)
+
+from src.main import app
+from src.models.classifier import load_model
+from src.utils.metrics import time_stage, track_request, record_error
+from src.utils.fetcher import ImageFetchError
+
+client = TestClient(app)
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+def test_time_stage_and_track_request():
+    before = sample("classifier_stage_seconds_count", stage="decode")
+    with time_stage("decode"):
+        pass
+    assert sample("classifier_stage_seconds_count", stage="decode") == before + 1
+
+    with track_request("unit_test"):
+        assert sample("classifier_requests_in_flight", endpoint="unit_test") == 1
+    assert sample("classifier_requests_in_flight", endpoint="unit_test") == 0
+    assert sample("classifier_request_seconds_count", endpoint="unit_test") == 1
+
+def test_record_error_counts_by_stage_and_type():
+    record_error("fetch", TimeoutError("slow"))
+    record_error("fetch", TimeoutError("slow"))
+    assert sample("classifier_errors_total", stage="fetch", type="TimeoutError") == 2
+
+    record_error("fetch", ImageFetchError("too slow", status_code=504))
+    assert sample("classifier_errors_total", stage="fetch", type="ImageFetchError_504") == 1
+
+def test_metrics_endpoint_reports_decode_failures():
+    load_model()
+    before = sample("classifier_errors_total", stage="decode", type="UnidentifiedImageError")
+    client.post("/predict/batch", files=[("files", ("notes.txt", b"not an image", "text/plain"))])
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "classifier_stage_seconds_bucket" in response.text
+    assert sample("classifier_errors_total", stage="decode", type="UnidentifiedImageError") == before + 1
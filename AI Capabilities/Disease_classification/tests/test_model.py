@@ -9,10 +9,11 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.abspath(os.path.join(current_dir, ".."))
 sys.path.insert(0, project_root)
 
-from src.models.classifier import predict_disease
+from src.models.classifier import load_model, predict_images
 
 def test_model_prediction():
     image_path = "download2.jpg"
-    result = predict_disease(image_path)
+    load_model()
+    result = predict_images([Image.open(image_path).convert("RGB")])[0]
     assert "prediction" in result
     assert 0 <= result["confidence"] <= 1
\ No newline at end of file
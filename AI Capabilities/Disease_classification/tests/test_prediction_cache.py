@@ -0,0 +1,75 @@
+import time
+from PIL import Image
+import sys
+import os
+
+# Ensure the root project directory is in the path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, ".."))
+sys.path.insert(0, project_root)
+
+from src.models.prediction_cache import PredictionCache
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value
+
+def test_same_pixels_share_a_key_across_image_objects():
+    cache = PredictionCache()
+    first = Image.new("RGB", (64, 64), color="red")
+    second = Image.new("RGB", (64, 64), color="red")
+    other = Image.new("RGB", (64, 64), color="blue")
+
+    assert cache.make_key(first, "v1") == cache.make_key(second, "v1")
+    assert cache.make_key(first, "v1") != cache.make_key(other, "v1")
+    assert cache.make_key(first, "v1") != cache.make_key(first, "v2")
+
+def test_hit_miss_counters():
+    cache = PredictionCache()
+    key = cache.make_key(Image.new("RGB", (8, 8)), "v1")
+
+    assert cache.get(key) is None
+    cache.set(key, {"prediction": "Acne"})
+    assert cache.get(key) == {"prediction": "Acne"}
+
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+def test_lru_eviction_and_ttl():
+    cache = PredictionCache(max_entries=2, ttl_s=0.05)
+    cache.set("v1:a", {"prediction": "a"})
+    cache.set("v1:b", {"prediction": "b"})
+    cache.get("v1:a")
+    cache.set("v1:c", {"prediction": "c"})
+
+    assert cache.get("v1:b") is None
+    assert cache.get("v1:a") is not None
+    time.sleep(0.06)
+    assert cache.get("v1:a") is None
+
+def test_versions_are_cached_apart_and_interleaving_keeps_both():
+    cache = PredictionCache()
+    cache.set("v1:a", {"prediction": "old"})
+    assert cache.get("v2:a") is None
+    cache.set("v2:a", {"prediction": "new"})
+
+    # Requests on the draining and the new model alternate during a reload
+    assert cache.get("v1:a") == {"prediction": "old"}
+    assert cache.get("v2:a") == {"prediction": "new"}
+    assert cache.stats()["entries"] == 2
+
+def test_redis_tier_is_shared_between_workers():
+    redis = FakeRedis()
+    worker_a = PredictionCache(redis_client=redis)
+    worker_b = PredictionCache(redis_client=redis)
+
+    worker_a.set("v1:a", {"prediction": "Acne"})
+    assert worker_b.get("v1:a") == {"prediction": "Acne"}
+    assert worker_b.stats()["redis_hits"] == 1
@@ -1,4 +1,7 @@
+import pytest
 import numpy as np
+import torch
+from io import BytesIO
 from PIL import Image
 from transformers import ViTFeatureExtractor
 import sys
@@ -9,7 +12,11 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.abspath(os.path.join(current_dir, ".."))
 sys.path.insert(0, project_root)
 
-from src.utils.preprocessing import preprocess_image, transform_data
+from src.utils.preprocessing import (
+    preprocess_image, transform_data, decode_image, decode_raw_pixels, ImageTooLargeError, ImagePreprocessor, TrainTransform, PixelCollator,
+)
+from src.models.trainer import prepare_datasets
+from src.utils.config import load_preprocessor_config
 
 def test_preprocess_image():
     img = Image.fromarray(np.random.randint(0, 255, (224, 224, 3), dtype=np.uint8))
@@ -25,3 +32,99 @@ def test_transform_data():
     result = transform_data(batch, feature_extractor)
     assert "pixel_values" in result
     assert result["pixel_values"].shape[0] == 2
+
+def test_image_preprocessor_matches_feature_extractor():
+    preprocessor_config = load_preprocessor_config()
+    reference = ViTFeatureExtractor(**preprocessor_config)
+    preprocessor = ImagePreprocessor(preprocessor_config, num_threads=2)
+
+    rng = np.random.default_rng(0)
+    images = [
+        Image.fromarray(rng.integers(0, 255, (480, 640, 3), dtype=np.uint8)),
+        Image.fromarray(rng.integers(0, 255, (224, 224, 3), dtype=np.uint8)),
+        Image.fromarray(rng.integers(0, 255, (300, 200, 3), dtype=np.uint8)).convert("L"),
+    ]
+    expected = reference(images=[img.convert("RGB") for img in images], return_tensors="pt")["pixel_values"]
+    actual = preprocess_image(images, preprocessor)["pixel_values"]
+
+    assert actual.shape == expected.shape == (3, 3, 224, 224)
+    assert actual.dtype == torch.float32
+    assert torch.allclose(actual, expected, atol=1e-5)
+
+def test_decode_image_uses_reduced_size_jpeg_decoding():
+    buffer = BytesIO()
+    Image.fromarray(np.full((2000, 3000, 3), 128, dtype=np.uint8)).save(buffer, "JPEG")
+
+    image = decode_image(buffer.getvalue(), draft_size=(448, 448))
+    assert image.mode == "RGB"
+    assert 448 <= min(image.size) < 2000
+
+    full = decode_image(buffer.getvalue(), draft_size=None)
+    assert full.size == (3000, 2000)
+
+def test_decoder_refuses_oversized_images_from_the_header():
+    buffer = BytesIO()
+    Image.new("RGB", (4000, 100)).save(buffer, "PNG")
+    with pytest.raises(ImageTooLargeError):
+        decode_image(buffer.getvalue(), max_pixels=10_000_000, max_dimension=3000)
+    with pytest.raises(ImageTooLargeError):
+        decode_image(buffer.getvalue(), max_pixels=100_000, max_dimension=10_000)
+    assert decode_image(buffer.getvalue(), max_pixels=400_000, max_dimension=4000).size == (4000, 100)
+
+    # Formats outside the allow-list never reach a decoder
+    buffer = BytesIO()
+    Image.new("RGB", (8, 8)).save(buffer, "PPM")
+    with pytest.raises(Exception):
+        decode_image(buffer.getvalue())
+
+def test_decoder_keeps_accepting_gif_and_tiff():
+    for image_format in ("GIF", "TIFF"):
+        buffer = BytesIO()
+        Image.new("RGB", (16, 8), color="red").save(buffer, image_format)
+        image = decode_image(buffer.getvalue())
+        assert image.mode == "RGB" and image.size == (16, 8)
+
+def test_decode_webp_and_raw_pixels():
+    pixels = np.random.default_rng(0).integers(0, 255, (224, 224, 3), dtype=np.uint8)
+    buffer = BytesIO()
+    Image.fromarray(pixels).save(buffer, "WEBP", lossless=True)
+    assert np.array_equal(np.asarray(decode_image(buffer.getvalue())), pixels)
+
+    image = decode_raw_pixels(pixels.tobytes(), 224, 224)
+    assert image.mode == "RGB" and np.array_equal(np.asarray(image), pixels)
+    with pytest.raises(ValueError):
+        decode_raw_pixels(pixels.tobytes()[:-3], 224, 224)
+    with pytest.raises(ImageTooLargeError):
+        decode_raw_pixels(pixels.tobytes(), 224, 224, max_dimension=100)
+
+def make_image_dataset(num_images=4):
+    from datasets import Dataset, DatasetDict, Features, Image as ImageFeature, ClassLabel
+
+    rng = np.random.default_rng(0)
+    images = [Image.fromarray(rng.integers(0, 255, (120, 160, 3), dtype=np.uint8)) for _ in range(num_images)]
+    features = Features({"image": ImageFeature(), "label": ClassLabel(names=["Acne", "Eczema"])})
+    split = Dataset.from_dict({"image": images, "label": [i % 2 for i in range(num_images)]}, features=features)
+    return DatasetDict({"train": split, "test": split}), images
+
+def test_lazy_training_transform_matches_serving_preprocessing():
+    preprocessor = ImagePreprocessor(load_preprocessor_config())
+    expected = preprocessor(images=make_image_dataset()[1])["pixel_values"]
+    collator = PixelCollator(preprocessor)
+
+    for cache_resized in (False, True):
+        datasets = prepare_datasets(make_image_dataset()[0], preprocessor, cache_resized=cache_resized, augment=False)
+        examples = [datasets["train"][i] for i in range(len(datasets["train"]))]
+        assert examples[0]["pixels"].dtype == np.uint8 and examples[0]["pixels"].shape == (224, 224, 3)
+
+        batch = collator(examples)
+        assert torch.allclose(batch["pixel_values"], expected, atol=1e-5)
+        assert batch["labels"].tolist() == [0, 1, 0, 1]
+
+def test_training_augmentation_flips_uint8_pixels():
+    preprocessor = ImagePreprocessor(load_preprocessor_config())
+    image = Image.fromarray(np.tile(np.arange(224, dtype=np.uint8), (224, 1))[..., None].repeat(3, axis=2))
+    np.random.seed(0)
+    pixels = TrainTransform(preprocessor, augment=True)({"image": [image] * 16, "label": [0] * 16})["pixels"]
+
+    flipped = [bool(p[0, 0, 0] == 223) for p in pixels]
+    assert any(flipped) and not all(flipped)
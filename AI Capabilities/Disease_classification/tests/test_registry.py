@@ -0,0 +1,73 @@
+import pytest
+import sys
+import threading
+import os
+
+# Ensure the root project directory is in the path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, ".."))
+sys.path.insert(0, project_root)
+
+from src.models.registry import ModelRegistry, ModelVersion, ModelNotReadyError
+
+class FakeBatcher:
+    def __init__(self, close_gate=None):
+        self._closed = threading.Event()
+        self._close_gate = close_gate
+
+    @property
+    def closed(self):
+        return self._closed.is_set()
+
+    def close(self):
+        if self._close_gate is not None:
+            self._close_gate.wait(timeout=5)
+        self._closed.set()
+
+    def wait_closed(self):
+        return self._closed.wait(timeout=2)
+
+def make_version(version):
+    return ModelVersion(version, backend=None, stats={"model_version": version}, batcher=FakeBatcher())
+
+def test_acquire_before_publish_is_not_ready():
+    with pytest.raises(ModelNotReadyError):
+        with ModelRegistry().acquire():
+            pass
+
+def test_in_flight_requests_finish_on_the_old_version():
+    registry = ModelRegistry()
+    old, new = make_version("v1"), make_version("v2")
+    registry.publish(old)
+
+    with registry.acquire() as pinned:
+        assert registry.publish(new) is old
+        # The running request keeps its version; new requests get the new one
+        assert pinned is old and not old.batcher.closed
+        with registry.acquire() as model:
+            assert model is new
+        assert registry.describe()["draining"][0]["model_version"] == "v1"
+
+    assert old.batcher.wait_closed() and not new.batcher.closed
+    assert registry.describe()["draining"] == []
+    assert registry.describe()["active"]["model_version"] == "v2"
+
+def test_idle_version_is_closed_on_swap():
+    registry = ModelRegistry()
+    old = make_version("v1")
+    registry.publish(old)
+    registry.publish(make_version("v2"))
+    assert old.batcher.closed
+
+def test_last_release_does_not_wait_for_the_close():
+    registry = ModelRegistry()
+    gate = threading.Event()
+    old = ModelVersion("v1", backend=None, stats={}, batcher=FakeBatcher(close_gate=gate))
+    registry.publish(old)
+
+    with registry.acquire():
+        registry.publish(make_version("v2"))
+    # Releasing returned while the retired batcher is still shutting down
+    assert not old.batcher.closed
+    gate.set()
+    assert old.batcher.wait_closed()
@@ -0,0 +1,38 @@
+import numpy as np
+from PIL import Image, ImageDraw
+import sys
+import os
+
+# Ensure the root project directory is in the path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, ".."))
+sys.path.insert(0, project_root)
+
+from src.models.skin_gate import SkinGate
+
+def skin_photo(tone=(198, 134, 100), seed=0):
+    rng = np.random.default_rng(seed)
+    pixels = np.asarray(tone, dtype=np.float32) + rng.normal(0, 10, (240, 320, 3))
+    pixels[80:140, 100:180] += (40, -20, -20)  # an inflamed patch
+    return Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+
+def test_gate_accepts_skin_photos_across_tones():
+    gate = SkinGate()
+    for seed, tone in enumerate([(236, 188, 160), (198, 134, 100), (110, 70, 50), (80, 50, 35)]):
+        decision = gate.check(skin_photo(tone, seed))
+        assert decision["accepted"], decision
+
+def test_gate_rejects_blank_frames_documents_and_graphics():
+    gate = SkinGate()
+    assert gate.check(Image.new("RGB", (640, 480), "black"))["reason"] == "blank"
+
+    document = Image.new("RGB", (620, 880), "white")
+    draw = ImageDraw.Draw(document)
+    for line in range(40):
+        draw.text((40, 30 + line * 20), "Lorem ipsum dolor sit amet " * 3, fill=(20, 20, 20))
+    assert not gate.check(document)["accepted"]
+
+    # A flat skin-coloured graphic passes the skin check but not the flatness check
+    graphic = Image.new("RGB", (400, 400), (224, 172, 140))
+    ImageDraw.Draw(graphic).rectangle((0, 0, 400, 60), fill=(30, 30, 30))
+    assert gate.check(graphic)["reason"] == "flat"
@@ -10,7 +10,7 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.abspath(os.path.join(current_dir, ".."))
 sys.path.insert(0, project_root)
 
-from src.models.trainer import compute_metrics, custom_optimizer
+from src.models.trainer import compute_metrics, custom_optimizer, resolve_precision, precision_args
 
 def test_compute_metrics():
     preds = SimpleNamespace(
@@ -32,3 +32,16 @@ def test_custom_optimizer():
     optimizer, scheduler = custom_optimizer(model, training_args, train_dataset)
     assert optimizer is not None
     assert scheduler is not None
+
+def test_precision_falls_back_instead_of_crashing_on_cpu(monkeypatch):
+    import torch
+    from src.models import trainer
+
+    monkeypatch.setattr(torch.cuda, "is_available", lambda: False)
+    monkeypatch.setattr(trainer, "cpu_supports_bf16", lambda: False)
+    assert resolve_precision("fp16") == "fp32" and resolve_precision("auto") == "fp32"
+
+    monkeypatch.setattr(trainer, "cpu_supports_bf16", lambda: True)
+    assert resolve_precision("fp16") == "bf16" and resolve_precision("auto") == "bf16"
+    # Whatever was resolved is accepted by TrainingArguments on a CPU-only machine
+    TrainingArguments(output_dir="./test_output", **precision_args(resolve_precision("auto")))
@@ -1,11 +1,13 @@
+import asyncio
 import os
 import uuid
 import logging
 import time
+from contextlib import asynccontextmanager
 from functools import lru_cache
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException, FastAPI
+from fastapi import APIRouter, HTTPException, FastAPI, Request
 from pydantic import BaseModel
 
 from motor.motor_asyncio import AsyncIOMotorClient
@@ -27,8 +29,11 @@ from langchain_core.runnables import RunnableLambda
 
 # Custom modules
 from ingest.pinecone_ops import initialize_pinecone
-from embeddings.model_loader import load_biobert_model
-from embeddings.embedder import embed_text
+from embeddings.model_loader import model_registry
+from embeddings.embedder import embed_text, get_query_cache, query_batcher
+from monitoring import EventLoopLagMonitor
+from chat.admission import AdmissionController, AdmissionRejected, request_deadline
+from config import CHAT_MAX_CONCURRENCY, CHAT_QUEUE_SIZE, CHAT_QUEUE_TIMEOUT_S, CHAT_RETRY_AFTER_S, CHAT_DEFAULT_TIMEOUT_S, EMBED_WARMUP, LOOP_LAG_INTERVAL_S
 
 # Load environment variables
 from dotenv import load_dotenv
@@ -47,15 +52,41 @@ logging.basicConfig(level=getattr(logging, os.getenv("LOG_LEVEL", "INFO")),
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+async def warmup_embeddings():
+    # Loads the query encoder (once per process, shared through model_registry) off the event loop
+    try:
+        await asyncio.to_thread(get_query_cache)
+        logger.info(f"Embedding models ready: {model_registry.describe()}")
+    except Exception:
+        logger.exception("BioBERT warmup failed; it will be loaded on first use")
+
+# How long work on the event loop holds up every other request on this worker
+loop_lag_monitor = EventLoopLagMonitor(interval_s=LOOP_LAG_INTERVAL_S)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    loop_lag_monitor.start()
+    warming = asyncio.create_task(warmup_embeddings()) if EMBED_WARMUP else None
+    yield
+    if warming is not None:
+        warming.cancel()
+    await loop_lag_monitor.stop()
+
 # Initialize FastAPI and MongoDB
-app = FastAPI(title="AI Chat API")
+app = FastAPI(title="AI Chat API", lifespan=lifespan)
 router = APIRouter()
+# Bounds concurrent /chat work; excess requests are rejected fast with Retry-After
+chat_admission = AdmissionController(
+    max_concurrency=CHAT_MAX_CONCURRENCY,
+    max_queue=CHAT_QUEUE_SIZE,
+    queue_timeout_s=CHAT_QUEUE_TIMEOUT_S,
+    retry_after_s=CHAT_RETRY_AFTER_S,
+)
 mongo_client = AsyncIOMotorClient(MONGO_URI)
 mongo_db = mongo_client[DB_NAME]
 log_collection = mongo_db[COLLECTION_NAME]
 
-# Load embedding model and vector store
-tokenizer, model = load_biobert_model()
+# Vector store; BioBERT itself is loaded once, by model_registry, at warmup or first use
 pinecone_index = initialize_pinecone()
 from embeddings.embedder import BioBERTEmbedding
 # Then use the renamed import
@@ -154,7 +185,21 @@ def determine_query_type(request: ChatRequest) -> str:
 
 # ---------------------- Main Chat Endpoint ---------------------- #
 @router.post("/chat", response_model=ChatResponse)
-async def chat_with_ai(request: ChatRequest):
+async def chat_with_ai(request: ChatRequest, http_request: Request = None):
+    try:
+        async with chat_admission.slot(http_request, request_deadline(http_request, CHAT_DEFAULT_TIMEOUT_S)) as ticket:
+            return await handle_chat(request, ticket)
+    except AdmissionRejected as e:
+        logger.warning(f"Session {request.session_id}: {e} ({chat_admission.stats()})")
+        raise HTTPException(status_code=e.status_code, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+async def skip_if_abandoned(ticket, request_id: str):
+    # The caller has timed out or hung up: don't spend an LLM call on an answer nobody will read
+    if ticket is not None and await ticket.abandoned():
+        logger.info(f"Request {request_id}: dropped, client no longer waiting")
+        raise HTTPException(status_code=504, detail="Request deadline exceeded")
+
+async def handle_chat(request: ChatRequest, ticket=None):
     request_id = str(uuid.uuid4())
     start_time = time.time()
     logger.info(f"Request {request_id}: Session {request.session_id} started")
@@ -189,6 +234,7 @@ Write the report in markdown bullet points, using clear and professional medical
         ])
 
         chain = report_prompt | get_llm()
+        await skip_if_abandoned(ticket, request_id)
 
         # FIX: Include chat_history in the ainvoke call
         report_response = await chain.ainvoke({
@@ -254,7 +300,8 @@ Write the report in markdown bullet points, using clear and professional medical
         ])
 
         rag_chain = create_retrieval_chain(retriever_to_use, create_stuff_documents_chain(get_llm(), qa_prompt))
-        
+        await skip_if_abandoned(ticket, request_id)
+
         response = await rag_chain.ainvoke({
             "input": effective_query,
             "chat_history": chat_history if query_type != "disease_only" else []
@@ -274,6 +321,8 @@ Write the report in markdown bullet points, using clear and professional medical
 
         return ChatResponse(response=ai_response, session_id=request.session_id, processing_time=processing_time)
 
+    except HTTPException:
+        raise
     except httpx.TimeoutException:
         logger.error(f"Request {request_id}: Mistral API timeout")
         raise HTTPException(status_code=504, detail="AI service timeout")
@@ -304,6 +353,23 @@ async def end_session(session_id: str):
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
+@router.get("/debug/embedding-cache")
+async def embedding_cache_stats():
+    # Hit rate of the in-process and on-disk embedding cache tiers for /chat queries
+    if not any(model["loaded"] for model in model_registry.describe().values()):
+        return {"status": "BioBERT not loaded yet"}
+    return get_query_cache().stats()
+
+@router.get("/debug/latency")
+async def latency_stats():
+    # Event-loop lag, and how long /chat queries wait for and spend in the embedding thread
+    return {"event_loop_lag": loop_lag_monitor.stats(), "query_embedding": query_batcher.stats()}
+
+@router.get("/debug/models")
+async def loaded_models():
+    # Load time, parameter count and resident weight memory of each embedding model
+    return model_registry.describe()
+
 @router.post("/debug/test-retrieval")
 async def test_retrieval(request: ChatRequest):
     # Run with retrieval
@@ -0,0 +1,135 @@
+# Vendored copy of Disease_classification/src/utils/admission.py. Each service is
+# built from its own directory, so neither image can import the other's code.
+# Edit the classifier's copy and copy it here; test/test_admission.py checks they match.
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+# Header through which a caller (e.g. the Node backend) sends how long it will wait for the answer
+DEADLINE_HEADER = "x-request-timeout-ms"
+
+
+class AdmissionRejected(Exception):
+    """
+    Raised when a request is shed instead of served. `status_code` is 429 when
+    the wait queue is full, 503 when the request waited too long for a slot
+    and 499 when its client had already given up.
+    """
+
+    def __init__(self, message, status_code=503, retry_after=1):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class Ticket:
+    """
+    An admitted request. Handlers check `abandoned()` before expensive steps so
+    work whose caller has already timed out or hung up is skipped.
+    """
+
+    def __init__(self, request=None, deadline=None):
+        self.request = request
+        self.deadline = deadline
+
+    def expired(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    async def abandoned(self) -> bool:
+        if self.expired():
+            return True
+        return self.request is not None and await self.request.is_disconnected()
+
+
+def request_deadline(request, default_timeout_s: float = 0.0):
+    """
+    Absolute monotonic deadline for `request`, from its timeout header or
+    `default_timeout_s` (0 means no deadline).
+    """
+    timeout_s = default_timeout_s
+    if request is not None:
+        try:
+            timeout_s = float(request.headers.get(DEADLINE_HEADER, "")) / 1000.0
+        except ValueError:
+            pass
+    return time.monotonic() + timeout_s if timeout_s > 0 else None
+
+
+class AdmissionController:
+    """
+    Bounds how many requests run at once.
+
+    Up to `max_concurrency` requests run; up to `max_queue` more wait in FIFO
+    order for at most `queue_timeout_s`. Anything beyond that is rejected
+    immediately, so a spike costs the extra callers one fast error instead of
+    slowing down every request in flight. A waiting request is also dropped as
+    soon as its client disconnects or its deadline passes.
+    """
+
+    def __init__(self, max_concurrency=32, max_queue=64, queue_timeout_s=5.0, retry_after_s=1,
+                 poll_interval_s=0.05):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout_s = queue_timeout_s
+        self.retry_after_s = retry_after_s
+        self.poll_interval_s = poll_interval_s
+
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+        self.waiting = 0
+        self.rejected = 0
+
+    def stats(self) -> dict:
+        return {"in_flight": self.in_flight, "waiting": self.waiting, "rejected": self.rejected,
+                "max_concurrency": self.max_concurrency, "max_queue": self.max_queue}
+
+    def _reject(self, message, status_code):
+        self.rejected += 1
+        raise AdmissionRejected(message, status_code=status_code, retry_after=self.retry_after_s)
+
+    async def _wait_for_slot(self, request, deadline):
+        give_up_at = time.monotonic() + self.queue_timeout_s
+        if deadline is not None:
+            give_up_at = min(give_up_at, deadline)
+
+        # One acquire task for the whole wait keeps this request's place in the FIFO
+        acquire = asyncio.ensure_future(self._semaphore.acquire())
+        try:
+            while True:
+                done, _ = await asyncio.wait({acquire}, timeout=self.poll_interval_s)
+                if done:
+                    return
+                if request is not None and await request.is_disconnected():
+                    self._reject("Client disconnected while queued", status_code=499)
+                if time.monotonic() >= give_up_at:
+                    self._reject("Server busy, request timed out in queue", status_code=503)
+        except BaseException:
+            if acquire.done() and not acquire.cancelled():
+                self._semaphore.release()
+            acquire.cancel()
+            raise
+
+    @asynccontextmanager
+    async def slot(self, request=None, deadline=None):
+        """
+        Holds one of the `max_concurrency` slots for the body of the `with` block.
+        """
+        if self._semaphore.locked() or self.waiting:
+            if self.waiting >= self.max_queue:
+                self._reject("Server busy, try again shortly", status_code=429)
+            self.waiting += 1
+            try:
+                await self._wait_for_slot(request, deadline)
+            finally:
+                self.waiting -= 1
+        else:
+            await self._semaphore.acquire()
+
+        self.in_flight += 1
+        try:
+            yield Ticket(request, deadline)
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
@@ -12,11 +12,40 @@ PINECONE_REGION = os.getenv("PINECONE_REGION", "us-east-1")
 PINECONE_INDEX_NAME = os.getenv("PINECONE_INDEX_NAME", "sknai")
 EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", 768))  # BioBERT = 768
 
+# === Embedding Config ===
+BIOBERT_MODEL_NAME = os.getenv("BIOBERT_MODEL_NAME", "monologg/biobert_v1.1_pubmed")  # HF id or local directory
+EMBED_WARMUP = os.getenv("EMBED_WARMUP", "1") == "1"  # load BioBERT at startup instead of on the first request
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", 32))
+EMBED_MAX_BATCH_TOKENS = int(os.getenv("EMBED_MAX_BATCH_TOKENS", 4096))  # padded tokens per forward pass
+EMBED_MAX_LENGTH = int(os.getenv("EMBED_MAX_LENGTH", 512))
+EMBED_POOLING = os.getenv("EMBED_POOLING", "cls")  # "cls" matches the vectors already in Pinecone
+
+# === Query Embedding (/chat retrieval) ===
+QUERY_BATCH_MAX_SIZE = int(os.getenv("QUERY_BATCH_MAX_SIZE", 8))
+QUERY_BATCH_WAIT_MS = float(os.getenv("QUERY_BATCH_WAIT_MS", 5))  # how long the first query waits for others
+LOOP_LAG_INTERVAL_S = float(os.getenv("LOOP_LAG_INTERVAL_S", 0.25))  # event-loop lag sampling period
+QUERY_ENCODER_BACKEND = os.getenv("QUERY_ENCODER_BACKEND", "torch")  # torch | onnx | onnx_int8 (documents always use torch)
+QUERY_ONNX_PATH = os.getenv("QUERY_ONNX_PATH", os.path.join(os.path.dirname(__file__), ".cache", "biobert_query.onnx"))
+QUERY_ONNX_INT8_PATH = os.getenv("QUERY_ONNX_INT8_PATH", os.path.join(os.path.dirname(__file__), ".cache", "biobert_query.int8.onnx"))
+QUERY_ONNX_THREADS = int(os.getenv("QUERY_ONNX_THREADS", 0))  # 0 = ONNX Runtime default
+
+# === Embedding Cache ===
+EMBED_CACHE_SIZE = int(os.getenv("EMBED_CACHE_SIZE", 10000))  # in-process LRU entries; 0 = off
+EMBED_CACHE_PATH = os.getenv("EMBED_CACHE_PATH", os.path.join(os.path.dirname(__file__), ".cache", "embeddings.sqlite"))  # empty = no disk tier
+EMBED_CACHE_DTYPE = os.getenv("EMBED_CACHE_DTYPE", "float32")  # or "float16" to halve the disk tier
+
 # === LLM Config ===
 LLM_MODEL_NAME = os.getenv("LLM_MODEL_NAME", "mistral-large-latest")
 LLM_TEMPERATURE = float(os.getenv("LLM_TEMPERATURE", 0.4))
 RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", 15))
 MISTRAL_API_KEY = os.getenv("MISTRAL_API_KEY")
 
+# === Admission Control (/chat, per worker) ===
+CHAT_MAX_CONCURRENCY = int(os.getenv("CHAT_MAX_CONCURRENCY", 8))
+CHAT_QUEUE_SIZE = int(os.getenv("CHAT_QUEUE_SIZE", 32))
+CHAT_QUEUE_TIMEOUT_S = float(os.getenv("CHAT_QUEUE_TIMEOUT_S", 10))
+CHAT_RETRY_AFTER_S = int(os.getenv("CHAT_RETRY_AFTER_S", 2))
+CHAT_DEFAULT_TIMEOUT_S = float(os.getenv("CHAT_DEFAULT_TIMEOUT_S", 0))  # used when X-Request-Timeout-Ms is absent; 0 = none
+
 # === Service Info ===
 SERVICE_NAME = "LLM Chat Service for SknAI"
@@ -0,0 +1,107 @@
+# llm_chat_service/embeddings/batching.py
+
+from typing import List
+
+import numpy as np
+import torch
+
+POOLING_MODES = ("cls", "mean")
+
+
+def length_buckets(lengths: List[int], batch_size: int, max_batch_tokens: int) -> List[List[int]]:
+    """
+    Groups text indices into batches of similar token length, so each batch
+    is padded only up to its own longest text.
+
+    Args:
+        lengths (list): Token count of every text.
+        batch_size (int): Max texts per batch.
+        max_batch_tokens (int): Max padded tokens (texts x longest length) per batch.
+
+    Returns:
+        list: Batches of indices into `lengths`, shortest texts first.
+    """
+    batches, batch = [], []
+    for index in sorted(range(len(lengths)), key=lengths.__getitem__):
+        # Sorted ascending, so the text being added is the longest in the batch
+        if batch and (len(batch) == batch_size or (len(batch) + 1) * lengths[index] > max_batch_tokens):
+            batches.append(batch)
+            batch = []
+        batch.append(index)
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def pool(last_hidden_state: torch.Tensor, attention_mask: torch.Tensor, pooling: str = "cls") -> torch.Tensor:
+    """
+    [CLS] output or the mean over real (unmasked) tokens only.
+    """
+    if pooling == "cls":
+        return last_hidden_state[:, 0]
+    if pooling == "mean":
+        mask = attention_mask.unsqueeze(-1).to(last_hidden_state.dtype)
+        return (last_hidden_state * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+    raise ValueError(f"Unknown pooling mode: {pooling}")
+
+
+def l2_normalize(vectors: np.ndarray) -> np.ndarray:
+    # Zero vectors are returned unchanged, as embed_text always did
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=vectors.copy(), where=norms > 0)
+
+
+def encode_batched(
+    texts: List[str],
+    tokenizer,
+    model,
+    batch_size: int = 32,
+    max_length: int = 512,
+    max_batch_tokens: int = 4096,
+    pooling: str = "cls",
+) -> np.ndarray:
+    """
+    Embeds many texts with one tokenizer call and one forward pass per
+    length bucket, instead of one of each per text.
+
+    Args:
+        texts (list): Texts to embed.
+        tokenizer: HuggingFace tokenizer matching `model`.
+        model: HuggingFace encoder (e.g. BioBERT) or an `OnnxEncoder`.
+        batch_size (int): Max texts per forward pass.
+        max_length (int): Texts are truncated to this many tokens.
+        max_batch_tokens (int): Max padded tokens per forward pass.
+        pooling (str): "cls" ([CLS] output, what the Pinecone index holds) or "mean".
+
+    Returns:
+        np.ndarray: float32 array (len(texts), hidden size) of L2-normalized vectors, in input order.
+    """
+    hidden_size = model.config.hidden_size
+    if not texts:
+        return np.zeros((0, hidden_size), dtype=np.float32)
+
+    encoded = tokenizer(list(texts), truncation=True, max_length=max_length)
+    input_ids = encoded["input_ids"]
+    lengths = [len(ids) for ids in input_ids]
+    pad_id = tokenizer.pad_token_id or 0
+    device = model.device
+
+    vectors = np.empty((len(texts), hidden_size), dtype=np.float32)
+    for batch in length_buckets(lengths, batch_size, max_batch_tokens):
+        longest = max(lengths[i] for i in batch)
+        ids = torch.full((len(batch), longest), pad_id, dtype=torch.long)
+        attention_mask = torch.zeros((len(batch), longest), dtype=torch.long)
+        for row, i in enumerate(batch):
+            ids[row, :lengths[i]] = torch.tensor(input_ids[i])
+            attention_mask[row, :lengths[i]] = 1
+
+        with torch.inference_mode():
+            outputs = model(
+                input_ids=ids.to(device),
+                attention_mask=attention_mask.to(device),
+                token_type_ids=torch.zeros_like(ids).to(device),
+            )
+            pooled = pool(outputs.last_hidden_state, attention_mask.to(device), pooling)
+        vectors[batch] = pooled.float().cpu().numpy()
+
+    return l2_normalize(vectors)
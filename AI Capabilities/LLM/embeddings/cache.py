@@ -0,0 +1,230 @@
+# llm_chat_service/embeddings/cache.py
+
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import torch
+
+STORE_DTYPES = ("float32", "float16")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Collapses runs of whitespace and strips the ends. BERT tokenizers split on
+    whitespace, so texts that differ only here embed identically.
+    """
+    return " ".join(text.split())
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def model_fingerprint(model) -> str:
+    """
+    Hash of the model config and every weight. Fine-tuned or swapped weights
+    saved under an unchanged model name still get a new fingerprint.
+    """
+    if hasattr(model, "fingerprint"):
+        # Non-PyTorch encoders (e.g. OnnxEncoder) hash their own artifact
+        return model.fingerprint
+    digest = hashlib.sha256(model.config.to_json_string().encode("utf-8"))
+    for name, tensor in model.state_dict().items():
+        digest.update(name.encode("utf-8"))
+        digest.update(tensor.detach().cpu().contiguous().reshape(-1).view(torch.uint8).numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+
+def cache_namespace(model, pooling: str, max_length: int) -> str:
+    """
+    Everything besides the text that decides the vector: model name and weights, pooling mode, truncation.
+    """
+    return f"{model.name_or_path}@{model_fingerprint(model)}/{pooling}/{max_length}"
+
+
+class LRUCache:
+    """
+    Bounded in-process map that evicts the least recently used entry.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteVectorStore:
+    """
+    On-disk vectors keyed by (namespace, text hash), shared by every process
+    that points at the same file.
+
+    Args:
+        path (str): SQLite file, created with its parent directory if missing.
+        dtype (str): "float32" or "float16"; float16 halves the file at ~1e-3 precision.
+    """
+
+    def __init__(self, path: str, dtype: str = "float32"):
+        if dtype not in STORE_DTYPES:
+            raise ValueError(f"Unsupported vector dtype: {dtype}")
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS vectors ("
+            " namespace TEXT NOT NULL, text_hash TEXT NOT NULL, dtype TEXT NOT NULL, vector BLOB NOT NULL,"
+            " PRIMARY KEY (namespace, text_hash))"
+        )
+        self._conn.commit()
+
+    def get_many(self, namespace: str, hashes: List[str]) -> Dict[str, np.ndarray]:
+        found = {}
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(hashes), 500):
+                chunk = hashes[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT text_hash, dtype, vector FROM vectors WHERE namespace = ? AND text_hash IN ({','.join('?' * len(chunk))})",
+                    [namespace, *chunk],
+                ).fetchall()
+                for key, dtype, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=dtype).astype(np.float32)
+        return found
+
+    def put_many(self, namespace: str, vectors: Dict[str, np.ndarray]):
+        rows = [(namespace, key, self.dtype.name, np.asarray(vector, dtype=self.dtype).tobytes())
+                for key, vector in vectors.items()]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO vectors VALUES (?, ?, ?, ?)", rows)
+            self._conn.commit()
+
+    def count(self, namespace: Optional[str] = None) -> int:
+        with self._lock:
+            if namespace is None:
+                return self._conn.execute("SELECT COUNT(*) FROM vectors").fetchone()[0]
+            return self._conn.execute("SELECT COUNT(*) FROM vectors WHERE namespace = ?", (namespace,)).fetchone()[0]
+
+    def prune(self, keep_namespace: str) -> int:
+        """
+        Deletes vectors of every other namespace (old models or settings). Returns the number removed.
+        """
+        with self._lock:
+            removed = self._conn.execute("DELETE FROM vectors WHERE namespace != ?", (keep_namespace,)).rowcount
+            self._conn.commit()
+        return removed
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class EmbeddingCache:
+    """
+    Two-tier cache in front of an embedding function: a bounded LRU in this
+    process, then an optional SQLite store on disk. Only misses reach
+    `encode`, in a single call, so they are still batched.
+
+    Every key includes `namespace` (see `cache_namespace`), so vectors from
+    another model, pooling mode or truncation length are never returned.
+    """
+
+    def __init__(self, encode: Callable[[List[str]], np.ndarray], namespace: str, max_entries: int = 10000,
+                 store: Optional[SQLiteVectorStore] = None):
+        self.encode = encode
+        self.namespace = namespace
+        self.memory = LRUCache(max_entries)
+        self.store = store
+        self.requests = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            hits = self.memory_hits + self.disk_hits
+            return {
+                "namespace": self.namespace,
+                "requests": self.requests,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": hits / self.requests if self.requests else 0.0,
+                "memory_entries": len(self.memory),
+                "memory_max_entries": self.memory.max_entries,
+                "disk_path": self.store.path if self.store is not None else None,
+            }
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Returns float32 vectors for `texts`, in order, encoding only the ones not cached.
+        """
+        keys = [text_hash(text) for text in texts]
+        found = {}
+        for key in set(keys):
+            vector = self.memory.get(key)
+            if vector is not None:
+                found[key] = vector
+        memory_hits = len(found)
+
+        missing = [key for key in dict.fromkeys(keys) if key not in found]
+        disk_hits = 0
+        if missing and self.store is not None:
+            from_disk = self.store.get_many(self.namespace, missing)
+            disk_hits = len(from_disk)
+            for key, vector in from_disk.items():
+                self.memory.put(key, vector)
+            found.update(from_disk)
+            missing = [key for key in missing if key not in from_disk]
+
+        if missing:
+            # One text per missing key; duplicates in `texts` are encoded once
+            first_text = dict(zip(reversed(keys), reversed(texts)))
+            encoded = np.asarray(self.encode([normalize_text(first_text[key]) for key in missing]), dtype=np.float32)
+            fresh = dict(zip(missing, encoded))
+            for key, vector in fresh.items():
+                self.memory.put(key, vector)
+            if self.store is not None:
+                self.store.put_many(self.namespace, fresh)
+            found.update(fresh)
+
+        with self._stats_lock:
+            # Counted per unique text in the call
+            self.requests += memory_hits + disk_hits + len(missing)
+            self.memory_hits += memory_hits
+            self.disk_hits += disk_hits
+            self.misses += len(missing)
+
+        hidden = next(iter(found.values())).shape[0] if found else 0
+        return np.stack([found[key] for key in keys]) if keys else np.zeros((0, hidden), dtype=np.float32)
@@ -1,37 +1,114 @@
 # llm_chat_service/embeddings/embedder.py
 
-import torch
-import numpy as np
+import asyncio
+import functools
+import logging
+import threading
 from typing import List
-from embeddings.model_loader import load_biobert_model
+from config import (
+    EMBED_BATCH_SIZE,
+    EMBED_MAX_BATCH_TOKENS,
+    EMBED_MAX_LENGTH,
+    EMBED_POOLING,
+    EMBED_CACHE_SIZE,
+    EMBED_CACHE_PATH,
+    EMBED_CACHE_DTYPE,
+    QUERY_BATCH_MAX_SIZE,
+    QUERY_BATCH_WAIT_MS,
+    QUERY_ENCODER_BACKEND,
+)
+from embeddings.batching import encode_batched
+from embeddings.cache import EmbeddingCache, SQLiteVectorStore, cache_namespace
+from embeddings.model_loader import model_registry, BIOBERT, BIOBERT_QUERY
+from embeddings.query_batcher import QueryEmbeddingBatcher
 from langchain_core.embeddings import Embeddings
 
-# Cache model to avoid reloading
-tokenizer, model = load_biobert_model()
-model.eval()
+logger = logging.getLogger(__name__)
 
-def embed_text(text: str) -> List[float]:
+# Registry name -> (model, cache); one cache per encoder, each under its own namespace
+_caches = {}
+_cache_lock = threading.Lock()
+_query_encoder_failed = False
+
+def encode_texts(texts: List[str], tokenizer, model):
     """
-    Embeds a given text string using BioBERT [CLS] token output.
+    Embeds a list of texts in length-bucketed batches using BioBERT [CLS] token output.
     """
-    inputs = tokenizer(
-        text,
-        return_tensors="pt",
-        padding=True,
-        truncation=True,
-        max_length=512
+    return encode_batched(
+        texts,
+        tokenizer,
+        model,
+        batch_size=EMBED_BATCH_SIZE,
+        max_length=EMBED_MAX_LENGTH,
+        max_batch_tokens=EMBED_MAX_BATCH_TOKENS,
+        pooling=EMBED_POOLING,
     )
-    with torch.no_grad():
-        outputs = model(**inputs)
 
-    cls_embedding = outputs.last_hidden_state[:, 0, :].squeeze().numpy()
-    norm = np.linalg.norm(cls_embedding)
-    return (cls_embedding / norm).tolist() if norm > 0 else cls_embedding.tolist()
+def get_embedding_cache(name: str = BIOBERT) -> EmbeddingCache:
+    """
+    The cache in front of the registry's encoder `name`, built on first use. It
+    is rebuilt, under the new model's namespace, if the registry's model is replaced.
+    """
+    tokenizer, model = model_registry.get(name)
+    with _cache_lock:
+        cached = _caches.get(name)
+        if cached is None or cached[0] is not model:
+            # Repeated chunks and frequent questions skip the forward pass
+            cache = EmbeddingCache(
+                functools.partial(encode_texts, tokenizer=tokenizer, model=model),
+                namespace=cache_namespace(model, EMBED_POOLING, EMBED_MAX_LENGTH),
+                max_entries=EMBED_CACHE_SIZE,
+                store=SQLiteVectorStore(EMBED_CACHE_PATH, EMBED_CACHE_DTYPE) if EMBED_CACHE_PATH else None,
+            )
+            cached = _caches[name] = (model, cache)
+        return cached[1]
+
+def get_query_cache() -> EmbeddingCache:
+    """
+    Cache for chat queries: the ONNX encoder when QUERY_ENCODER_BACKEND selects
+    one, otherwise (or if it fails to load) the same BioBERT as documents.
+    """
+    global _query_encoder_failed
+    if QUERY_ENCODER_BACKEND == "torch" or _query_encoder_failed:
+        return get_embedding_cache()
+    try:
+        return get_embedding_cache(BIOBERT_QUERY)
+    except Exception:
+        logger.exception(f"Query encoder '{QUERY_ENCODER_BACKEND}' failed to load; using PyTorch BioBERT")
+        _query_encoder_failed = True
+        return get_embedding_cache()
+
+def embed_texts(texts: List[str]) -> List[List[float]]:
+    """
+    Embeds a list of texts, served from the embedding cache where possible.
+    """
+    return get_embedding_cache().embed(texts).tolist()
+
+def embed_queries(texts: List[str]) -> List[List[float]]:
+    """
+    Embeds chat queries with the query encoder (see `get_query_cache`).
+    """
+    return get_query_cache().embed(texts).tolist()
+
+def embed_text(text: str) -> List[float]:
+    """
+    Embeds a given query string using BioBERT [CLS] token output.
+    """
+    return embed_queries([text])[0]
+
+# Chat queries run on their own thread, never on the event loop, and concurrent ones share a forward pass
+query_batcher = QueryEmbeddingBatcher(embed_queries, max_batch_size=QUERY_BATCH_MAX_SIZE, max_wait_ms=QUERY_BATCH_WAIT_MS)
 
 
 class BioBERTEmbedding(Embeddings):
     def embed_documents(self, texts):
-        return [embed_text(text) for text in texts]
+        return embed_texts(texts)
 
     def embed_query(self, text):
-        return embed_text(text)
+        return query_batcher.embed(text)
+
+    async def aembed_documents(self, texts):
+        return await asyncio.to_thread(embed_texts, texts)
+
+    async def aembed_query(self, text):
+        return await query_batcher.aembed(text)
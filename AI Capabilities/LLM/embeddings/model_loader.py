@@ -9,14 +9,58 @@
 
 # llm_chat_service/embeddings/model_loader.py
 
+import os
+
 from transformers import AutoModel, AutoTokenizer
+from config import (
+    BIOBERT_MODEL_NAME,
+    QUERY_ENCODER_BACKEND,
+    QUERY_ONNX_PATH,
+    QUERY_ONNX_INT8_PATH,
+    QUERY_ONNX_THREADS,
+)
+from embeddings.registry import ModelRegistry, BIOBERT
+
+BIOBERT_QUERY = "biobert_query"
+QUERY_ENCODER_BACKENDS = ("torch", "onnx", "onnx_int8")
 
-def load_biobert_model():
+def load_biobert_model(model_name: str = BIOBERT_MODEL_NAME):
     """
     Loads the BioBERT model and tokenizer for medical text embeddings.
+    Consumers should go through `model_registry.get()` instead, so a
+    process only ever holds one copy.
+
+    Args:
+        model_name (str): HuggingFace model id or local directory.
+
     Returns:
         tuple: (tokenizer, model) both from HuggingFace.
     """
-    tokenizer = AutoTokenizer.from_pretrained("monologg/biobert_v1.1_pubmed")
-    model = AutoModel.from_pretrained("monologg/biobert_v1.1_pubmed")
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModel.from_pretrained(model_name)
     return tokenizer, model
+
+def load_query_encoder(backend: str = QUERY_ENCODER_BACKEND):
+    """
+    Loads the BioBERT tokenizer with the exported ONNX Runtime encoder used for chat queries.
+
+    Args:
+        backend (str): "onnx" (fp32 graph) or "onnx_int8" (dynamically quantized).
+
+    Returns:
+        tuple: (tokenizer, OnnxEncoder)
+    """
+    from embeddings.onnx_encoder import OnnxEncoder
+
+    onnx_path = QUERY_ONNX_INT8_PATH if backend == "onnx_int8" else QUERY_ONNX_PATH
+    if not os.path.exists(onnx_path):
+        raise FileNotFoundError(f"{onnx_path} not found; export it with pipelines/query_encoder_parity.py")
+    return AutoTokenizer.from_pretrained(BIOBERT_MODEL_NAME), OnnxEncoder(onnx_path, QUERY_ONNX_THREADS)
+
+# Shared by app.py, the embedder, ingest and the pipelines: one BioBERT per process
+model_registry = ModelRegistry()
+model_registry.register(BIOBERT, load_biobert_model)
+if QUERY_ENCODER_BACKEND not in QUERY_ENCODER_BACKENDS:
+    raise ValueError(f"Unknown QUERY_ENCODER_BACKEND: {QUERY_ENCODER_BACKEND}")
+if QUERY_ENCODER_BACKEND != "torch":
+    model_registry.register(BIOBERT_QUERY, load_query_encoder)
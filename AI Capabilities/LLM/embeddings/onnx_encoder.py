@@ -0,0 +1,94 @@
+# llm_chat_service/embeddings/onnx_encoder.py
+
+import hashlib
+import os
+from types import SimpleNamespace
+
+import numpy as np
+import torch
+
+ONNX_INPUTS = ("input_ids", "attention_mask", "token_type_ids")
+
+
+class _HiddenStateOnly(torch.nn.Module):
+    # ONNX export needs a plain tensor output instead of a ModelOutput
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask, token_type_ids):
+        return self.model(input_ids=input_ids, attention_mask=attention_mask,
+                          token_type_ids=token_type_ids).last_hidden_state
+
+
+def export_onnx_encoder(model, onnx_path: str, opset: int = 17):
+    """
+    Exports a HuggingFace BERT encoder to ONNX with dynamic batch and sequence axes.
+    """
+    if os.path.dirname(onnx_path):
+        os.makedirs(os.path.dirname(onnx_path), exist_ok=True)
+    model = model.cpu().eval()
+    dummy = torch.ones((2, 8), dtype=torch.long)
+    # The exporter restores the wrapper's train/eval mode recursively afterwards; a wrapper
+    # left in train mode would switch dropout back on in the shared model
+    wrapper = _HiddenStateOnly(model).eval()
+    with torch.no_grad():
+        torch.onnx.export(
+            wrapper,
+            (dummy, torch.ones_like(dummy), torch.zeros_like(dummy)),
+            onnx_path,
+            input_names=list(ONNX_INPUTS),
+            output_names=["last_hidden_state"],
+            dynamic_axes={name: {0: "batch", 1: "sequence"} for name in ONNX_INPUTS + ("last_hidden_state",)},
+            opset_version=opset,
+        )
+
+
+def quantize_onnx_int8(onnx_path: str, int8_path: str):
+    """
+    INT8 dynamic quantization of the MatMul/Gemm weights; activations are
+    quantized on the fly, so no calibration data is needed.
+    """
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(onnx_path, int8_path, weight_type=QuantType.QInt8)
+
+
+class OnnxEncoder:
+    """
+    ONNX Runtime stand-in for a HuggingFace encoder: called with the usual
+    tensors, it returns an object with `.last_hidden_state`, so
+    `encode_batched` treats it like the PyTorch model.
+    """
+
+    device = torch.device("cpu")
+
+    def __init__(self, onnx_path: str, num_threads: int = 0):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+
+        self.session = ort.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+        self.name_or_path = onnx_path
+        self.config = SimpleNamespace(hidden_size=self.session.get_outputs()[0].shape[-1])
+        self.input_names = {item.name for item in self.session.get_inputs()}
+
+        digest = hashlib.sha256()
+        with open(onnx_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        # The cache keys query vectors on this, so a re-export or re-quantization never reuses old ones
+        self.fingerprint = digest.hexdigest()[:16]
+        self.memory_bytes = os.path.getsize(onnx_path)
+
+    def eval(self):
+        return self
+
+    def __call__(self, **inputs):
+        feed = {name: tensor.detach().cpu().numpy().astype(np.int64, copy=False)
+                for name, tensor in inputs.items() if name in self.input_names}
+        (hidden,) = self.session.run(["last_hidden_state"], feed)
+        return SimpleNamespace(last_hidden_state=torch.from_numpy(hidden))
@@ -0,0 +1,61 @@
+# llm_chat_service/embeddings/parity.py
+
+import numpy as np
+
+
+def cosine_parity(reference: np.ndarray, candidate: np.ndarray) -> dict:
+    """
+    Row-wise cosine similarity between two sets of embeddings of the same texts.
+
+    Args:
+        reference (np.ndarray): (n, dim) vectors from the fp32 encoder, e.g. fetched from Pinecone.
+        candidate (np.ndarray): (n, dim) vectors from the encoder under test.
+
+    Returns:
+        dict: mean, min and 1st-percentile cosine.
+    """
+    reference = reference / np.linalg.norm(reference, axis=1, keepdims=True).clip(min=1e-12)
+    candidate = candidate / np.linalg.norm(candidate, axis=1, keepdims=True).clip(min=1e-12)
+    cosines = (reference * candidate).sum(axis=1)
+    return {
+        "count": int(len(cosines)),
+        "mean_cosine": float(cosines.mean()),
+        "min_cosine": float(cosines.min()),
+        "p01_cosine": float(np.percentile(cosines, 1)),
+    }
+
+
+def top_k(corpus: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    # Indices of the k most similar corpus vectors per query, best first (cosine, as the Pinecone index uses)
+    scores = queries @ corpus.T
+    k = min(k, corpus.shape[0])
+    best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.take_along_axis(scores, best, axis=1).argsort(axis=1)[:, ::-1]
+    return np.take_along_axis(best, order, axis=1)
+
+
+def retrieval_overlap(reference_hits, candidate_hits) -> dict:
+    """
+    How much of each query's top-k survives the encoder change.
+
+    Args:
+        reference_hits: per-query lists of document ids retrieved with the fp32 query vectors.
+        candidate_hits: the same for the candidate query vectors.
+
+    Returns:
+        dict: mean and min overlap@k (shared ids / k), top-1 agreement, and how many queries changed at all.
+    """
+    overlaps, top1, changed = [], [], 0
+    for expected, actual in zip(reference_hits, candidate_hits):
+        expected, actual = list(expected), list(actual)
+        overlaps.append(len(set(expected) & set(actual)) / max(len(expected), 1))
+        top1.append(bool(expected) and bool(actual) and expected[0] == actual[0])
+        changed += expected != actual
+    return {
+        "queries": len(overlaps),
+        "k": max((len(hits) for hits in reference_hits), default=0),
+        "mean_overlap": float(np.mean(overlaps)) if overlaps else 0.0,
+        "min_overlap": float(np.min(overlaps)) if overlaps else 0.0,
+        "top1_agreement": float(np.mean(top1)) if top1 else 0.0,
+        "queries_with_changed_ranking": changed,
+    }
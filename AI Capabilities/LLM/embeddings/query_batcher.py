@@ -0,0 +1,134 @@
+# llm_chat_service/embeddings/query_batcher.py
+
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List
+
+from monitoring import RollingLatency
+
+
+class QueryEmbeddingBatcher:
+    """
+    Embeds chat queries on one dedicated thread, off the event loop, and
+    coalesces queries from concurrent requests into small batches.
+
+    The worker waits for up to `max_batch_size` queries or `max_wait_ms` after
+    the first one arrived, whichever comes first, then calls `embed_fn` once
+    for the batch. Queue time (submit to batch start) and batch time are kept
+    for `stats()`.
+    """
+
+    def __init__(self, embed_fn: Callable[[List[str]], list], max_batch_size: int = 8, max_wait_ms: float = 5.0):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+
+        self.embed_fn = embed_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+
+        self.queue_time = RollingLatency()
+        self.batch_time = RollingLatency()
+        self.batches = 0
+        self.queries = 0
+
+        self._queue = queue.Queue()
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name="query-embedder", daemon=True)
+        self._worker.start()
+
+    @property
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def submit(self, text: str) -> Future:
+        if self._closed:
+            raise RuntimeError("QueryEmbeddingBatcher is closed")
+        future = Future()
+        self._queue.put((text, future, time.perf_counter()))
+        return future
+
+    def embed(self, text: str, timeout=None) -> List[float]:
+        # For callers on worker threads; blocks only the calling thread
+        return self.submit(text).result(timeout=timeout)
+
+    async def aembed(self, text: str) -> List[float]:
+        # The event loop keeps serving other requests while the query is embedded
+        return await asyncio.wrap_future(self.submit(text))
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._worker.join()
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self.queue_depth,
+            "queries": self.queries,
+            "batches": self.batches,
+            "mean_batch_size": self.queries / self.batches if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "queue_time": self.queue_time.summary(),
+            "batch_time": self.batch_time.summary(),
+        }
+
+    def _collect(self):
+        first = self._queue.get()
+        if first is None:
+            return None
+
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                entry = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if entry is None:
+                # Re-queue the stop marker so the loop exits after this batch
+                self._queue.put(None)
+                break
+            batch.append(entry)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                break
+            # A caller whose aembed() was cancelled has cancelled its future; setting
+            # a result on it would raise InvalidStateError and kill this thread
+            batch = [entry for entry in batch if entry[1].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            start = time.perf_counter()
+            for _, _, submitted in batch:
+                self.queue_time.record(start - submitted)
+            self.batches += 1
+            self.queries += len(batch)
+
+            futures = [future for _, future, _ in batch]
+            try:
+                results = self.embed_fn([text for text, _, _ in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError(f"embed_fn returned {len(results)} vectors for {len(batch)} queries")
+            except Exception as e:
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            finally:
+                self.batch_time.record(time.perf_counter() - start)
+
+            for future, result in zip(futures, results):
+                if not future.done():
+                    future.set_result(result)
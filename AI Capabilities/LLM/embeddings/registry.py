@@ -0,0 +1,97 @@
+# llm_chat_service/embeddings/registry.py
+
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+BIOBERT = "biobert"
+
+
+def model_memory_bytes(model) -> int:
+    # Weights plus buffers (e.g. position ids), i.e. what the model keeps resident
+    if hasattr(model, "memory_bytes"):
+        return model.memory_bytes
+    return sum(t.numel() * t.element_size() for t in list(model.parameters()) + list(model.buffers()))
+
+
+class ModelRegistry:
+    """
+    Process-wide home of the encoder models. Each registered model is loaded
+    once, on first `get()` or at an explicit `warmup()`, and the same
+    (tokenizer, model) pair is handed to every caller.
+
+    Tests call `use()` to install a tiny local model so nothing is downloaded.
+    """
+
+    def __init__(self):
+        self._loaders: Dict[str, Callable] = {}
+        self._models: Dict[str, tuple] = {}
+        self._stats: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+
+    def register(self, name: str, loader: Callable):
+        """
+        Registers `loader`, a no-argument callable returning (tokenizer, model), under `name`.
+        """
+        with self._lock:
+            self._loaders[name] = loader
+            self._load_locks.setdefault(name, threading.Lock())
+
+    def get(self, name: str = BIOBERT):
+        """
+        Returns the (tokenizer, model) pair for `name`, loading it on first use.
+        """
+        loaded = self._models.get(name)
+        if loaded is not None:
+            return loaded
+        if name not in self._loaders:
+            raise KeyError(f"No model registered as '{name}'")
+
+        # Concurrent first calls wait for a single load instead of each loading a copy
+        with self._load_locks[name]:
+            loaded = self._models.get(name)
+            if loaded is None:
+                start = time.perf_counter()
+                tokenizer, model = self._loaders[name]()
+                self._install(name, tokenizer, model, time.perf_counter() - start)
+                loaded = self._models[name]
+        return loaded
+
+    def use(self, name: str, tokenizer, model):
+        """
+        Installs an already loaded pair under `name`, replacing any previous one.
+        """
+        self._load_locks.setdefault(name, threading.Lock())
+        self._install(name, tokenizer, model, 0.0)
+
+    def _install(self, name, tokenizer, model, load_seconds):
+        model.eval()
+        with self._lock:
+            self._models[name] = (tokenizer, model)
+            self._stats[name] = {
+                "model_name": model.name_or_path,
+                "load_seconds": round(load_seconds, 3),
+                "memory_mb": round(model_memory_bytes(model) / 2**20, 1),
+                "device": str(model.device),
+            }
+            if hasattr(model, "parameters"):
+                self._stats[name]["parameters"] = sum(p.numel() for p in model.parameters())
+                self._stats[name]["dtype"] = str(next(model.parameters()).dtype)
+
+    def warmup(self, names: Optional[list] = None):
+        """
+        Loads the given (default: all registered) models now rather than on first use.
+        """
+        for name in names or list(self._loaders):
+            self.get(name)
+
+    def is_loaded(self, name: str = BIOBERT) -> bool:
+        return name in self._models
+
+    def describe(self) -> dict:
+        with self._lock:
+            return {
+                name: {"loaded": name in self._models, **self._stats.get(name, {})}
+                for name in sorted(set(self._loaders) | set(self._models))
+            }
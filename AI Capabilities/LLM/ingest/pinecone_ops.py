@@ -42,7 +42,7 @@ from config import (
     PINECONE_ENVIRONMENT,
     EMBEDDING_DIM,
 )
-from embeddings.embedder import embed_text
+from embeddings.embedder import embed_texts
 from pinecone import Pinecone, ServerlessSpec
 
 def initialize_pinecone(index_name: str = PINECONE_INDEX_NAME, dimension: int = EMBEDDING_DIM):
@@ -65,7 +65,7 @@ def initialize_pinecone(index_name: str = PINECONE_INDEX_NAME, dimension: int =
 
     return pc.Index(index_name)
 
-def upload_to_pinecone(index, chunks: list, batch_size: int = 32):
+def upload_to_pinecone(index, chunks: list, batch_size: int = 32, embed_batch_size: int = 256):
     """
     Uploads chunks of text as vectors into Pinecone.
 
@@ -73,16 +73,15 @@ def upload_to_pinecone(index, chunks: list, batch_size: int = 32):
         index: Pinecone index object.
         chunks (list): List of text chunks.
         batch_size (int): Number of vectors to upload per batch.
+        embed_batch_size (int): Number of chunks embedded together; larger groups
+            give the length bucketing more similar-length chunks to batch.
     """
-    batch = []
-    for i, chunk in enumerate(chunks):
-        embedding = embed_text(chunk)
-        metadata = {"text": chunk, "chunk_id": str(i)}
-        batch.append((str(i), embedding, metadata))
-
-        if len(batch) >= batch_size:
-            index.upsert(vectors=batch)
-            batch = []
-
-    if batch:
-        index.upsert(vectors=batch)
+    for start in range(0, len(chunks), embed_batch_size):
+        group = chunks[start:start + embed_batch_size]
+        embeddings = embed_texts(group)
+        vectors = [
+            (str(i), embedding, {"text": chunk, "chunk_id": str(i)})
+            for i, (chunk, embedding) in enumerate(zip(group, embeddings), start=start)
+        ]
+        for offset in range(0, len(vectors), batch_size):
+            index.upsert(vectors=vectors[offset:offset + batch_size])
@@ -0,0 +1,73 @@
+# llm_chat_service/monitoring.py
+
+import asyncio
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+
+class RollingLatency:
+    """
+    Keeps the last `window` samples (in seconds) and summarises them in milliseconds.
+    """
+
+    def __init__(self, window: int = 1024):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+            self.count += 1
+
+    def summary(self) -> dict:
+        with self._lock:
+            samples = np.asarray(self._samples) * 1000.0
+            count = self.count
+        if not len(samples):
+            return {"count": count, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+        return {
+            "count": count,
+            "p50_ms": round(float(np.percentile(samples, 50)), 3),
+            "p95_ms": round(float(np.percentile(samples, 95)), 3),
+            "p99_ms": round(float(np.percentile(samples, 99)), 3),
+            "max_ms": round(float(samples.max()), 3),
+        }
+
+
+class EventLoopLagMonitor:
+    """
+    Measures how late the event loop wakes a task that sleeps `interval_s`.
+    Lag means something ran on the loop without yielding, e.g. CPU work in an
+    `async` handler, and every other request waited that long.
+    """
+
+    def __init__(self, interval_s: float = 0.25, window: int = 1024):
+        self.interval_s = interval_s
+        self.lag = RollingLatency(window)
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval_s)
+            self.lag.record(max(0.0, time.perf_counter() - start - self.interval_s))
+
+    def stats(self) -> dict:
+        return {"interval_s": self.interval_s, **self.lag.summary()}
@@ -0,0 +1,89 @@
+# llm_chat_service/pipelines/embedding_benchmark.py
+
+import argparse
+import json
+import sys
+import os
+import time
+
+import numpy as np
+import torch
+
+# Make the path to the service root available
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from config import EMBED_BATCH_SIZE, EMBED_MAX_BATCH_TOKENS, EMBED_MAX_LENGTH
+from embeddings.batching import encode_batched
+from embeddings.model_loader import model_registry
+
+SAMPLE_SENTENCES = [
+    "Atopic dermatitis is a chronic, relapsing inflammatory skin disease.",
+    "Topical corticosteroids remain first-line therapy for moderate flares.",
+    "Acne vulgaris involves the pilosebaceous unit and is driven by sebum, keratinisation and Cutibacterium acnes.",
+    "Psoriasis plaques are well demarcated, erythematous and covered by silvery scale.",
+    "Patients should avoid known triggers such as harsh soaps, heat and stress.",
+]
+
+def sample_chunks(count, seed=0):
+    # Chunks of mixed length, like the output of chunk_text on a dermatology PDF
+    rng = np.random.default_rng(seed)
+    return [" ".join(rng.choice(SAMPLE_SENTENCES, size=int(rng.integers(1, 20)))) for _ in range(count)]
+
+def embed_one_by_one(texts, tokenizer, model, max_length):
+    # The pre-batching embed_text: one tokenizer call and one forward pass per text
+    vectors = []
+    for text in texts:
+        inputs = tokenizer(text, return_tensors="pt", padding=True, truncation=True, max_length=max_length)
+        with torch.no_grad():
+            cls_embedding = model(**inputs).last_hidden_state[:, 0, :].squeeze().numpy()
+        norm = np.linalg.norm(cls_embedding)
+        vectors.append(cls_embedding / norm if norm > 0 else cls_embedding)
+    return np.stack(vectors)
+
+def run_embedding_benchmark(texts, batch_sizes, max_batch_tokens, max_length):
+    tokenizer, model = model_registry.get()
+
+    start = time.perf_counter()
+    reference = embed_one_by_one(texts, tokenizer, model, max_length)
+    baseline_s = time.perf_counter() - start
+    results = {"texts": len(texts), "one_by_one": {"seconds": baseline_s, "texts_per_sec": len(texts) / baseline_s}}
+
+    for batch_size in batch_sizes:
+        start = time.perf_counter()
+        vectors = encode_batched(texts, tokenizer, model, batch_size=batch_size, max_length=max_length,
+                                 max_batch_tokens=max_batch_tokens)
+        seconds = time.perf_counter() - start
+        results[f"batch_{batch_size}"] = {
+            "seconds": seconds,
+            "texts_per_sec": len(texts) / seconds,
+            "speedup": baseline_s / seconds,
+            "max_abs_diff": float(np.abs(vectors - reference).max()),
+            "min_cosine": float((vectors * reference).sum(axis=1).min()),
+        }
+
+    print(f"one by one   {results['one_by_one']['texts_per_sec']:>8.1f} texts/s")
+    for batch_size in batch_sizes:
+        result = results[f"batch_{batch_size}"]
+        print(f"batch {batch_size:<6} {result['texts_per_sec']:>8.1f} texts/s  {result['speedup']:.2f}x  "
+              f"max diff {result['max_abs_diff']:.2e}  min cosine {result['min_cosine']:.6f}")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pdf", type=str, default=None, help="Benchmark on the chunks of this PDF instead of sample text")
+    parser.add_argument("--count", type=int, default=256, help="Number of sample chunks when no PDF is given")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[8, EMBED_BATCH_SIZE, 64])
+    parser.add_argument("--max-batch-tokens", type=int, default=EMBED_MAX_BATCH_TOKENS)
+    parser.add_argument("--max-length", type=int, default=EMBED_MAX_LENGTH)
+    parser.add_argument("--output", type=str, default=None, help="Optional JSON results file")
+    args = parser.parse_args()
+
+    if args.pdf:
+        from ingest.pdf_utils import extract_text_from_pdf, clean_extracted_text, chunk_text
+        texts = chunk_text(clean_extracted_text(extract_text_from_pdf(args.pdf)))
+    else:
+        texts = sample_chunks(args.count)
+
+    results = run_embedding_benchmark(texts, args.batch_sizes, args.max_batch_tokens, args.max_length)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
@@ -20,7 +20,7 @@
 
 from chat.chain import setup_qa_chain
 from embeddings.embedder import embed_text
-from embeddings.model_loader import load_biobert_model
+from embeddings.model_loader import model_registry
 from ingest.pinecone_ops import initialize_pinecone
 from langchain.vectorstores import Pinecone
 
@@ -39,7 +39,7 @@ def interactive_chat(qa_chain):
 
 if __name__ == "__main__":
     index = initialize_pinecone()
-    tokenizer, model = load_biobert_model()
+    model_registry.warmup()
     vector_store = Pinecone(index=index, embedding=embed_text, text_key="text")
     qa_chain = setup_qa_chain(vector_store)
     interactive_chat(qa_chain)
@@ -0,0 +1,158 @@
+# llm_chat_service/pipelines/query_encoder_parity.py
+
+import argparse
+import json
+import sys
+import os
+import time
+
+import numpy as np
+
+# Make the path to the service root available
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from config import EMBED_MAX_LENGTH, EMBED_POOLING, QUERY_ONNX_PATH, QUERY_ONNX_INT8_PATH, QUERY_ONNX_THREADS
+from embeddings.batching import encode_batched
+from embeddings.model_loader import model_registry
+from embeddings.onnx_encoder import OnnxEncoder, export_onnx_encoder, quantize_onnx_int8
+from embeddings.parity import cosine_parity, retrieval_overlap, top_k
+
+SAMPLE_QUERIES = [
+    "What causes eczema?",
+    "How do I get rid of acne scars?",
+    "Is psoriasis contagious?",
+    "My skin is itchy and red after using a new soap, what should I do?",
+    "Which creams help with dry skin in winter?",
+    "Can stress make my rosacea worse?",
+    "What is the difference between a mole and melanoma?",
+    "How long does a fungal skin infection take to clear?",
+    "Are topical steroids safe for children?",
+    "Why do I get hives after exercise?",
+    "What are the first signs of shingles?",
+    "How is seborrheic dermatitis on the scalp treated?",
+]
+
+def prepare_encoders(model, backends, export):
+    # Export the fp32 graph (and quantize it) unless the files already exist
+    paths = {backend: {"onnx": QUERY_ONNX_PATH, "onnx_int8": QUERY_ONNX_INT8_PATH}[backend] for backend in backends}
+    if export or not os.path.exists(QUERY_ONNX_PATH):
+        print(f"📦 Exporting BioBERT → {QUERY_ONNX_PATH}")
+        export_onnx_encoder(model, QUERY_ONNX_PATH)
+    if "onnx_int8" in backends and (export or not os.path.exists(QUERY_ONNX_INT8_PATH)):
+        print(f"📦 Quantizing → {QUERY_ONNX_INT8_PATH}")
+        quantize_onnx_int8(QUERY_ONNX_PATH, QUERY_ONNX_INT8_PATH)
+    return {backend: OnnxEncoder(path, QUERY_ONNX_THREADS) for backend, path in paths.items()}
+
+def encode(texts, tokenizer, encoder):
+    return encode_batched(texts, tokenizer, encoder, max_length=EMBED_MAX_LENGTH, pooling=EMBED_POOLING)
+
+def query_latency(queries, tokenizer, encoder):
+    # One query per call, the way /chat embeds them
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        encode([query], tokenizer, encoder)
+        timings.append(time.perf_counter() - start)
+    return {"p50_ms": float(np.percentile(timings, 50) * 1000), "p95_ms": float(np.percentile(timings, 95) * 1000)}
+
+def stored_from_pinecone(index, reference_queries, k):
+    """
+    Stored fp32 vectors (and texts) of the documents the reference queries retrieve.
+    """
+    stored = {}
+    for vector in reference_queries:
+        result = index.query(vector=vector.tolist(), top_k=k, include_values=True, include_metadata=True)
+        for match in result["matches"]:
+            stored[match["id"]] = (match["metadata"]["text"], match["values"])
+    ids = list(stored)
+    return ids, [stored[i][0] for i in ids], np.asarray([stored[i][1] for i in ids], dtype=np.float32)
+
+def run_query_encoder_parity(queries, corpus_texts, backends, k, export, use_pinecone, min_cosine, min_overlap):
+    tokenizer, model = model_registry.get()
+    encoders = prepare_encoders(model, backends, export)
+    reference_queries = encode(queries, tokenizer, model)
+
+    if use_pinecone:
+        from ingest.pinecone_ops import initialize_pinecone
+        index = initialize_pinecone()
+        doc_ids, corpus_texts, stored = stored_from_pinecone(index, reference_queries, k)
+        search = lambda vectors: [[match["id"] for match in index.query(vector=v.tolist(), top_k=k)["matches"]]
+                                  for v in vectors]
+    else:
+        # No index at hand: the fp32 vectors of the local corpus play the stored ones
+        doc_ids = list(range(len(corpus_texts)))
+        stored = encode(corpus_texts, tokenizer, model)
+        search = lambda vectors: top_k(stored, vectors, k).tolist()
+
+    reference_hits = search(reference_queries)
+    report = {
+        "pooling": EMBED_POOLING,
+        "stored_vectors": len(doc_ids),
+        "queries": len(queries),
+        "torch": {"latency": query_latency(queries, tokenizer, model)},
+    }
+    passed = True
+    for backend, encoder in encoders.items():
+        candidate_queries = encode(queries, tokenizer, encoder)
+        result = {
+            "file_mb": round(encoder.memory_bytes / 2**20, 1),
+            "stored_cosine": cosine_parity(stored, encode(corpus_texts, tokenizer, encoder)),
+            "query_cosine": cosine_parity(reference_queries, candidate_queries),
+            "retrieval": retrieval_overlap(reference_hits, search(candidate_queries)),
+            "latency": query_latency(queries, tokenizer, encoder),
+        }
+        result["passed"] = (result["stored_cosine"]["min_cosine"] >= min_cosine
+                            and result["retrieval"]["mean_overlap"] >= min_overlap)
+        passed &= result["passed"]
+        report[backend] = result
+
+    print(f"{'backend':<11}{'p50 (ms)':>10}{'min cos':>10}{'mean cos':>10}{f'overlap@{k}':>12}{'top-1':>7}")
+    print(f"{'torch':<11}{report['torch']['latency']['p50_ms']:>10.1f}{1:>10.4f}{1:>10.4f}{1:>12.2f}{1:>7.2f}")
+    for backend in encoders:
+        result = report[backend]
+        print(f"{backend:<11}{result['latency']['p50_ms']:>10.1f}{result['stored_cosine']['min_cosine']:>10.4f}"
+              f"{result['stored_cosine']['mean_cosine']:>10.4f}{result['retrieval']['mean_overlap']:>12.2f}"
+              f"{result['retrieval']['top1_agreement']:>7.2f}")
+    report["passed"] = passed
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backends", type=str, nargs="+", choices=["onnx", "onnx_int8"], default=["onnx", "onnx_int8"])
+    parser.add_argument("--export", action="store_true", help="Re-export (and re-quantize) even if the files exist")
+    parser.add_argument("--pinecone", action="store_true", help="Compare against the vectors stored in the Pinecone index")
+    parser.add_argument("--pdf", type=str, default=None, help="Local corpus from this PDF when not using Pinecone")
+    parser.add_argument("--queries", type=str, default=None, help="Text file with one query per line")
+    parser.add_argument("--top-k", type=int, default=5, help="Documents retrieved per query (/chat uses 5)")
+    parser.add_argument("--min-cosine", type=float, default=0.99)
+    parser.add_argument("--min-overlap", type=float, default=0.9)
+    parser.add_argument("--output", type=str, default=None, help="Optional JSON report path")
+    args = parser.parse_args()
+
+    queries = SAMPLE_QUERIES
+    if args.queries:
+        with open(args.queries) as f:
+            queries = [line.strip() for line in f if line.strip()]
+    corpus_texts = []
+    if not args.pinecone:
+        if args.pdf:
+            from ingest.pdf_utils import extract_text_from_pdf, clean_extracted_text, chunk_text
+            corpus_texts = chunk_text(clean_extracted_text(extract_text_from_pdf(args.pdf)))
+        else:
+            from pipelines.embedding_benchmark import sample_chunks
+            corpus_texts = sample_chunks(256)
+
+    report = run_query_encoder_parity(queries, corpus_texts, args.backends, args.top_k, args.export,
+                                      args.pinecone, args.min_cosine, args.min_overlap)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if not report["passed"]:
+        print("❌ Query encoder drifts from the stored fp32 vectors; keep QUERY_ENCODER_BACKEND=torch")
+        sys.exit(1)
+    print("✅ Parity check passed")
+
+
+
+# Export the ONNX / INT8 query encoders and check them against the stored fp32 vectors
+# python pipelines/query_encoder_parity.py --pinecone
+# Then serve with QUERY_ENCODER_BACKEND=onnx_int8 (or onnx)
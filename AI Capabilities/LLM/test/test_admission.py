@@ -0,0 +1,46 @@
+import asyncio
+import pytest
+
+import sys
+import os
+# Make the path to the service root available
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from chat.admission import AdmissionController, AdmissionRejected
+
+async def hold(controller, release):
+    async with controller.slot():
+        await release.wait()
+
+# A burst larger than concurrency + queue gets fast 429s instead of piling up
+def test_chat_admission_sheds_excess_requests():
+    async def scenario():
+        controller = AdmissionController(max_concurrency=2, max_queue=2, queue_timeout_s=5, poll_interval_s=0.01)
+        release = asyncio.Event()
+        admitted = [asyncio.create_task(hold(controller, release)) for _ in range(4)]
+        await asyncio.sleep(0.05)
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            await hold(controller, release)
+        assert rejected.value.status_code == 429
+        assert controller.stats()["rejected"] == 1
+
+        release.set()
+        await asyncio.gather(*admitted)
+        assert controller.in_flight == 0
+
+    asyncio.run(scenario())
+
+# chat/admission.py is vendored from the classifier; fail as soon as the copies drift apart
+def test_vendored_admission_matches_the_classifier_copy():
+    here = os.path.join(os.path.dirname(__file__), "..")
+    canonical = os.path.join(here, "..", "Disease_classification", "src", "utils", "admission.py")
+    if not os.path.exists(canonical):
+        pytest.skip("Classifier sources are not part of this checkout")
+
+    def code(path):
+        with open(path) as f:
+            text = f.read()
+        # Only the leading comment block differs
+        return text[text.index("import asyncio"):]
+
+    assert code(os.path.join(here, "chat", "admission.py")) == code(canonical)
@@ -6,14 +6,23 @@ import sys
 import os
 # Make the path to the src folder available
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
-from src.embeddings.embedder import embed_text  
-
-# Test the embed_text function with a real BioBERT model
+# Keep the test run from writing to the service's on-disk embedding cache
+os.environ["EMBED_CACHE_PATH"] = ""
+from embeddings.embedder import embed_text
+from embeddings.model_loader import model_registry, BIOBERT
+from tiny_bert import make_tiny_bert
+
+# BioBERT-sized (768) tiny model in place of the Hub download, so the tests run offline
+@pytest.fixture(scope="module", autouse=True)
+def tiny_biobert(tmp_path_factory):
+    model_registry.use(BIOBERT, *make_tiny_bert(str(tmp_path_factory.mktemp("biobert")), hidden_size=768))
+
+# Test the embed_text function with the registry's model
 def test_embed_text_real_case():
     # Input text to test
     text = "This is a test sentence."
 
-    # Call the embed_text function, which will load the model and tokenizer
+    # Call the embed_text function, which gets the model and tokenizer from the registry
     embedding = embed_text(text)
 
     # Check if the output is a list (normalized embedding)
@@ -0,0 +1,70 @@
+import pytest
+import torch
+import numpy as np
+
+import sys
+import os
+# Make the path to the service root available
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from embeddings.batching import encode_batched, length_buckets
+from tiny_bert import make_tiny_bert, WORDS
+
+TEXTS = [
+    "What causes eczema?",
+    "",
+    " ".join(WORDS * 3),
+    "dry itch",
+    " ".join(WORDS[::-1]),
+    "acne on the scalp with red patch and chronic flare after topical cream",
+    "rash",
+]
+
+# Tiny randomly initialised BERT so the tests run offline
+@pytest.fixture(scope="module")
+def tiny_bert(tmp_path_factory):
+    return make_tiny_bert(str(tmp_path_factory.mktemp("tiny_bert")))
+
+# Same computation as embed_text before batching: one text per forward pass, [CLS] output
+def embed_one(text, tokenizer, model, max_length=512):
+    inputs = tokenizer(text, return_tensors="pt", padding=True, truncation=True, max_length=max_length)
+    with torch.no_grad():
+        cls_embedding = model(**inputs).last_hidden_state[:, 0, :].squeeze().numpy()
+    norm = np.linalg.norm(cls_embedding)
+    return cls_embedding / norm if norm > 0 else cls_embedding
+
+# Batched vectors match the per-text ones, in input order, whatever the bucketing
+@pytest.mark.parametrize("batch_size, max_batch_tokens", [(1, 16384), (3, 16384), (32, 16384), (32, 40)])
+def test_batched_matches_per_text(tiny_bert, batch_size, max_batch_tokens):
+    tokenizer, model = tiny_bert
+    expected = np.stack([embed_one(text, tokenizer, model, max_length=48) for text in TEXTS])
+    vectors = encode_batched(TEXTS, tokenizer, model, batch_size=batch_size, max_length=48,
+                             max_batch_tokens=max_batch_tokens)
+
+    assert vectors.dtype == np.float32
+    assert vectors.shape == (len(TEXTS), 32)
+    np.testing.assert_allclose(vectors, expected, atol=1e-5)
+    np.testing.assert_allclose(np.linalg.norm(vectors, axis=1), 1.0, atol=1e-5)
+
+# Mean pooling only averages real tokens, so padding from a longer neighbour changes nothing
+def test_mean_pooling_ignores_padding(tiny_bert):
+    tokenizer, model = tiny_bert
+    alone = encode_batched(["dry itch"], tokenizer, model, pooling="mean")
+    padded = encode_batched(["dry itch", " ".join(WORDS * 2)], tokenizer, model, pooling="mean")
+    np.testing.assert_allclose(padded[0], alone[0], atol=1e-5)
+
+def test_empty_input_and_unknown_pooling(tiny_bert):
+    tokenizer, model = tiny_bert
+    assert encode_batched([], tokenizer, model).shape == (0, 32)
+    with pytest.raises(ValueError):
+        encode_batched(["rash"], tokenizer, model, pooling="max")
+
+# Buckets respect both limits and cover every text exactly once
+def test_length_buckets_limits():
+    lengths = [5, 120, 7, 64, 6, 130, 8, 60]
+    batches = length_buckets(lengths, batch_size=3, max_batch_tokens=256)
+    assert sorted(i for batch in batches for i in batch) == list(range(len(lengths)))
+    for batch in batches:
+        assert len(batch) <= 3
+        assert len(batch) * max(lengths[i] for i in batch) <= 256
+    # Similar lengths end up together
+    assert batches[0] == [0, 4, 2]
@@ -0,0 +1,89 @@
+import pytest
+import torch
+import numpy as np
+from transformers import BertConfig, BertModel
+
+import sys
+import os
+# Make the path to the service root available
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from embeddings.cache import EmbeddingCache, LRUCache, SQLiteVectorStore, cache_namespace, text_hash
+
+class CountingEncoder:
+    # Deterministic fake encoder that records what it was asked to embed
+    def __init__(self, dim=8, offset=0.0):
+        self.dim = dim
+        self.offset = offset
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return np.stack([np.full(self.dim, len(text) + self.offset, dtype=np.float32) for text in texts])
+
+def tiny_bert(seed):
+    torch.manual_seed(seed)
+    return BertModel(BertConfig(vocab_size=50, hidden_size=16, num_hidden_layers=1, num_attention_heads=2,
+                                intermediate_size=32))
+
+# Only misses are encoded, once per unique text and in one call
+def test_memory_tier_serves_repeats():
+    encoder = CountingEncoder()
+    cache = EmbeddingCache(encoder, namespace="m/cls/512", max_entries=100)
+
+    first = cache.embed(["eczema", "acne", "eczema"])
+    second = cache.embed(["acne", "  eczema \n", "psoriasis"])
+
+    assert encoder.calls == [["eczema", "acne"], ["psoriasis"]]
+    np.testing.assert_array_equal(first[0], first[2])
+    np.testing.assert_array_equal(second[1], first[0])
+    stats = cache.stats()
+    assert (stats["memory_hits"], stats["misses"], stats["requests"]) == (2, 3, 5)
+    assert stats["hit_rate"] == pytest.approx(0.4)
+
+# A new process with the same model reads vectors from disk instead of re-encoding
+@pytest.mark.parametrize("dtype", ["float32", "float16"])
+def test_disk_tier_survives_restart(tmp_path, dtype):
+    path = str(tmp_path / "cache" / "embeddings.sqlite")
+    EmbeddingCache(CountingEncoder(), "m/cls/512", store=SQLiteVectorStore(path, dtype)).embed(["rash", "dry skin"])
+
+    encoder = CountingEncoder()
+    cache = EmbeddingCache(encoder, "m/cls/512", store=SQLiteVectorStore(path, dtype))
+    vectors = cache.embed(["dry skin", "rash"])
+
+    assert encoder.calls == []
+    assert vectors.dtype == np.float32
+    np.testing.assert_allclose(vectors[0], np.full(8, len("dry skin")), rtol=1e-3)
+    assert cache.stats()["disk_hits"] == 2
+
+# Vectors stored for another model are never returned
+def test_model_change_never_serves_stale_vectors(tmp_path):
+    path = str(tmp_path / "embeddings.sqlite")
+    old_model, new_model = tiny_bert(0), tiny_bert(1)
+    old_namespace = cache_namespace(old_model, "cls", 512)
+    new_namespace = cache_namespace(new_model, "cls", 512)
+    assert old_namespace != new_namespace
+    assert old_namespace == cache_namespace(old_model, "cls", 512)
+    assert old_namespace != cache_namespace(old_model, "mean", 512)
+
+    store = SQLiteVectorStore(path)
+    EmbeddingCache(CountingEncoder(offset=0), old_namespace, store=store).embed(["rash"])
+    encoder = CountingEncoder(offset=100)
+    vectors = EmbeddingCache(encoder, new_namespace, store=store).embed(["rash"])
+
+    assert encoder.calls == [["rash"]]
+    assert vectors[0][0] == len("rash") + 100
+    assert store.prune(new_namespace) == 1
+    assert store.count() == 1
+
+def test_lru_evicts_least_recently_used():
+    lru = LRUCache(max_entries=2)
+    lru.put("a", 1)
+    lru.put("b", 2)
+    lru.get("a")
+    lru.put("c", 3)
+    assert lru.get("b") is None
+    assert (lru.get("a"), lru.get("c")) == (1, 3)
+
+def test_text_hash_ignores_whitespace_only():
+    assert text_hash("What causes  eczema?\n") == text_hash("What causes eczema?")
+    assert text_hash("Eczema") != text_hash("eczema")
@@ -0,0 +1,64 @@
+import threading
+import pytest
+from transformers import AutoModel, AutoTokenizer
+
+import sys
+import os
+# Make the path to the service root available
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from embeddings.registry import ModelRegistry, BIOBERT, model_memory_bytes
+from tiny_bert import make_tiny_bert
+
+@pytest.fixture(scope="module")
+def tiny_bert_dir(tmp_path_factory):
+    directory = str(tmp_path_factory.mktemp("tiny_bert"))
+    make_tiny_bert(directory)
+    return directory
+
+# Concurrent first callers share one load, and every caller gets the same objects
+def test_model_loaded_once_and_shared(tiny_bert_dir):
+    loads = []
+    def loader():
+        loads.append(1)
+        return AutoTokenizer.from_pretrained(tiny_bert_dir), AutoModel.from_pretrained(tiny_bert_dir)
+
+    registry = ModelRegistry()
+    registry.register(BIOBERT, loader)
+    assert not registry.is_loaded()
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(loads) == 1
+    assert all(result[1] is results[0][1] for result in results)
+    assert not results[0][1].training
+
+# describe() reports the resident weight memory of each loaded model
+def test_describe_reports_memory_per_model(tiny_bert_dir):
+    registry = ModelRegistry()
+    registry.register(BIOBERT, lambda: (AutoTokenizer.from_pretrained(tiny_bert_dir), AutoModel.from_pretrained(tiny_bert_dir)))
+    registry.register("unused", lambda: pytest.fail("lazy models must not load"))
+    registry.warmup([BIOBERT])
+
+    described = registry.describe()
+    _, model = registry.get()
+    assert described["unused"] == {"loaded": False}
+    assert described[BIOBERT]["loaded"]
+    assert described[BIOBERT]["parameters"] == sum(p.numel() for p in model.parameters())
+    assert described[BIOBERT]["memory_mb"] == round(model_memory_bytes(model) / 2**20, 1)
+    assert described[BIOBERT]["memory_mb"] > 0
+
+# Tests install a local model without any loader being called
+def test_use_swaps_in_a_local_model(tmp_path):
+    registry = ModelRegistry()
+    registry.register(BIOBERT, lambda: pytest.fail("the hub loader must not be called"))
+    tokenizer, model = make_tiny_bert(str(tmp_path))
+    registry.use(BIOBERT, tokenizer, model)
+    assert registry.get() == (tokenizer, model)
+
+    with pytest.raises(KeyError):
+        registry.get("missing")
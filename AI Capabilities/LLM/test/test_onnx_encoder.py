@@ -0,0 +1,70 @@
+import os
+import pytest
+import numpy as np
+
+import sys
+# Make the path to the service root available
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from embeddings.batching import encode_batched
+from embeddings.cache import cache_namespace
+from embeddings.onnx_encoder import OnnxEncoder, export_onnx_encoder, quantize_onnx_int8
+from embeddings.parity import cosine_parity, retrieval_overlap, top_k
+from tiny_bert import make_tiny_bert, WORDS
+
+TEXTS = [
+    "What causes eczema?",
+    "dry itch",
+    " ".join(WORDS * 2),
+    "acne on the scalp with red patch and chronic flare after topical cream",
+]
+
+@pytest.fixture(scope="module")
+def exported(tmp_path_factory):
+    directory = str(tmp_path_factory.mktemp("onnx"))
+    tokenizer, model = make_tiny_bert(directory, hidden_size=64)
+    onnx_path = os.path.join(directory, "encoder.onnx")
+    int8_path = os.path.join(directory, "encoder.int8.onnx")
+    export_onnx_encoder(model, onnx_path)
+    quantize_onnx_int8(onnx_path, int8_path)
+    return tokenizer, model, onnx_path, int8_path
+
+# The exported graph gives the PyTorch vectors, padding included, and leaves the shared model in eval mode
+def test_onnx_matches_torch(exported):
+    tokenizer, model, onnx_path, _ = exported
+    assert not model.training
+
+    expected = encode_batched(TEXTS, tokenizer, model, batch_size=4)
+    actual = encode_batched(TEXTS, tokenizer, OnnxEncoder(onnx_path), batch_size=4)
+    assert actual.shape == expected.shape
+    assert cosine_parity(expected, actual)["min_cosine"] > 0.99999
+
+def test_int8_is_smaller_and_close(exported):
+    tokenizer, model, onnx_path, int8_path = exported
+    int8 = OnnxEncoder(int8_path)
+    assert int8.memory_bytes < OnnxEncoder(onnx_path).memory_bytes
+
+    parity = cosine_parity(encode_batched(TEXTS, tokenizer, model), encode_batched(TEXTS, tokenizer, int8))
+    assert parity["min_cosine"] > 0.95
+
+# Query vectors from each encoder are cached apart from each other and from the PyTorch model's
+def test_each_encoder_has_its_own_cache_namespace(exported):
+    _, model, onnx_path, int8_path = exported
+    namespaces = {cache_namespace(encoder, "cls", 512) for encoder in (model, OnnxEncoder(onnx_path), OnnxEncoder(int8_path))}
+    assert len(namespaces) == 3
+
+def test_top_k_and_overlap():
+    corpus = np.eye(4, dtype=np.float32)
+    queries = np.array([[0.9, 0.1, 0, 0], [0, 0, 0.2, 0.8]], dtype=np.float32)
+    assert top_k(corpus, queries, 2).tolist() == [[0, 1], [3, 2]]
+
+    report = retrieval_overlap([[0, 1], [3, 2]], [[0, 1], [3, 0]])
+    assert report["mean_overlap"] == pytest.approx(0.75)
+    assert report["min_overlap"] == pytest.approx(0.5)
+    assert report["top1_agreement"] == 1.0
+    assert report["queries_with_changed_ranking"] == 1
+
+def test_cosine_parity_ignores_scale():
+    vectors = np.random.default_rng(0).normal(size=(5, 8)).astype(np.float32)
+    report = cosine_parity(vectors, vectors * 3)
+    assert report["min_cosine"] == pytest.approx(1.0, abs=1e-6)
+    assert report["count"] == 5
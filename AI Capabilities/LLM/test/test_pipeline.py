@@ -8,5 +8,23 @@ def test_pipeline():
     # Run the second test file
     pytest.main(["llm_api_test.py"])
 
+    # Run the admission control tests
+    pytest.main(["test_admission.py"])
+
+    # Run the batched embedding tests
+    pytest.main(["test_embedding_batching.py"])
+
+    # Run the embedding cache tests
+    pytest.main(["test_embedding_cache.py"])
+
+    # Run the model registry tests
+    pytest.main(["test_model_registry.py"])
+
+    # Run the query embedding batcher tests
+    pytest.main(["test_query_batcher.py"])
+
+    # Run the ONNX query encoder tests
+    pytest.main(["test_onnx_encoder.py"])
+
 if __name__ == "__main__":
     test_pipeline()
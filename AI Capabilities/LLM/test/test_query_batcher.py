@@ -0,0 +1,107 @@
+import asyncio
+import threading
+import time
+import pytest
+
+import sys
+import os
+# Make the path to the service root available
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from embeddings.query_batcher import QueryEmbeddingBatcher
+from monitoring import EventLoopLagMonitor
+
+class SlowEncoder:
+    # Stands in for a BioBERT forward pass: holds its thread for `seconds` per batch
+    def __init__(self, seconds=0.05):
+        self.seconds = seconds
+        self.batches = []
+
+    def __call__(self, texts):
+        self.batches.append(list(texts))
+        time.sleep(self.seconds)
+        return [[float(len(text))] for text in texts]
+
+# Queries from concurrent requests share batches, and each caller gets its own vector
+def test_concurrent_queries_are_coalesced():
+    encoder = SlowEncoder()
+    batcher = QueryEmbeddingBatcher(encoder, max_batch_size=4, max_wait_ms=20)
+
+    async def scenario():
+        return await asyncio.gather(*(batcher.aembed("q" * n) for n in range(1, 9)))
+
+    vectors = asyncio.run(scenario())
+    batcher.close()
+
+    assert vectors == [[float(n)] for n in range(1, 9)]
+    assert len(encoder.batches) < 8
+    assert max(len(batch) for batch in encoder.batches) <= 4
+    stats = batcher.stats()
+    assert stats["queries"] == 8
+    assert stats["queue_time"]["count"] == 8
+    assert stats["mean_batch_size"] > 1
+
+# Embedding runs on the batcher's thread, so the event loop keeps ticking meanwhile
+def test_event_loop_not_blocked_while_embedding():
+    encoder = SlowEncoder(seconds=0.3)
+    batcher = QueryEmbeddingBatcher(encoder, max_batch_size=8, max_wait_ms=1)
+
+    async def scenario():
+        monitor = EventLoopLagMonitor(interval_s=0.01)
+        monitor.start()
+        await asyncio.gather(*(batcher.aembed("eczema") for _ in range(3)))
+        await monitor.stop()
+        return monitor.stats()
+
+    stats = asyncio.run(scenario())
+    batcher.close()
+    assert stats["count"] > 10
+    assert stats["max_ms"] < 150
+
+# Blocking work on the loop shows up as lag
+def test_lag_monitor_detects_blocking():
+    async def scenario():
+        monitor = EventLoopLagMonitor(interval_s=0.01)
+        monitor.start()
+        await asyncio.sleep(0.05)
+        time.sleep(0.2)
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+        return monitor.stats()
+
+    assert asyncio.run(scenario())["max_ms"] >= 150
+
+def test_errors_reach_every_caller():
+    def failing(texts):
+        raise RuntimeError("model not loaded")
+
+    batcher = QueryEmbeddingBatcher(failing, max_batch_size=4, max_wait_ms=10)
+    futures = [batcher.submit("rash") for _ in range(3)]
+    for future in futures:
+        with pytest.raises(RuntimeError):
+            future.result(timeout=5)
+    batcher.close()
+    with pytest.raises(RuntimeError):
+        batcher.submit("rash")
+
+# A request cancelled while its query waits must not take the worker thread down
+def test_cancelled_caller_does_not_stop_the_worker():
+    gate = threading.Event()
+
+    def gated(texts):
+        gate.wait(timeout=5)
+        return [[float(len(text))] for text in texts]
+
+    batcher = QueryEmbeddingBatcher(gated, max_batch_size=1, max_wait_ms=1)
+
+    async def scenario():
+        running = asyncio.ensure_future(batcher.aembed("running"))
+        queued = asyncio.ensure_future(batcher.aembed("queued"))
+        await asyncio.sleep(0.05)
+        running.cancel()
+        queued.cancel()
+        await asyncio.sleep(0)
+        gate.set()
+        return await asyncio.wait_for(batcher.aembed("next"), timeout=2)
+
+    assert asyncio.run(scenario()) == [4.0]
+    batcher.close()
@@ -0,0 +1,26 @@
+# Tiny randomly initialised BERT saved to a local directory, so embedding tests run offline
+import os
+
+import torch
+from transformers import BertConfig, BertModel, BertTokenizerFast
+
+WORDS = ("skin rash eczema acne itch red dry patch lesion cream topical steroid chronic flare scalp "
+         "what causes ? on the with and after this is a test sentence .").split()
+
+def make_tiny_bert(directory, hidden_size=32, seed=0):
+    """
+    Writes a tokenizer and a 2-layer BERT to `directory` (loadable with
+    `load_biobert_model(directory)`) and returns (tokenizer, model).
+    """
+    os.makedirs(directory, exist_ok=True)
+    vocab = os.path.join(directory, "vocab.txt")
+    with open(vocab, "w") as f:
+        f.write("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + WORDS))
+    tokenizer = BertTokenizerFast(vocab_file=vocab)
+    torch.manual_seed(seed)
+    config = BertConfig(vocab_size=tokenizer.vocab_size, hidden_size=hidden_size, num_hidden_layers=2,
+                        num_attention_heads=2, intermediate_size=2 * hidden_size, max_position_embeddings=64)
+    model = BertModel(config).eval()
+    tokenizer.save_pretrained(directory)
+    model.save_pretrained(directory)
+    return tokenizer, model